@@ -9,6 +9,8 @@ sys.path.append('.')
 
 from app import app, db
 from models import Project
+from index_allocator import project_index_allocator
+from bulk_upsert import upsert_projects
 from datetime import datetime, date
 
 def add_sample_projects():
@@ -164,21 +166,19 @@ def add_sample_projects():
         
         print("Adding sample renewable energy projects...")
         
-        for project_data in sample_projects:
-            # Create project with current timestamp
-            project = Project()
-            for key, value in project_data.items():
-                setattr(project, key, value)
-            
-            project.last_updated = date.today()
-            project.created_at = datetime.utcnow()
-            project.updated_at = datetime.utcnow()
-            
-            db.session.add(project)
-            print(f"Added: {project.name}")
+        # Write every sample in one statement
+        now = datetime.utcnow()
+        rows = [{**project_data, 'last_updated': date.today(), 'created_at': now, 'updated_at': now}
+                for project_data in sample_projects]
+        result = upsert_projects(rows)
+        for project_data, written in zip(sample_projects, result.written):
+            if written:
+                print(f"Added: {project_data['name']}")
         
+        # Sample projects carry fixed indices; allocate new ones after them
+        project_index_allocator.advance_to(db.session, max(p['index'] for p in sample_projects))
         db.session.commit()
-        print(f"Successfully added {len(sample_projects)} sample projects to the database.")
+        print(f"Successfully added {sum(result.written)} sample projects to the database.")
 
 if __name__ == "__main__":
     add_sample_projects()
\ No newline at end of file
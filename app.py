@@ -6,6 +6,7 @@ from flask import Flask, render_template, request, jsonify, flash, redirect, url
 from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy.orm import DeclarativeBase
 from werkzeug.middleware.proxy_fix import ProxyFix
+from embedded_sqlite import database_url, engine_options, install as install_embedded_sqlite
 
 # Setup logging
 logging.basicConfig(
@@ -27,15 +28,9 @@ app = Flask(__name__)
 app.secret_key = os.environ.get("SESSION_SECRET", "default_secret_key")
 app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)  # Needed for url_for to generate with https
 
-# Configure the PostgreSQL database
-app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get("DATABASE_URL")
-app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
-    "pool_recycle": 300,
-    "pool_pre_ping": True,
-    "pool_timeout": 30,  # Timeout for getting a connection from the pool
-    "max_overflow": 10,  # Maximum number of connections to overflow from the pool
-    "pool_size": 5       # The size of the connection pool
-}
+# Configure the database: DATABASE_URL (PostgreSQL), or an embedded SQLite file
+app.config["SQLALCHEMY_DATABASE_URI"] = database_url()
+app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options(app.config["SQLALCHEMY_DATABASE_URI"])
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 
 # Application feature flags
@@ -43,6 +38,8 @@ app.config["DIAGNOSTIC_MODE"] = True  # Enable diagnostic mode to track potentia
 
 # Initialize the app with the extension
 db.init_app(app)
+with app.app_context():
+    install_embedded_sqlite(db.engine)
 
 # Make datetime available in all templates
 @app.context_processor
@@ -73,11 +70,11 @@ except ImportError:
 with app.app_context():
     db.create_all()
 
-# Import and start the scheduler in a separate thread
-from scheduler import start_scheduler
-
 # Instead of @app.before_first_request which is deprecated
 def initialize_scheduler():
+    # Loaded on first request so importing the app doesn't pull in the crawler
+    from scheduler import start_scheduler
+    
     # Start the scheduler in a separate thread
     thread = threading.Thread(target=start_scheduler)
     thread.daemon = True
@@ -0,0 +1,71 @@
+"""
+Compression of stored article bodies.
+Article text is kept out of the news_article rows that listings read and
+stored compressed in the article_body table: with zstd when the zstandard
+package is installed, zlib otherwise. Each body records its codec, so
+bodies written with either stay readable.
+"""
+
+import os
+import zlib
+import logging
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+# Codec for new bodies: 'zstd', 'zlib' or 'raw'; zstd falls back to zlib when unavailable
+ARTICLE_CODEC = os.environ.get("ARTICLE_CODEC", "zstd").lower()
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 9
+
+# Characters of the body kept inline as the article summary
+SUMMARY_CHARS = 300
+
+
+def default_codec():
+    """The codec new bodies are written with"""
+    if ARTICLE_CODEC == 'zstd' and not ZSTD_AVAILABLE:
+        return 'zlib'
+    return ARTICLE_CODEC if ARTICLE_CODEC in ('zstd', 'zlib', 'raw') else 'zlib'
+
+
+def compress_text(text, codec=None):
+    """
+    Compress article text
+
+    Returns:
+        Tuple of (codec, compressed bytes)
+    """
+    codec = codec or default_codec()
+    data = (text or "").encode('utf-8')
+    if codec == 'zstd':
+        return codec, zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    if codec == 'zlib':
+        return codec, zlib.compress(data, ZLIB_LEVEL)
+    return 'raw', data
+
+
+def decompress_text(codec, data):
+    """Return the text of a body compressed by compress_text"""
+    if data is None:
+        return None
+    if codec == 'zstd':
+        if not ZSTD_AVAILABLE:
+            raise RuntimeError("Article body is zstd-compressed but zstandard is not installed")
+        data = zstandard.ZstdDecompressor().decompress(data)
+    elif codec == 'zlib':
+        data = zlib.decompress(data)
+    return bytes(data).decode('utf-8')
+
+
+def summarize(text, length=SUMMARY_CHARS):
+    """Return the start of an article body, whitespace collapsed, for listings"""
+    if not text:
+        return None
+    return ' '.join(text[:length * 2].split())[:length]
@@ -0,0 +1,551 @@
+#!/usr/bin/env python3
+"""
+Performance benchmarks for the renewable energy project tracker.
+
+Run one benchmark at a time, e.g.:
+    python benchmarks.py classifier
+    python benchmarks.py excel-ingestion --rows 100000
+    python benchmarks.py startup --max-ms 1500
+    python benchmarks.py query-plans --rows 20000
+    python benchmarks.py db-backends --postgres-url postgresql://localhost/scratch
+"""
+
+import os
+import re
+import sys
+import time
+import statistics
+import subprocess
+import tempfile
+import random
+import argparse
+import logging
+
+sys.path.append('.')
+
+logging.basicConfig(level=logging.WARNING)
+
+
+def _report(title, rows):
+    """Print a simple aligned result table"""
+    print(f"\n{title}")
+    print("-" * len(title))
+    width = max(len(label) for label, _ in rows)
+    for label, value in rows:
+        print(f"  {label.ljust(width)}  {value}")
+
+
+def benchmark_classifier(args):
+    """Compare throughput and accuracy of the rules and sklearn classifier backends"""
+    from ml_classifier import ProjectTypeClassifier, load_excel_corpus
+    from enhanced_scraper import determine_project_type
+
+    texts, labels = load_excel_corpus()
+    if len(texts) < 10:
+        print("Not enough labelled rows in the Excel corpora to benchmark")
+        return 1
+
+    # Hold out a fixed share of the corpus for evaluation
+    indices = list(range(len(texts)))
+    random.Random(args.seed).shuffle(indices)
+    split = int(len(indices) * (1 - args.test_size))
+    train_idx, test_idx = indices[:split], indices[split:]
+    test_texts = [texts[i] for i in test_idx]
+    test_labels = [labels[i] for i in test_idx]
+
+    classifier = ProjectTypeClassifier().fit(
+        [texts[i] for i in train_idx], [labels[i] for i in train_idx]
+    )
+
+    def best_label(scores):
+        if not scores or max(scores.values()) <= 0:
+            return None
+        return max(scores, key=scores.get)
+
+    # Warm both paths so one-time loading isn't measured
+    determine_project_type(test_texts[0], backend='rules')
+    classifier.predict_batch(test_texts[:1])
+
+    workload = test_texts * args.repeat
+
+    start = time.perf_counter()
+    rule_scores = [determine_project_type(text, backend='rules') for text in workload]
+    rules_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    model_scores = classifier.predict_batch(workload)
+    sklearn_time = time.perf_counter() - start
+
+    n_test = len(test_texts)
+    rules_correct = sum(best_label(s) == l for s, l in zip(rule_scores[:n_test], test_labels))
+    sklearn_correct = sum(best_label(s) == l for s, l in zip(model_scores[:n_test], test_labels))
+
+    _report(f"Project type classification ({len(train_idx)} train / {n_test} test rows, "
+            f"{len(workload)} texts timed)", [
+        ("rules accuracy", f"{rules_correct / n_test:.1%}"),
+        ("sklearn accuracy", f"{sklearn_correct / n_test:.1%}"),
+        ("rules throughput", f"{len(workload) / rules_time:,.0f} texts/s"),
+        ("sklearn throughput", f"{len(workload) / sklearn_time:,.0f} texts/s"),
+    ])
+    return 0
+
+
+def _synthetic_training_workbook(path, rows, seed):
+    """Write a training workbook with random project rows of every type"""
+    import pandas as pd
+
+    rng = random.Random(seed)
+    types = ['Solar', 'Wind', 'Battery', 'Hydro', 'Hydrogen', 'Biofuel']
+    companies = ['Adani Green', 'Tata Power', 'ReNew Power', 'NTPC', 'Waaree Energies',
+                 'Ola Electric', 'Reliance Industries', 'JSW Energy', 'Avaada', 'Greenko']
+    categories = ['Generation', 'Manufacturing', 'Storage', 'Production']
+    places = ['Gujarat', 'Rajasthan', 'Tamil Nadu', 'Karnataka', 'Odisha', 'Maharashtra']
+    suffixes = ['Park', 'Plant', 'Project', 'Facility', 'Cluster', 'Hub']
+
+    project_types = [rng.choice(types) for _ in range(rows)]
+    pd.DataFrame({
+        'Type': project_types,
+        'Name': [f"{rng.choice(places)} {t} {rng.choice(suffixes)} {rng.randint(1, 500)}"
+                 for t in project_types],
+        'Company': [rng.choice(companies) for _ in range(rows)],
+        'Category': [rng.choice(categories) for _ in range(rows)],
+        'Generation Capacity (GW)': [round(rng.uniform(0.1, 5), 2) if rng.random() < 0.6 else None
+                                     for _ in range(rows)],
+        'Storage Capacity (GWh)': [f"{rng.uniform(0.1, 4):.1f} GWh" if rng.random() < 0.3 else None
+                                   for _ in range(rows)],
+    }).to_excel(path, index=False)
+
+
+def benchmark_excel_ingestion(args):
+    """Time training-file ingestion on a synthetic workbook"""
+    import pandas as pd
+    from training_module import ProjectTypeTrainer
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        excel_file = os.path.join(tmpdir, 'training_data_synthetic.xlsx')
+        start = time.perf_counter()
+        _synthetic_training_workbook(excel_file, args.rows, args.seed)
+        generate_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        pd.read_excel(excel_file)
+        read_time = time.perf_counter() - start
+
+        # Keep the repository's training_data.json untouched
+        trainer = ProjectTypeTrainer(training_data_path=os.path.join(tmpdir, 'training_data.json'))
+        for mapping in (trainer.category_keywords, trainer.category_phrases, trainer.category_metrics):
+            mapping.clear()
+
+        start = time.perf_counter()
+        trainer.process_excel_file(excel_file)
+        total_time = time.perf_counter() - start
+
+    ingest_time = max(total_time - read_time, 1e-9)
+    metric_values = sum(len(values) for metrics in trainer.category_metrics.values()
+                        for values in metrics.values())
+
+    _report(f"Excel ingestion ({args.rows:,} rows)", [
+        ("workbook generation", f"{generate_time:.2f} s"),
+        ("read_excel", f"{read_time:.2f} s"),
+        ("process_excel_file", f"{total_time:.2f} s"),
+        ("ingestion excluding read", f"{ingest_time:.2f} s ({args.rows / ingest_time:,.0f} rows/s)"),
+        ("project types", str(len(trainer.category_keywords))),
+        ("keywords", str(sum(len(v) for v in trainer.category_keywords.values()))),
+        ("phrases", str(sum(len(v) for v in trainer.category_phrases.values()))),
+        ("metric values", f"{metric_values:,}"),
+    ])
+    return 0
+
+
+# Modules a web worker must not load at startup
+STARTUP_HEAVY_MODULES = ['pandas', 'numpy', 'openpyxl', 'sklearn', 'trafilatura', 'newspaper',
+                         'bs4', 'nltk', 'spacy', 'scraper', 'training_module']
+
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def _import_times(module, env):
+    """Import a module in a fresh interpreter with -X importtime; return {name: cumulative us}"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"importing {module} failed:\n{result.stderr[-2000:]}")
+
+    times = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            times[match.group(4)] = int(match.group(2))
+    return times
+
+
+def benchmark_startup(args):
+    """Measure cold import time of the web app and fail on regressions"""
+    import resource
+
+    env = dict(os.environ)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        # The app creates its tables on import, so give it a throwaway database
+        env.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(tmpdir, 'startup.db')}")
+
+        runs = [_import_times(args.module, env) for _ in range(args.runs)]
+
+    totals = [times[args.module] / 1000 for times in runs]
+    median_ms = statistics.median(totals)
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+    loaded_heavy = sorted(name for name in STARTUP_HEAVY_MODULES if name in runs[-1])
+
+    slowest = sorted(((ms, name) for name, ms in runs[-1].items()
+                      if '.' not in name and name != args.module), reverse=True)[:args.top]
+
+    _report(f"Cold import of {args.module} ({args.runs} runs)", [
+        ("median", f"{median_ms:.0f} ms"),
+        ("min / max", f"{min(totals):.0f} / {max(totals):.0f} ms"),
+        ("peak RSS", f"{peak_rss_mb:.0f} MB"),
+        ("threshold", f"{args.max_ms:.0f} ms"),
+        ("heavy modules loaded", ', '.join(loaded_heavy) or "none"),
+    ])
+    _report("Slowest top-level imports", [(name, f"{us / 1000:.0f} ms") for us, name in slowest])
+
+    failed = False
+    if median_ms > args.max_ms:
+        print(f"\nFAIL: median import time {median_ms:.0f} ms exceeds {args.max_ms:.0f} ms")
+        failed = True
+    if loaded_heavy:
+        print(f"\nFAIL: {args.module} imports crawl/training modules: {', '.join(loaded_heavy)}")
+        failed = True
+    return 1 if failed else 0
+
+
+# Plan lines that mean a full read of a table
+FULL_SCAN_PATTERNS = {
+    'sqlite': re.compile(r'\bSCAN (?!.*\bUSING (?:COVERING )?INDEX\b)'),
+    'postgresql': re.compile(r'\bSeq Scan\b'),
+}
+
+
+def _hot_queries():
+    """The listing, dashboard and source-detail queries that must use an index"""
+    from app import db
+    from models import Project, NewsArticle, ScrapeLog
+
+    return [
+        ("projects of a type, newest first",
+         Project.query.filter_by(type='Solar').order_by(Project.created_at.desc())),
+        ("recent projects",
+         Project.query.order_by(Project.created_at.desc()).limit(5)),
+        ("projects by state",
+         db.session.query(Project.state, db.func.count(Project.id)).group_by(Project.state)),
+        ("projects by status",
+         db.session.query(Project.status, db.func.count(Project.id)).group_by(Project.status)),
+        ("projects by type",
+         db.session.query(Project.type, db.func.count(Project.id)).group_by(Project.type)),
+        ("capacity of a type",
+         db.session.query(db.func.sum(Project.generation_capacity)).filter_by(type='Solar')),
+        ("duplicate check by fingerprint",
+         Project.query.filter(Project.fingerprint == 'solar|adanigreen|gujarat|28')),
+        ("duplicate candidates of a company",
+         Project.query.filter(Project.company_key == 'adanigreen', Project.type == 'Solar')),
+        ("articles of a source, newest first",
+         NewsArticle.query.filter_by(source_id=1).order_by(NewsArticle.created_at.desc())),
+        ("logs of a source, newest first",
+         ScrapeLog.query.filter_by(source_id=1).order_by(ScrapeLog.timestamp.desc())),
+        ("recent logs",
+         ScrapeLog.query.order_by(ScrapeLog.timestamp.desc()).limit(10)),
+    ]
+
+
+def _seed_tables(rows, seed):
+    """Insert synthetic sources, projects, articles and logs"""
+    from datetime import datetime, timedelta
+    from app import db
+    from models import Project, Source, NewsArticle, ScrapeLog
+    from project_dedup import project_fingerprint
+
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    types = ['Solar', 'Wind', 'Battery', 'Hydro', 'Green Hydrogen', 'Biofuel']
+    states = ['Gujarat', 'Rajasthan', 'Tamil Nadu', 'Karnataka', 'Maharashtra', 'Odisha']
+    statuses = ['Announced', 'Planning', 'Under Construction', 'Operational']
+
+    sources = [Source(name=f"Source {i}", url=f"https://news{i}.example.com") for i in range(20)]
+    db.session.add_all(sources)
+    db.session.flush()
+    source_ids = [source.id for source in sources]
+
+    projects = [{
+        'index': i + 1, 'name': f"Project {i}", 'company': f"Company {i % 500}",
+        'type': rng.choice(types), 'state': rng.choice(states), 'status': rng.choice(statuses),
+        'generation_capacity': rng.uniform(10, 2000),
+        'created_at': now - timedelta(minutes=rng.randrange(500000)),
+    } for i in range(rows)]
+    # Bulk inserts skip the model's fingerprint listener
+    for project in projects:
+        project['fingerprint'], project['company_key'] = project_fingerprint(project)
+    db.session.bulk_insert_mappings(Project, projects)
+    db.session.bulk_insert_mappings(NewsArticle, [{
+        'url': f"https://news.example.com/article-{i}", 'title': f"Article {i}",
+        'source_id': rng.choice(source_ids),
+        'created_at': now - timedelta(minutes=rng.randrange(500000)),
+    } for i in range(rows)])
+    db.session.bulk_insert_mappings(ScrapeLog, [{
+        'source_id': rng.choice(source_ids), 'status': 'success',
+        'timestamp': now - timedelta(minutes=rng.randrange(500000)),
+    } for i in range(rows // 10)])
+    db.session.commit()
+
+
+def _explain(query, dialect):
+    """Return the plan lines of a SQLAlchemy query"""
+    from app import db
+
+    statement = query.statement if hasattr(query, 'statement') else query
+    sql = str(statement.compile(dialect=db.engine.dialect, compile_kwargs={'literal_binds': True}))
+    if dialect == 'sqlite':
+        rows = db.session.execute(db.text(f"EXPLAIN QUERY PLAN {sql}")).fetchall()
+        return [row[-1] for row in rows]
+    rows = db.session.execute(db.text(f"EXPLAIN {sql}")).fetchall()
+    return [row[0] for row in rows]
+
+
+def benchmark_query_plans(args):
+    """Check that the hot read queries are served by indexes"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        # Use a throwaway database unless one is given explicitly
+        os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(tmpdir, 'plans.db')}")
+        seeded = os.environ['DATABASE_URL'].startswith(f"sqlite:///{tmpdir}")
+
+        from app import app, db
+        from migrations import upgrade
+
+        with app.app_context():
+            upgrade(db.engine)
+            dialect = db.engine.dialect.name
+            if dialect not in FULL_SCAN_PATTERNS:
+                print(f"Query plans can't be checked on {dialect}")
+                return 1
+
+            if seeded:
+                _seed_tables(args.rows, args.seed)
+            if dialect == 'sqlite':
+                db.session.execute(db.text("ANALYZE"))
+            else:
+                # Small tables make sequential scans legitimately cheaper
+                db.session.execute(db.text("SET enable_seqscan = off"))
+
+            full_scan = FULL_SCAN_PATTERNS[dialect]
+            rows = []
+            failures = []
+            for label, query in _hot_queries():
+                start = time.perf_counter()
+                query.all()
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                plan = _explain(query, dialect)
+                scans = [line.strip() for line in plan if full_scan.search(line)]
+                if scans:
+                    failures.append((label, scans))
+                rows.append((label, f"{elapsed_ms:7.1f} ms  {'FULL SCAN' if scans else 'index'}"))
+            db.session.rollback()
+            db.session.remove()
+            db.engine.dispose()
+
+    _report(f"Hot query plans ({dialect}{f', {args.rows:,} rows' if seeded else ''})", rows)
+    for label, scans in failures:
+        print(f"\nFAIL: {label} reads the whole table: {'; '.join(scans)}")
+    return 1 if failures else 0
+
+
+def _backend_workloads(args):
+    """Run the standard workloads against DATABASE_URL and return their timings"""
+    import threading
+    from app import app, db
+    from migrations import upgrade
+    from models import NewsArticle, Project, Source
+    from bulk_upsert import upsert_projects
+    from unit_of_work import SourceUnitOfWork
+
+    results = {}
+    with app.app_context():
+        upgrade(db.engine)
+        if db.session.query(Project.id).first() is not None:
+            raise RuntimeError("The benchmark database already has projects; use a scratch database")
+
+        start = time.perf_counter()
+        _seed_tables(args.rows, args.seed)
+        # Projects, articles and a tenth as many scrape logs
+        seeded_rows = args.rows * 2 + args.rows // 10
+        results['bulk_insert_rows_per_s'] = seeded_rows / (time.perf_counter() - start)
+        if db.engine.dialect.name == 'sqlite':
+            db.session.execute(db.text("ANALYZE"))
+
+        passes = []
+        for _ in range(5):
+            start = time.perf_counter()
+            for _, query in _hot_queries():
+                query.all()
+            passes.append((time.perf_counter() - start) * 1000)
+        results['hot_queries_ms'] = statistics.median(passes)
+
+        upserts = [{'name': f"Upserted {i}", 'company': f"Company {i % 300}", 'type': 'Solar',
+                    'state': 'Gujarat', 'generation_capacity': 50 + i} for i in range(args.rows // 5)]
+        start = time.perf_counter()
+        upsert_projects(upserts)
+        db.session.commit()
+        results['upsert_rows_per_s'] = len(upserts) / (time.perf_counter() - start)
+        source_id = db.session.query(Source.id).first()[0]
+        stored_before = db.session.query(NewsArticle.id).count()
+        db.session.remove()
+
+    # Crawl threads committing one article at a time while a page is read repeatedly
+    errors = []
+    read_ms = []
+    writers_done = threading.Event()
+
+    def write(thread):
+        with app.app_context():
+            unit_of_work = SourceUnitOfWork(db.session, batch_size=1)
+            for i in range(args.articles):
+                article = NewsArticle(url=f"https://crawl.example.com/{thread}/{i}",
+                                      title=f"Crawled {thread}-{i}", source_id=source_id)
+                article.content = f"Solar park article {thread} {i} " * 100
+                unit_of_work.add(article)
+            unit_of_work.flush()
+            db.session.remove()
+
+    def read():
+        with app.app_context():
+            while not writers_done.is_set():
+                start = time.perf_counter()
+                try:
+                    (Project.query.filter_by(type='Solar')
+                     .order_by(Project.created_at.desc()).limit(50).all())
+                except Exception as e:
+                    errors.append(str(e))
+                read_ms.append((time.perf_counter() - start) * 1000)
+                db.session.remove()
+
+    writers = [threading.Thread(target=write, args=(n,)) for n in range(args.threads)]
+    reader = threading.Thread(target=read)
+    start = time.perf_counter()
+    reader.start()
+    for writer in writers:
+        writer.start()
+    for writer in writers:
+        writer.join()
+    elapsed = time.perf_counter() - start
+    writers_done.set()
+    reader.join()
+
+    with app.app_context():
+        stored = db.session.query(NewsArticle.id).count() - stored_before
+        db.session.remove()
+        db.engine.dispose()
+    expected = args.threads * args.articles
+    results['crawl_articles_per_s'] = stored / elapsed
+    results['crawl_articles_lost'] = expected - stored
+    results['read_p95_ms'] = sorted(read_ms)[int(len(read_ms) * 0.95)] if read_ms else 0.0
+    results['read_errors'] = len(errors)
+    return results
+
+
+BACKEND_METRICS = [
+    ('bulk_insert_rows_per_s', "bulk insert", "{:,.0f} rows/s"),
+    ('hot_queries_ms', "hot queries, one pass", "{:.1f} ms"),
+    ('upsert_rows_per_s', "project upsert", "{:,.0f} rows/s"),
+    ('crawl_articles_per_s', "concurrent crawl commits", "{:,.0f} articles/s"),
+    ('crawl_articles_lost', "articles lost to lock errors", "{}"),
+    ('read_p95_ms', "page read p95 during crawl", "{:.1f} ms"),
+    ('read_errors', "page read errors during crawl", "{}"),
+]
+
+
+def benchmark_db_backends(args):
+    """Compare the embedded SQLite mode with PostgreSQL on the standard workloads"""
+    import json
+
+    if args.worker:
+        print(json.dumps(_backend_workloads(args)))
+        return 0
+
+    worker_args = ['--rows', str(args.rows), '--seed', str(args.seed),
+                   '--threads', str(args.threads), '--articles', str(args.articles)]
+    results = {}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        backends = [('embedded sqlite', f"sqlite:///{os.path.join(tmpdir, 'embedded.db')}")]
+        if args.postgres_url:
+            backends.append(('postgresql', args.postgres_url))
+        for name, url in backends:
+            # Each backend gets a fresh interpreter, since the app binds its database on import
+            env = dict(os.environ, DATABASE_URL=url)
+            result = subprocess.run(
+                [sys.executable, __file__, 'db-backends', '--worker'] + worker_args,
+                env=env, capture_output=True, text=True, cwd=tmpdir
+            )
+            if result.returncode != 0:
+                print(f"{name} failed:\n{result.stderr[-2000:]}")
+                return 1
+            results[name] = json.loads(result.stdout.strip().splitlines()[-1])
+
+    if not args.postgres_url:
+        print("No --postgres-url (or BENCHMARK_POSTGRES_URL) given; measuring SQLite only")
+    names = list(results)
+    rows = [("", "  ".join(name.rjust(22) for name in names))]
+    for key, label, fmt in BACKEND_METRICS:
+        rows.append((label, "  ".join(fmt.format(results[name][key]).rjust(22) for name in names)))
+    _report(f"Database backends ({args.rows:,} rows, {args.threads} crawl threads "
+            f"x {args.articles} articles)", rows)
+
+    lost = [name for name in names if results[name]['crawl_articles_lost'] or results[name]['read_errors']]
+    for name in lost:
+        print(f"\nFAIL: {name} lost writes or reads under concurrent crawling")
+    return 1 if lost else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    classifier_parser = subparsers.add_parser('classifier', help=benchmark_classifier.__doc__)
+    classifier_parser.add_argument('--test-size', type=float, default=0.25)
+    classifier_parser.add_argument('--repeat', type=int, default=20,
+                                   help='Times to repeat the test set for throughput timing')
+    classifier_parser.add_argument('--seed', type=int, default=42)
+    classifier_parser.set_defaults(func=benchmark_classifier)
+
+    ingestion_parser = subparsers.add_parser('excel-ingestion', help=benchmark_excel_ingestion.__doc__)
+    ingestion_parser.add_argument('--rows', type=int, default=100000)
+    ingestion_parser.add_argument('--seed', type=int, default=42)
+    ingestion_parser.set_defaults(func=benchmark_excel_ingestion)
+
+    startup_parser = subparsers.add_parser('startup', help=benchmark_startup.__doc__)
+    startup_parser.add_argument('--module', default='main', help='Module a web worker imports')
+    startup_parser.add_argument('--runs', type=int, default=5)
+    startup_parser.add_argument('--max-ms', type=float, default=1500,
+                                help='Fail if the median import time exceeds this')
+    startup_parser.add_argument('--top', type=int, default=10,
+                                help='Number of slowest imports to list')
+    startup_parser.set_defaults(func=benchmark_startup)
+
+    plans_parser = subparsers.add_parser('query-plans', help=benchmark_query_plans.__doc__)
+    plans_parser.add_argument('--rows', type=int, default=20000,
+                              help='Synthetic rows to seed a throwaway database with')
+    plans_parser.add_argument('--seed', type=int, default=42)
+    plans_parser.set_defaults(func=benchmark_query_plans)
+
+    backends_parser = subparsers.add_parser('db-backends', help=benchmark_db_backends.__doc__)
+    backends_parser.add_argument('--rows', type=int, default=20000)
+    backends_parser.add_argument('--seed', type=int, default=42)
+    backends_parser.add_argument('--threads', type=int, default=4, help='Concurrent crawl threads')
+    backends_parser.add_argument('--articles', type=int, default=100,
+                                 help='Articles each crawl thread commits')
+    backends_parser.add_argument('--postgres-url', default=os.environ.get('BENCHMARK_POSTGRES_URL'),
+                                 help='Scratch PostgreSQL database to compare against')
+    backends_parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    backends_parser.set_defaults(func=benchmark_db_backends)
+
+    args = parser.parse_args()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,268 @@
+"""
+Bulk insert-or-update for articles, projects and sources.
+Writes many rows per INSERT ... ON CONFLICT statement on PostgreSQL and
+SQLite and returns the ID of every row, whether it was inserted, updated or
+already stored, so imports and crawl batches need a handful of statements
+instead of an add and an existence query per row.
+"""
+
+import logging
+import datetime
+from collections import namedtuple
+
+from sqlalchemy import select
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Rows per INSERT statement
+CHUNK_SIZE = 500
+
+# Result of an upsert: ids[i] is the row ID of rows[i] (None only if it
+# couldn't be found), written[i] whether rows[i] was inserted or updated
+# rather than skipped as already stored
+UpsertResult = namedtuple('UpsertResult', ['ids', 'written'])
+
+
+def _insert_for(session):
+    """Return the dialect's insert() supporting ON CONFLICT"""
+    dialect = session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"Bulk upsert is not supported on {dialect}")
+    return insert
+
+
+def _column_default(column):
+    """Evaluate a column's Python-side default, or None"""
+    default = column.default
+    if default is None:
+        return None
+    if default.is_callable:
+        return default.arg(None)
+    if default.is_scalar:
+        return default.arg
+    return None
+
+
+def _normalize(table, rows):
+    """
+    Give every row the same keys, as multi-row INSERTs require
+
+    Keys missing from a row are filled with the column's default, or NULL.
+    """
+    keys = []
+    for row in rows:
+        for key in row:
+            if key not in keys:
+                keys.append(key)
+    unknown = [key for key in keys if key not in table.c]
+    if unknown:
+        raise ValueError(f"Unknown {table.name} columns: {', '.join(unknown)}")
+
+    normalized = []
+    for row in rows:
+        values = dict(row)
+        for key in keys:
+            if key not in values:
+                values[key] = _column_default(table.c[key])
+        normalized.append(values)
+    return normalized
+
+
+def upsert(model, rows, key, update=None, session=None, chunk_size=CHUNK_SIZE):
+    """
+    Insert rows, skipping or updating those whose key is already stored
+
+    Args:
+        model: Model class to write
+        rows: List of dicts of column values
+        key: Column with a unique index that identifies a row
+        update: Columns overwritten when the key is already stored; None
+            leaves stored rows untouched
+        session: SQLAlchemy session (default db.session); the caller commits
+        chunk_size: Rows per statement
+
+    Returns:
+        UpsertResult aligned with rows
+    """
+    if session is None:
+        from app import db
+        session = db.session
+    if not rows:
+        return UpsertResult([], [])
+
+    insert = _insert_for(session)
+    table = model.__table__
+    key_column = table.c[key]
+    rows = _normalize(table, rows)
+    if any(row.get(key) is None for row in rows):
+        raise ValueError(f"Every {table.name} row needs a {key}")
+
+    # A statement may not touch the same row twice; the last row per key wins
+    unique_rows = list({row[key]: row for row in rows}.values())
+
+    ids_by_key = {}
+    written_keys = set()
+    for start in range(0, len(unique_rows), chunk_size):
+        chunk = unique_rows[start:start + chunk_size]
+        statement = insert(table).values(chunk)
+        if update:
+            statement = statement.on_conflict_do_update(
+                index_elements=[key_column],
+                set_={column: statement.excluded[column] for column in update}
+            )
+        else:
+            statement = statement.on_conflict_do_nothing(index_elements=[key_column])
+        statement = statement.returning(table.c.id, key_column)
+        for row_id, row_key in session.execute(statement):
+            ids_by_key[row_key] = row_id
+            written_keys.add(row_key)
+
+    # Rows skipped as already stored return nothing; look their IDs up at once
+    missing = [row[key] for row in unique_rows if row[key] not in ids_by_key]
+    for start in range(0, len(missing), chunk_size):
+        chunk = missing[start:start + chunk_size]
+        for row_id, row_key in session.execute(
+                select(table.c.id, key_column).where(key_column.in_(chunk))):
+            ids_by_key[row_key] = row_id
+
+    logger.debug(f"Upserted {len(rows)} {table.name} rows, {len(written_keys)} written")
+    return UpsertResult([ids_by_key.get(row[key]) for row in rows],
+                        [row[key] in written_keys for row in rows])
+
+
+def accumulate(model, rows, keys, columns, session=None, chunk_size=CHUNK_SIZE):
+    """
+    Insert rows, adding their counts to the stored row with the same keys instead
+
+    Args:
+        model: Model class to write
+        rows: List of dicts of column values
+        keys: Columns of a unique index that identify a row
+        columns: Numeric columns summed into stored rows
+        session: SQLAlchemy session (default db.session); the caller commits
+        chunk_size: Rows per statement
+
+    Returns:
+        Number of distinct keys written
+    """
+    if session is None:
+        from app import db
+        session = db.session
+
+    # A statement may not touch the same row twice; sum rows sharing a key first
+    merged = {}
+    for row in rows:
+        key = tuple(row[k] for k in keys)
+        if key in merged:
+            for column in columns:
+                merged[key][column] = (merged[key][column] or 0) + (row.get(column) or 0)
+        else:
+            merged[key] = dict(row)
+    merged_rows = _normalize(model.__table__, list(merged.values()))
+
+    insert = _insert_for(session)
+    table = model.__table__
+    for start in range(0, len(merged_rows), chunk_size):
+        statement = insert(table).values(merged_rows[start:start + chunk_size])
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c[k] for k in keys],
+            set_={column: table.c[column] + statement.excluded[column] for column in columns}
+        )
+        session.execute(statement)
+    return len(merged_rows)
+
+
+def upsert_articles(rows, update=None, session=None):
+    """
+    Upsert NewsArticle rows by URL
+
+    A row's "content" is stored compressed in article_body, with its summary
+    on the article row. Bodies are written for inserted articles, and for
+    updated ones when "content" is among the update columns.
+    """
+    from app import db
+    from models import ArticleBody, NewsArticle
+    from article_store import compress_text, summarize
+
+    session = session or db.session
+    rows = [dict(row) for row in rows]
+    contents = [row.pop('content', None) for row in rows]
+    for row, content in zip(rows, contents):
+        if content is not None:
+            row['summary'] = summarize(content)
+    update_body = bool(update) and 'content' in update
+    if update:
+        update = [column for column in update if column != 'content']
+        if update_body and 'summary' not in update:
+            update.append('summary')
+
+    result = upsert(NewsArticle, rows, 'url', update, session)
+
+    bodies = {}
+    for article_id, written, content in zip(result.ids, result.written, contents):
+        if article_id is not None and written and content is not None:
+            codec, data = compress_text(content)
+            bodies[article_id] = {'article_id': article_id, 'codec': codec,
+                                  'size': len(content), 'data': data}
+    body_rows = list(bodies.values())
+    insert = _insert_for(session)
+    table = ArticleBody.__table__
+    for start in range(0, len(body_rows), CHUNK_SIZE):
+        statement = insert(table).values(body_rows[start:start + CHUNK_SIZE])
+        if update_body:
+            statement = statement.on_conflict_do_update(
+                index_elements=[table.c.article_id],
+                set_={column: statement.excluded[column] for column in ('codec', 'size', 'data')}
+            )
+        else:
+            statement = statement.on_conflict_do_nothing(index_elements=[table.c.article_id])
+        session.execute(statement)
+    return result
+
+
+def upsert_sources(rows, update=None, session=None):
+    """Upsert Source rows by URL"""
+    from models import Source
+    return upsert(Source, rows, 'url', update, session)
+
+
+def upsert_projects(rows, update=None, session=None):
+    """
+    Upsert Project rows by index
+
+    Rows without an index are numbered from one allocator reservation. Core
+    inserts bypass the model's write listeners, so the duplicate detection
+    keys and updated_at are filled in here.
+    """
+    from app import db
+    from models import Project
+    from index_allocator import project_index_allocator
+    from project_dedup import project_fingerprint
+
+    session = session or db.session
+    rows = [dict(row) for row in rows]
+    unnumbered = [row for row in rows if row.get('index') is None]
+    for row, index in zip(unnumbered, project_index_allocator.reserve(session, len(unnumbered))):
+        row['index'] = index
+
+    now = datetime.datetime.utcnow()
+    for row in rows:
+        row['fingerprint'], row['company_key'] = project_fingerprint(row)
+        row.setdefault('updated_at', now)
+
+    if update:
+        update = list(update) + [c for c in ('fingerprint', 'company_key', 'updated_at')
+                                 if c not in update]
+    return upsert(Project, rows, 'index', update, session)
+
+
+def model_row(obj):
+    """Return the column values of an unsaved model instance as an upsert row"""
+    return {column.key: getattr(obj, column.key)
+            for column in obj.__table__.columns
+            if column.key != 'id' and getattr(obj, column.key) is not None}
@@ -0,0 +1,406 @@
+"""
+Registry of known renewable energy companies with alias resolution.
+Collects company names from stored projects and the Excel corpora, derives
+aliases such as "Adani Green" for "Adani Green Energy Ltd", and compiles them
+into one token trie so every company mention in an article is found in a
+single pass and mapped to a canonical name.
+"""
+
+import os
+import re
+import glob
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import Counter
+
+from text_analysis import TermMatcher, TOKEN_PATTERN, as_document
+from compiled_model import source_fingerprint
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Cache of company names read from the Excel corpora
+CACHE_PATH = "company_registry.json"
+
+# Excel corpora and the columns (lowercase) that hold company names
+EXCEL_PATTERNS = ['india_renewable_projects_*.xlsx', 'training_data_*.xlsx']
+COMPANY_COLUMNS = ['company', 'developer / promoter', 'developer', 'owner', 'organization']
+
+# Well-known developers, always registered
+SEED_COMPANIES = [
+    'Adani Green', 'ReNew Power', 'Tata Power', 'NTPC', 'Greenko',
+    'JSW Energy', 'Azure Power', 'Hero Future Energies', 'Acme Solar',
+    'Avaada Energy', 'Amplus Solar', 'Cleantech Solar', 'Sembcorp',
+    'Suzlon', 'SB Energy', 'EDF Renewables', 'Inox Wind', 'SJVN',
+    'Reliance Power', 'Torrent Power', 'SECI', 'CLP India', 'Mytrah Energy'
+]
+
+# Legal-form suffixes dropped from canonical names
+LEGAL_SUFFIXES = {'ltd', 'limited', 'pvt', 'private', 'inc', 'llp', 'plc', 'co', 'company'}
+
+# Descriptive words that don't name a company on their own
+DESCRIPTOR_WORDS = {
+    'energy', 'energies', 'power', 'solar', 'renewables', 'renewable', 'green',
+    'wind', 'india', 'group', 'industries', 'technologies', 'solutions', 'global',
+    'corp', 'corporation'
+}
+
+# Trailing words that can be dropped to form a shorter alias. Words naming a
+# line of business (power, solar, wind, ...) stay, since "Tata Power Solar"
+# and "Tata Power" are different companies
+ALIAS_DESCRIPTOR_WORDS = {
+    'energy', 'energies', 'india', 'group', 'technologies', 'solutions', 'global',
+    'corp', 'corporation'
+}
+
+# Capitalized descriptors that continue a company name in running text
+DESCRIPTOR_SUFFIX = r'((?:\s+(?:' + '|'.join(sorted(word.capitalize() for word in DESCRIPTOR_WORDS)) + r'))+)(?!\w)'
+
+# Lowercase words allowed inside a company name
+CONNECTOR_WORDS = {'and', 'of', 'for', 'the', 'de'}
+
+# Names made only of these words are not companies
+GENERIC_WORDS = DESCRIPTOR_WORDS | LEGAL_SUFFIXES | {
+    'production', 'linked', 'incentive', 'project', 'projects', 'unknown', 'n', 'a', 'na',
+    'government', 'ministry', 'state', 'private', 'public', 'rooftop', 'photovoltaic',
+    'grid', 'connected', 'hybrid'
+}
+
+# Leading words that show a scraped phrase is not a company name
+NOISE_PREFIXES = {'for', 'by', 'from', 'with', 'and', 'of', 'in', 'at', 'about', 'read',
+                  'download', 'ceo', 'chairman', 'md'}
+
+MAX_NAME_WORDS = 6
+
+# Seconds between checks for changed Excel corpora or stored project companies
+REFRESH_CHECK_INTERVAL = 300
+
+
+def clean_company_name(name):
+    """
+    Normalize a raw company string to its canonical form
+
+    Drops parenthetical notes and legal suffixes. Returns None for values that
+    don't look like a company name (sentences, generic phrases, blanks).
+    """
+    if name is None:
+        return None
+    name = re.sub(r'\([^)]*\)?', ' ', str(name))
+    # Keep the first party of joint ventures and lists
+    name = re.split(r'\s*(?:&|,|/|;)\s*(?=[A-Z])', name)[0]
+    words = name.replace('.', ' ').split()
+    while words and words[-1].lower() in LEGAL_SUFFIXES:
+        words.pop()
+    if words and words[0].lower() == 'the':
+        words = words[1:]
+
+    if not words or len(words) > MAX_NAME_WORDS:
+        return None
+    if words[0].lower() in NOISE_PREFIXES:
+        return None
+    if any(word.islower() and word not in CONNECTOR_WORDS for word in words):
+        return None
+    if all(word.lower() in GENERIC_WORDS for word in words):
+        return None
+    return ' '.join(words)
+
+
+def company_aliases(name, min_words=2):
+    """
+    Return the shorter forms a company is commonly mentioned by, longest first
+
+    Aliases keep at least min_words words: a bare first word like "Reliance"
+    or "Adani" is shared by several companies.
+    """
+    words = name.split()
+    aliases = []
+    while len(words) > min_words and words[-1].lower() in ALIAS_DESCRIPTOR_WORDS:
+        words = words[:-1]
+        aliases.append(' '.join(words))
+    return aliases
+
+
+def load_excel_companies(excel_files=None):
+    """Read every company name from the company columns of the Excel corpora"""
+    import pandas as pd
+
+    if excel_files is None:
+        excel_files = sorted({f for pattern in EXCEL_PATTERNS for f in glob.glob(pattern)})
+
+    names = []
+    for excel_file in excel_files:
+        try:
+            sheets = pd.read_excel(excel_file, sheet_name=None)
+        except Exception as e:
+            logger.error(f"Error reading Excel file {excel_file}: {e}")
+            continue
+        for df in sheets.values():
+            columns = {str(col).strip().lower(): col for col in df.columns}
+            for column in COMPANY_COLUMNS:
+                if column in columns:
+                    names.extend(df[columns[column]].dropna().astype(str).str.strip())
+    return names
+
+
+def load_project_companies():
+    """Read the distinct company names of stored projects; requires an application context"""
+    from app import db
+    from models import Project
+
+    rows = db.session.query(Project.company).distinct().all()
+    return [company for (company,) in rows if company]
+
+
+def project_company_count():
+    """Count the distinct company names of stored projects; requires an application context"""
+    from app import db
+    from models import Project
+
+    return db.session.query(db.func.count(db.distinct(Project.company))).scalar()
+
+
+class CompanyRegistry:
+    """
+    Canonical company names with their aliases, matched in one trie pass.
+
+    The fullest registered spelling of a company is its canonical name and
+    shorter multi-word forms ("Adani Green" for "Adani Green Energy") are its
+    aliases. Aliases claimed by more than one company are dropped, so a
+    mention only resolves when it is unambiguous.
+    """
+
+    def __init__(self, names=()):
+        """Initialize the registry from raw company names"""
+        self.companies = {}
+        self._aliases = {}
+        self._matcher = None
+        self._version = None
+        # What the registry was built from, for noticing when to rebuild
+        self.sources = None
+        self.add_all(names)
+
+    def __len__(self):
+        return len(self.companies)
+
+    @property
+    def version(self):
+        """Content hash of the names and aliases, for keying cached extractions"""
+        if self._version is None:
+            digest = hashlib.sha1()
+            for alias_key, name in sorted(self._aliases.items()):
+                if name:
+                    digest.update(f"{alias_key}\x1f{name}\x1e".encode('utf-8'))
+            self._version = digest.hexdigest()[:16]
+        return self._version
+
+    def add_all(self, names):
+        """Register raw company names; among equally long spellings the most frequent comes first"""
+        spellings = Counter()
+        for name in names:
+            cleaned = clean_company_name(name)
+            if cleaned:
+                spellings[cleaned] += 1
+
+        # Longer names first, so they become canonical and shorter forms their aliases
+        for cleaned, _ in sorted(spellings.most_common(), key=lambda item: -len(item[0].split())):
+            self.add(cleaned)
+
+    def add(self, name):
+        """Register a cleaned company name and return its canonical name"""
+        key = _key(name)
+        known = self._aliases.get(key)
+        if known:
+            return known
+
+        self.companies[key] = name
+        self._aliases[key] = name
+        for alias in company_aliases(name):
+            alias_key = _key(alias)
+            if alias_key in self.companies and self._aliases.get(alias_key) == self.companies[alias_key]:
+                # "Adani Green" was registered first; "Adani Green Energy" is its full name
+                self._absorb(alias_key, name)
+            else:
+                self._claim(alias_key, name)
+        self._matcher = None
+        self._version = None
+        return name
+
+    def _absorb(self, short_key, name):
+        """Make a registered shorter company an alias of its fuller name"""
+        short_name = self.companies.pop(short_key)
+        for alias_key, target in list(self._aliases.items()):
+            if target == short_name:
+                self._aliases[alias_key] = name
+
+    def _claim(self, alias_key, name):
+        """Point an alias at a company, marking it ambiguous if already taken"""
+        existing = self._aliases.get(alias_key)
+        if existing is None:
+            self._aliases[alias_key] = name
+        elif existing and existing != name and alias_key not in self.companies:
+            self._aliases[alias_key] = False
+        self._matcher = None
+        self._version = None
+
+    @property
+    def matcher(self):
+        """Token trie over every unambiguous name and alias, built lazily"""
+        if self._matcher is None:
+            matcher = TermMatcher()
+            for alias_key, name in self._aliases.items():
+                if name:
+                    matcher.add(alias_key, name)
+            self._matcher = matcher
+        return self._matcher
+
+    def find(self, text):
+        """
+        Find every company mention in a text or Document
+
+        Returns:
+            List of canonical names in document order, one per mention
+        """
+        doc = as_document(text)
+        matches = sorted(self.matcher.find(doc.token_list), key=lambda m: (m[0], m[0] - m[1]))
+
+        mentions = []
+        covered = 0
+        for start, end, name in matches:
+            if start < covered:
+                continue
+            mentions.append(name)
+            covered = end
+        return mentions
+
+    def match(self, text):
+        """Return the most mentioned company in a text, earliest first on ties, or None"""
+        mentions = self.find(text)
+        if not mentions:
+            return None
+        counts = Counter(mentions)
+        name = max(counts, key=lambda name: (counts[name], -mentions.index(name)))
+        return self._full_mention(name, as_document(text).text)
+
+    def _full_mention(self, name, text):
+        """
+        Return the fuller name a text spells a company by
+
+        "Reliance Industries" in an article is a different company from a
+        registered "Reliance", not a mention of it.
+        """
+        match = re.search(r'(?<!\w)' + re.escape(name) + DESCRIPTOR_SUFFIX, text)
+        if not match:
+            return name
+        return self.canonical(name + match.group(1))
+
+    def canonical(self, name):
+        """
+        Map a company name to its canonical registry name
+
+        Falls back to the cleaned name for companies the registry doesn't know.
+        """
+        cleaned = clean_company_name(name)
+        if not cleaned:
+            return name
+        resolved = self._aliases.get(_key(cleaned))
+        if resolved:
+            return resolved
+        # An unregistered longer spelling of a company, like "NTPC Green Energy Solutions"
+        for alias in company_aliases(cleaned):
+            parent = self._aliases.get(_key(alias))
+            if parent:
+                return parent
+        return cleaned
+
+
+def _key(name):
+    """Token-normalized lookup key for a name"""
+    return ' '.join(TOKEN_PATTERN.findall(name.lower()))
+
+
+def _excel_fingerprint():
+    """Fingerprint of the Excel corpora the registry reads"""
+    return source_fingerprint(sorted({f for pattern in EXCEL_PATTERNS for f in glob.glob(pattern)}))
+
+
+def _registry_sources(include_projects):
+    """Return (Excel fingerprint, distinct project company count) a registry is built from"""
+    company_count = None
+    if include_projects:
+        try:
+            company_count = project_company_count()
+        except Exception as e:
+            logger.debug(f"Skipping stored project companies: {e}")
+    return _excel_fingerprint(), company_count
+
+
+def _cached_excel_companies():
+    """Return Excel company names, re-reading the corpora only when they change"""
+    excel_files = sorted({f for pattern in EXCEL_PATTERNS for f in glob.glob(pattern)})
+    fingerprint = source_fingerprint(excel_files)
+
+    if os.path.exists(CACHE_PATH):
+        try:
+            with open(CACHE_PATH, 'r') as f:
+                cached = json.load(f)
+            if cached.get('sources') == fingerprint:
+                return cached['names']
+        except Exception as e:
+            logger.warning(f"Could not read company registry cache: {e}")
+
+    names = load_excel_companies(excel_files)
+    try:
+        with open(CACHE_PATH, 'w') as f:
+            json.dump({'sources': fingerprint, 'names': names}, f)
+    except OSError as e:
+        logger.warning(f"Could not write company registry cache: {e}")
+    return names
+
+
+def build_company_registry(include_projects=True):
+    """Build a registry from the seed list, the Excel corpora and stored projects"""
+    sources = _registry_sources(include_projects)
+    names = list(SEED_COMPANIES)
+    names.extend(_cached_excel_companies())
+
+    if include_projects:
+        try:
+            names.extend(load_project_companies())
+        except Exception as e:
+            logger.debug(f"Skipping stored project companies: {e}")
+
+    registry = CompanyRegistry(names)
+    registry.sources = sources
+    logger.info(f"Built company registry with {len(registry)} companies")
+    return registry
+
+
+_registry = None
+_last_check = 0.0
+_registry_lock = threading.Lock()
+
+
+def get_company_registry():
+    """
+    Return the process-wide company registry, building it on first use
+
+    Rebuilds it when the Excel corpora or the set of stored project companies
+    changed, checked at most every REFRESH_CHECK_INTERVAL seconds.
+    """
+    global _registry, _last_check
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = build_company_registry()
+                _last_check = time.monotonic()
+    elif time.monotonic() - _last_check >= REFRESH_CHECK_INTERVAL:
+        with _registry_lock:
+            if time.monotonic() - _last_check >= REFRESH_CHECK_INTERVAL:
+                _last_check = time.monotonic()
+                if _registry_sources(True) != _registry.sources:
+                    logger.info("Company sources changed, rebuilding company registry")
+                    _registry = build_company_registry()
+    return _registry
@@ -0,0 +1,439 @@
+"""
+Compiled binary artifact for trained project type detection state.
+Serializes the trainer's vocabulary, term weights, metrics and the term
+matcher's trie into a compact file that is memory-mapped on load and only
+rebuilt when the training sources (training_data.json and the Excel files)
+change.
+"""
+
+import os
+import json
+import mmap
+import zlib
+import struct
+import hashlib
+import logging
+from array import array
+from bisect import bisect_left
+from datetime import datetime
+
+from text_analysis import TOKEN_PATTERN, TermMatcher, as_document
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+ARTIFACT_PATH = "training_model.bin"
+
+MAGIC = b'RETM'
+FORMAT_VERSION = 2
+# Magic, format version, header length
+PREAMBLE = struct.Struct('<4sHI')
+
+# Term kinds stored per vocabulary entry
+KIND_KEYWORD = 0
+KIND_PHRASE = 1
+
+MIN_CATEGORY_KEYWORDS = 3
+MAX_ENHANCED_SCORE = 0.95
+
+
+def source_fingerprint(paths):
+    """Return [path, mtime_ns, size] for each existing source file"""
+    fingerprint = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        fingerprint.append([path, stat.st_mtime_ns, stat.st_size])
+    return fingerprint
+
+
+def _pad(buffer, alignment=4):
+    """Pad a bytearray with zeros to the given alignment"""
+    buffer.extend(b'\0' * (-len(buffer) % alignment))
+
+
+def _raw(values):
+    """Return the bytes of an array or memoryview"""
+    return values.tobytes()
+
+
+class TermTable:
+    """Sequence of vocabulary terms decoded from the artifact on access"""
+
+    def __init__(self, offsets, blob):
+        """Initialize from term end offsets and the UTF-8 term blob"""
+        self.offsets = offsets
+        self.blob = blob
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return bytes(self.blob[self.offsets[index]:self.offsets[index + 1]]).decode('utf-8')
+
+
+class FlatTrie:
+    """
+    Token trie flattened into arrays and matched in place.
+
+    Node n owns edges node_edges[n]:node_edges[n + 1], sorted by token id, and
+    term ids node_values[n]:node_values[n + 1]. Tokens are resolved to ids
+    through an open-addressing table of crc32 hashes. The arrays are either
+    in memory or views into the memory-mapped artifact, so loading a model
+    never rebuilds the trie.
+    """
+
+    # Integer arrays in the order they are stored in the artifact
+    ARRAYS = ('node_edges', 'edge_tokens', 'edge_children', 'node_values',
+              'values', 'slots', 'token_offsets')
+
+    def __init__(self, node_edges, edge_tokens, edge_children, node_values,
+                 values, slots, token_offsets, token_blob):
+        """Initialize from the flattened arrays"""
+        self.node_edges = node_edges
+        self.edge_tokens = edge_tokens
+        self.edge_children = edge_children
+        self.node_values = node_values
+        self.values = values
+        self.slots = slots
+        self.token_offsets = token_offsets
+        self.token_blob = token_blob
+
+    @classmethod
+    def build(cls, terms):
+        """Flatten a TermMatcher over the terms, using term indexes as values"""
+        matcher = TermMatcher()
+        for term_id, term in enumerate(terms):
+            matcher.add(term, term_id)
+
+        tokens = sorted({token for term in terms for token in TOKEN_PATTERN.findall(term.lower())})
+        token_ids = {token: index for index, token in enumerate(tokens)}
+
+        node_edges, edge_tokens, edge_children = array('I', [0]), array('I'), array('I')
+        node_values, values = array('I', [0]), array('I')
+        # Breadth-first, so each node's children get consecutive ids
+        nodes = [matcher.root]
+        for node in nodes:
+            for token in sorted((k for k in node if k is not matcher._TERMINAL), key=token_ids.get):
+                edge_tokens.append(token_ids[token])
+                edge_children.append(len(nodes))
+                nodes.append(node[token])
+            node_edges.append(len(edge_tokens))
+            values.extend(node.get(matcher._TERMINAL, ()))
+            node_values.append(len(values))
+
+        slot_count = 1
+        while slot_count < 2 * len(tokens):
+            slot_count *= 2
+        slots = array('I', [0]) * slot_count
+        token_offsets, token_blob = array('I', [0]), bytearray()
+        for index, token in enumerate(tokens):
+            encoded = token.encode('utf-8')
+            token_blob.extend(encoded)
+            token_offsets.append(len(token_blob))
+            slot = zlib.crc32(encoded) & (slot_count - 1)
+            while slots[slot]:
+                slot = (slot + 1) & (slot_count - 1)
+            # Zero marks an empty slot
+            slots[slot] = index + 1
+
+        return cls(node_edges, edge_tokens, edge_children, node_values,
+                   values, slots, token_offsets, bytes(token_blob))
+
+    @property
+    def counts(self):
+        """Lengths of the integer arrays, for the artifact header"""
+        return [len(getattr(self, name)) for name in self.ARRAYS]
+
+    def token_id(self, token):
+        """Return the id of a token, or None if no term contains it"""
+        encoded = token.encode('utf-8')
+        mask = len(self.slots) - 1
+        slot = zlib.crc32(encoded) & mask
+        while self.slots[slot]:
+            index = self.slots[slot] - 1
+            if self.token_blob[self.token_offsets[index]:self.token_offsets[index + 1]] == encoded:
+                return index
+            slot = (slot + 1) & mask
+        return None
+
+    def child(self, node, token_id):
+        """Return the node reached from node over token_id, or None"""
+        hi = self.node_edges[node + 1]
+        edge = bisect_left(self.edge_tokens, token_id, self.node_edges[node], hi)
+        if edge < hi and self.edge_tokens[edge] == token_id:
+            return self.edge_children[edge]
+        return None
+
+    def find(self, tokens):
+        """
+        Find all term occurrences in a token list
+
+        Returns:
+            List of (start_token, end_token, term_id) tuples
+        """
+        ids = {}
+        for token in tokens:
+            if token not in ids:
+                ids[token] = self.token_id(token)
+        token_ids = [ids[token] for token in tokens]
+
+        child, node_values, values = self.child, self.node_values, self.values
+        matches = []
+        for start, token_id in enumerate(token_ids):
+            if token_id is None:
+                continue
+            node = child(0, token_id)
+            end = start + 1
+            while node is not None:
+                for i in range(node_values[node], node_values[node + 1]):
+                    matches.append((start, end, values[i]))
+                if end >= len(token_ids) or token_ids[end] is None:
+                    break
+                node = child(node, token_ids[end])
+                end += 1
+        return matches
+
+    def find_values(self, text):
+        """Return the set of term ids for every term found in a text or Document"""
+        doc = as_document(text)
+        return {value for _, _, value in self.find(doc.token_list)}
+
+
+class CompiledModel:
+    """
+    Read-only compiled view of the trainer state.
+
+    The vocabulary, categories and weights live in flat arrays backed by a
+    memory-mapped file, so every process loading the same artifact shares the
+    same pages. A loaded model matches terms against the trie stored in the
+    artifact; a freshly compiled one flattens its trie on first use.
+    """
+
+    def __init__(self, categories, terms, term_categories, weights, kinds, metrics=None,
+                 keyword_counts=None, sources=None, version=None, built_at=None):
+        """Initialize from vocabulary terms and parallel category/weight/kind arrays"""
+        self.categories = categories
+        self.terms = terms
+        self.term_categories = term_categories
+        self.weights = weights
+        self.kinds = kinds
+        self.metrics = metrics or {}
+        self.keyword_counts = keyword_counts or {}
+        self.sources = sources or []
+        self.version = version
+        self.built_at = built_at
+        self._matcher = None
+        self._mmap = None
+
+    def __bool__(self):
+        return bool(self.terms)
+
+    @classmethod
+    def from_trainer(cls, trainer, sources=None):
+        """Compile a ProjectTypeTrainer's weighted vocabulary and metrics"""
+        terms, term_categories, weights, kinds = [], array('B'), array('f'), array('B')
+        vocabulary = trainer.vocabulary()
+        categories = sorted(vocabulary)
+
+        for index, category in enumerate(categories):
+            for kind, entries in ((KIND_KEYWORD, vocabulary[category]['keywords']),
+                                  (KIND_PHRASE, vocabulary[category]['phrases'])):
+                for term, weight in entries:
+                    terms.append(term)
+                    term_categories.append(index)
+                    weights.append(weight)
+                    kinds.append(kind)
+
+        model = cls(
+            categories, terms, term_categories, weights, kinds,
+            metrics={k: dict(v) for k, v in trainer.category_metrics.items()},
+            keyword_counts={k: len(v) for k, v in trainer.category_keywords.items()},
+            sources=source_fingerprint(sources or []),
+            built_at=datetime.now().isoformat()
+        )
+        model.version = model._compute_version()
+        return model
+
+    def _compute_version(self):
+        """Content hash identifying this compiled model"""
+        digest = hashlib.sha1()
+        digest.update('\x1f'.join(self.terms).encode('utf-8'))
+        digest.update(array('B', self.term_categories).tobytes())
+        digest.update(array('f', self.weights).tobytes())
+        digest.update(json.dumps(self.metrics, sort_keys=True).encode('utf-8'))
+        return digest.hexdigest()[:16]
+
+    @property
+    def matcher(self):
+        """Flattened token trie over the vocabulary"""
+        if self._matcher is None:
+            self._matcher = FlatTrie.build(self.terms)
+        return self._matcher
+
+    def is_stale(self, sources):
+        """Check whether any training source changed since the model was built"""
+        return source_fingerprint(sources) != self.sources
+
+    def match_terms(self, text):
+        """Return the ids of every vocabulary term present in a text or Document"""
+        return self.matcher.find_values(as_document(text))
+
+    def enhance_scores(self, text, current_scores=None):
+        """
+        Combine rule-based scores with trained keyword evidence
+
+        Args:
+            text: The article text or a text_analysis.Document
+            current_scores: Optional dict of current scores from regular detection
+
+        Returns:
+            Dict of enhanced scores for each project type
+        """
+        enhanced_scores = dict(current_scores or {})
+        category_scores = {}
+
+        for term_id in self.match_terms(text):
+            category = self.categories[self.term_categories[term_id]]
+            category_scores[category] = category_scores.get(category, 0.0) + self.weights[term_id]
+
+        for category, score in category_scores.items():
+            # Skip if we don't have enough training data
+            if self.keyword_counts.get(category, 0) < MIN_CATEGORY_KEYWORDS:
+                continue
+            existing_score = enhanced_scores.get(category, 0.0)
+            enhanced_scores[category] = round(min(MAX_ENHANCED_SCORE, existing_score + score), 4)
+
+        return enhanced_scores
+
+    def get_training_results(self):
+        """Summarize the compiled vocabulary in the trainer's results format"""
+        results = {category: {'keywords': [], 'phrases': [], 'metrics': self.metrics.get(category, {})}
+                   for category in self.categories}
+        for term_id, term in enumerate(self.terms):
+            category = self.categories[self.term_categories[term_id]]
+            key = 'keywords' if self.kinds[term_id] == KIND_KEYWORD else 'phrases'
+            results[category][key].append(term)
+        return results
+
+    def save(self, path=ARTIFACT_PATH):
+        """Write the model atomically as a compact binary artifact"""
+        trie = self.matcher
+        blob = bytearray()
+        offsets = array('I', [0])
+        for term in self.terms:
+            blob.extend(term.encode('utf-8'))
+            offsets.append(len(blob))
+
+        header = json.dumps({
+            'version': self.version,
+            'built_at': self.built_at,
+            'sources': self.sources,
+            'categories': self.categories,
+            'keyword_counts': self.keyword_counts,
+            'metrics': self.metrics,
+            'term_count': len(self.terms),
+            'trie_counts': trie.counts
+        }).encode('utf-8')
+
+        data = bytearray(PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header)))
+        data.extend(header)
+        _pad(data)
+        data.extend(offsets.tobytes())
+        data.extend(array('f', self.weights).tobytes())
+        for name in FlatTrie.ARRAYS:
+            data.extend(_raw(getattr(trie, name)))
+        data.extend(array('B', self.term_categories).tobytes())
+        data.extend(array('B', self.kinds).tobytes())
+        data.extend(trie.token_blob)
+        data.extend(blob)
+
+        tmp_path = f"{path}.tmp.{os.getpid()}"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        logger.info(f"Saved compiled training model {self.version} to {path} ({len(data)} bytes)")
+
+    @classmethod
+    def load(cls, path=ARTIFACT_PATH):
+        """Memory-map a compiled artifact"""
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        view = memoryview(mapped)
+        magic, format_version, header_len = PREAMBLE.unpack_from(view, 0)
+        if magic != MAGIC or format_version != FORMAT_VERSION:
+            view.release()
+            mapped.close()
+            raise ValueError(f"Unsupported training model artifact: {path}")
+
+        pos = PREAMBLE.size
+        header = json.loads(bytes(view[pos:pos + header_len]).decode('utf-8'))
+        pos += header_len
+        pos += -pos % 4
+
+        count = header['term_count']
+        offsets = view[pos:pos + 4 * (count + 1)].cast('I')
+        pos += 4 * (count + 1)
+        weights = view[pos:pos + 4 * count].cast('f')
+        pos += 4 * count
+        trie_arrays = []
+        for length in header['trie_counts']:
+            trie_arrays.append(view[pos:pos + 4 * length].cast('I'))
+            pos += 4 * length
+        term_categories = view[pos:pos + count]
+        pos += count
+        kinds = view[pos:pos + count]
+        pos += count
+        token_offsets = trie_arrays[FlatTrie.ARRAYS.index('token_offsets')]
+        token_blob = view[pos:pos + token_offsets[-1]]
+        pos += token_offsets[-1]
+        blob = view[pos:]
+
+        model = cls(
+            header['categories'], TermTable(offsets, blob), term_categories, weights, kinds,
+            metrics=header['metrics'],
+            keyword_counts=header['keyword_counts'],
+            sources=header['sources'],
+            version=header['version'],
+            built_at=header['built_at']
+        )
+        model._matcher = FlatTrie(*trie_arrays, token_blob)
+        model._mmap = mapped
+        return model
+
+
+def load_or_build(sources, build_trainer, path=ARTIFACT_PATH):
+    """
+    Load the compiled artifact, rebuilding it only if a source file changed
+
+    Args:
+        sources: Paths of the files the model is trained from
+        build_trainer: Callable returning a ProjectTypeTrainer with the sources applied
+        path: Location of the compiled artifact
+
+    Returns:
+        CompiledModel instance
+    """
+    if os.path.exists(path):
+        try:
+            model = CompiledModel.load(path)
+            if not model.is_stale(sources):
+                logger.info(f"Loaded compiled training model {model.version} from {path}")
+                return model
+            logger.info("Training sources changed, rebuilding compiled model")
+        except Exception as e:
+            logger.warning(f"Could not load compiled training model {path}: {e}")
+
+    trainer = build_trainer()
+    # Fingerprint after training, since processing rewrites training_data.json
+    model = CompiledModel.from_trainer(trainer, sources)
+    try:
+        model.save(path)
+    except OSError as e:
+        logger.error(f"Error saving compiled training model: {e}")
+    return model
@@ -2,9 +2,14 @@ import os
 import pandas as pd
 import logging
 import datetime
+from collections import defaultdict
 from app import db
 from models import Project, Source, NewsArticle, ScrapeLog
 from data_processor import clean_project_name
+from project_dedup import company_key, duplicates, find_duplicate
+from index_allocator import project_index_allocator
+from bulk_upsert import upsert_projects, upsert_sources
+from project_summary import compact_summary
 
 logger = logging.getLogger(__name__)
 
@@ -114,6 +119,19 @@ def export_to_excel():
         logger.error(f"Error exporting to Excel: {str(e)}")
         raise
 
+def _explicit_index(value):
+    """Return a spreadsheet Index cell as an int, or None when it's blank"""
+    try:
+        return None if pd.isna(value) else int(value)
+    except (TypeError, ValueError):
+        return None
+
+def _imported_duplicate(record, imported_by_company):
+    """Return a project imported earlier from the same file that duplicates record, or None"""
+    for project in imported_by_company.get(company_key(record.get('company')), []):
+        if duplicates(record, project):
+            return project
+    return None
 
 def import_from_excel(excel_file):
     """Import data from Excel file"""
@@ -125,26 +143,23 @@ def import_from_excel(excel_file):
         battery_df = pd.read_excel(excel_file, sheet_name=BATTERY_SHEET)
         sources_df = pd.read_excel(excel_file, sheet_name=SOURCES_SHEET)
         
-        # Import sources
-        sources_added = 0
+        # Import sources; existing URLs are left as they are
+        source_rows = []
         for _, row in sources_df.iterrows():
             url = row.get('Source URL')
             if not url or not isinstance(url, str):
                 continue
-                
-            # Check if source exists
-            existing_source = Source.query.filter_by(url=url).first()
-            if not existing_source:
-                new_source = Source(
-                    url=url,
-                    name=row.get('Name'),
-                    description=row.get('Description'),
-                    status=row.get('Status')
-                )
-                db.session.add(new_source)
-                sources_added += 1
+            source_rows.append({
+                'url': url,
+                'name': row.get('Name'),
+                'description': row.get('Description'),
+                'status': row.get('Status')
+            })
+        sources_added = sum(upsert_sources(source_rows).written)
         
-        db.session.commit()
+        # Projects added by this import, written together at the end
+        imported_projects = []
+        imported_by_company = defaultdict(list)
         
         # Import solar projects
         solar_added = 0
@@ -155,12 +170,18 @@ def import_from_excel(excel_file):
             if not name or not isinstance(name, str):
                 continue
                 
-            # Check if project exists
-            existing_project = Project.query.filter(
-                Project.name.ilike(f"%{name}%"),
-                Project.company.ilike(f"%{company}%") if company else True,
-                Project.type == 'Solar'
-            ).first()
+            # Check if project exists, in the database or earlier in this file
+            record = {
+                'type': 'Solar',
+                'name': name,
+                'company': company,
+                'state': row.get('State'),
+                'cell_capacity': row.get('Cell Capacity (GW)'),
+                'module_capacity': row.get('Module Capacity (GW)'),
+                'integration_capacity': row.get('Integration Capacity (GW)')
+            }
+            existing_project = (find_duplicate(record)
+                                or _imported_duplicate(record, imported_by_company))
             
             if not existing_project:
                 # Parse dates
@@ -174,8 +195,8 @@ def import_from_excel(excel_file):
                 except:
                     last_updated = datetime.datetime.now().date()
                 
-                new_project = Project(
-                    index=row.get('Index'),
+                new_project = dict(
+                    index=_explicit_index(row.get('Index')),
                     type='Solar',
                     name=name,
                     company=row.get('Company'),
@@ -201,7 +222,8 @@ def import_from_excel(excel_file):
                     last_updated=last_updated,
                     source=row.get('Source')
                 )
-                db.session.add(new_project)
+                imported_projects.append(new_project)
+                imported_by_company[company_key(company)].append(new_project)
                 solar_added += 1
         
         # Import battery projects
@@ -213,12 +235,18 @@ def import_from_excel(excel_file):
             if not name or not isinstance(name, str):
                 continue
                 
-            # Check if project exists
-            existing_project = Project.query.filter(
-                Project.name.ilike(f"%{name}%"),
-                Project.company.ilike(f"%{company}%") if company else True,
-                Project.type == 'Battery'
-            ).first()
+            # Check if project exists, in the database or earlier in this file
+            record = {
+                'type': 'Battery',
+                'name': name,
+                'company': company,
+                'state': row.get('State'),
+                'cell_capacity': row.get('Cell Capacity (GWh)'),
+                'module_capacity': row.get('Module Capacity (GWh)'),
+                'integration_capacity': row.get('Integration Capacity (GWh)')
+            }
+            existing_project = (find_duplicate(record)
+                                or _imported_duplicate(record, imported_by_company))
             
             if not existing_project:
                 # Parse dates
@@ -232,8 +260,8 @@ def import_from_excel(excel_file):
                 except:
                     last_updated = datetime.datetime.now().date()
                 
-                new_project = Project(
-                    index=row.get('Index'),
+                new_project = dict(
+                    index=_explicit_index(row.get('Index')),
                     type='Battery',
                     name=name,
                     company=row.get('Company'),
@@ -259,10 +287,26 @@ def import_from_excel(excel_file):
                     last_updated=last_updated,
                     source=row.get('Source')
                 )
-                db.session.add(new_project)
+                imported_projects.append(new_project)
+                imported_by_company[company_key(company)].append(new_project)
                 battery_added += 1
         
+        # Keep spreadsheet indices that are free; the rest are numbered on insert
+        explicit = {p['index'] for p in imported_projects if p['index'] is not None}
+        taken = {index for (index,) in
+                 db.session.query(Project.index).filter(Project.index.in_(explicit))} if explicit else set()
+        for project in imported_projects:
+            if project['index'] in taken:
+                project['index'] = None
+            elif project['index'] is not None:
+                taken.add(project['index'])
+        kept = [p['index'] for p in imported_projects if p['index'] is not None]
+        if kept:
+            project_index_allocator.advance_to(db.session, max(kept))
+        upsert_projects(imported_projects)
+        
         db.session.commit()
+        compact_summary()
         
         message = f"Import complete: Added {sources_added} sources, {solar_added} solar projects, and {battery_added} battery projects."
         logger.info(message)
@@ -0,0 +1,183 @@
+"""
+Embedded SQLite mode for edge and offline deployments.
+Without DATABASE_URL the tracker runs on a local SQLite file tuned for a web
+server with crawl threads: write-ahead logging so readers never block the
+writer, synchronous=NORMAL, a memory-mapped file and a busy timeout. Writes of
+all threads go through a single-writer queue, so they take turns in arrival
+order instead of failing with "database is locked".
+"""
+
+import os
+import re
+import sqlite3
+import logging
+import threading
+from collections import deque
+
+from sqlalchemy import event
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Database file used when DATABASE_URL isn't set
+SQLITE_PATH = os.environ.get("SQLITE_PATH", "project_tracker.db")
+
+# Milliseconds a writer waits for its turn, in the queue and on the file lock
+BUSY_TIMEOUT_MS = int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", "10000"))
+
+# Bytes of the database file memory-mapped for reads
+MMAP_SIZE = int(os.environ.get("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+
+# Statements that need SQLite's write lock
+WRITE_PATTERN = re.compile(r'^\s*(INSERT|UPDATE|DELETE|REPLACE|CREATE|DROP|ALTER)\b', re.IGNORECASE)
+
+
+def database_url():
+    """Return DATABASE_URL, or the URL of the embedded SQLite file"""
+    url = os.environ.get("DATABASE_URL")
+    if url:
+        return url
+    return f"sqlite:///{os.path.abspath(SQLITE_PATH)}"
+
+
+def is_sqlite(url):
+    return (url or "").startswith("sqlite")
+
+
+class WriterQueue:
+    """
+    First-come, first-served lock held by one connection's write transaction.
+
+    A connection joins the queue at its first write statement and leaves it
+    when its transaction commits or rolls back. Waiting longer than the busy
+    timeout raises the same error SQLite would, so a stuck writer can't hang
+    the crawl.
+    """
+
+    def __init__(self, timeout=BUSY_TIMEOUT_MS / 1000):
+        """Initialize an idle queue"""
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._owner = None
+        self._waiters = deque()
+
+    def holds(self, connection):
+        return self._owner is connection
+
+    def acquire(self, connection):
+        """Wait until connection may write"""
+        with self._lock:
+            if self._owner is connection:
+                return
+            if self._owner is None and not self._waiters:
+                self._owner = connection
+                return
+            turn = threading.Event()
+            self._waiters.append((connection, turn))
+
+        if turn.wait(self.timeout):
+            return
+        with self._lock:
+            if turn.is_set():
+                return
+            self._waiters.remove((connection, turn))
+        raise sqlite3.OperationalError("database is locked (timed out waiting in the writer queue)")
+
+    def release(self, connection):
+        """Hand the write lock to the next connection in line, if connection holds it"""
+        with self._lock:
+            if self._owner is not connection:
+                return
+            if self._waiters:
+                self._owner, turn = self._waiters.popleft()
+                turn.set()
+            else:
+                self._owner = None
+
+
+# Create a global instance for easy import
+writer_queue = WriterQueue()
+
+
+class QueuedConnection(sqlite3.Connection):
+    """sqlite3 connection that leaves the writer queue when its transaction ends"""
+
+    def commit(self):
+        try:
+            super().commit()
+        finally:
+            writer_queue.release(self)
+
+    def rollback(self):
+        try:
+            super().rollback()
+        finally:
+            writer_queue.release(self)
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            writer_queue.release(self)
+
+
+def engine_options(url):
+    """
+    Return SQLALCHEMY_ENGINE_OPTIONS for a database URL
+
+    Server databases get a connection pool sized for the web workers; the
+    embedded SQLite file gets connections that may move between threads and
+    join the writer queue.
+    """
+    if not is_sqlite(url):
+        return {
+            "pool_recycle": 300,
+            "pool_pre_ping": True,
+            "pool_timeout": 30,  # Timeout for getting a connection from the pool
+            "max_overflow": 10,  # Maximum number of connections to overflow from the pool
+            "pool_size": 5       # The size of the connection pool
+        }
+    return {
+        "connect_args": {
+            "factory": QueuedConnection,
+            "check_same_thread": False,
+            "timeout": BUSY_TIMEOUT_MS / 1000,
+        },
+    }
+
+
+def _set_pragmas(dbapi_connection, connection_record):
+    """Tune every new connection to the database file"""
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+        cursor.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+    finally:
+        cursor.close()
+
+
+def _queue_writes(conn, cursor, statement, parameters, context, executemany):
+    """Wait for the connection's turn before its first write statement"""
+    dbapi_connection = conn.connection.dbapi_connection
+    if isinstance(dbapi_connection, QueuedConnection) and WRITE_PATTERN.match(statement):
+        writer_queue.acquire(dbapi_connection)
+
+
+def install(engine):
+    """
+    Apply the embedded mode to an engine created with engine_options()
+
+    Does nothing for other databases, so it's safe to call unconditionally.
+    """
+    if engine.dialect.name != 'sqlite' or engine.url.database in (None, '', ':memory:'):
+        return False
+    if event.contains(engine, 'connect', _set_pragmas):
+        return True
+    event.listen(engine, 'connect', _set_pragmas)
+    event.listen(engine, 'before_cursor_execute', _queue_writes)
+    logger.info(f"Embedded SQLite mode on {engine.url.database} "
+                f"(WAL, mmap {MMAP_SIZE // (1024 * 1024)} MB, busy timeout {BUSY_TIMEOUT_MS} ms)")
+    return True
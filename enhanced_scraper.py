@@ -12,42 +12,90 @@ from newspaper import Article
 import trafilatura
 from bs4 import BeautifulSoup
 import requests
-from collections import defaultdict
-import nltk
+from collections import Counter, defaultdict
 
 # Import the training module
-from training_module import ProjectTypeTrainer
+from trainer_registry import registry
+from text_analysis import Document, as_document, normalize_text
+from quantities import CURRENCY, ENERGY, MASS, POWER, VOLUME
+from gazetteer import gazetteer, india_markers, resolve_location
+from company_registry import clean_company_name, get_company_registry
+from ner import NER_BACKEND, annotate_documents, document_entities
+from extraction_cache import get_extraction_cache, cached_extraction
+from stage_metrics import span, timed
+from filter_cascade import ArticleFilter, Candidate, FilterCascade, prefilters
+from ml_classifier import CLASSIFIER_BACKEND, get_classifier
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Initialize the trainer with all available Excel files
-trainer = ProjectTypeTrainer()
-training_results = None
+# Bump when extraction logic changes so cached results are recomputed
+EXTRACTOR_VERSION = 3
+
+# Characters of article body analyzed first; the window grows by WINDOW_GROWTH
+# while a check is borderline or a field is missing (0 analyzes whole articles)
+ANALYSIS_WINDOW_CHARS = int(os.environ.get("ANALYSIS_WINDOW_CHARS", "8192"))
+WINDOW_GROWTH = 4
+
+# Scores this close to a filter's threshold count as borderline
+BORDERLINE_MARGIN = 0.15
 
 def load_training_data():
-    """Load training data from Excel files"""
-    global training_results
-    # Lazy load training data when first needed
-    if training_results is None:
-        logger.info("Loading training data from Excel files...")
-        # Find all Excel files with renewable projects data
-        excel_files = [f for f in os.listdir() if f.endswith('.xlsx') and 'renewable' in f]
-        if not excel_files:
-            logger.warning("No training Excel files found")
-            return {}
-            
-        # Process the latest file (assuming filename contains date)
-        latest_file = sorted(excel_files)[-1]
-        logger.info(f"Using {latest_file} for training")
-        
-        # Process the file and get training results
-        trainer.process_excel_file(latest_file)
-        training_results = trainer.get_training_results()
-        logger.info(f"Loaded training data for {len(training_results)} project types")
+    """
+    Return a snapshot of the current compiled training model
     
-    return training_results
+    The registry swaps in a new model after training; callers that hold on to
+    the returned snapshot keep a consistent model for their whole extraction.
+    """
+    return registry.current()
+
+def _model_version(training_data):
+    """Version of everything besides the code that an extraction result depends on"""
+    classifier = CLASSIFIER_BACKEND
+    if classifier == 'sklearn':
+        # Results change whenever the classifier is retrained
+        classifier = f"sklearn-{get_classifier().version}"
+    # Company and place names resolve through the registry and gazetteer
+    lookups = f"{get_company_registry().version}:{gazetteer.version}"
+    return f"{training_data.version}:{classifier}:{lookups}:{NER_BACKEND}:{ANALYSIS_WINDOW_CHARS}"
+
+def analyze_windowed(doc, analyze, sufficient):
+    """
+    Run an analysis over growing windows of an article
+    
+    Starts with the title and the first ANALYSIS_WINDOW_CHARS of the body and
+    widens until sufficient(result) holds or the whole article was analyzed.
+    
+    Args:
+        doc: text_analysis.Document of the full article
+        analyze: Function of a Document returning the analysis result
+        sufficient: Function telling whether a result can be used as is
+    
+    Returns:
+        The result from the last window analyzed
+    """
+    result = None
+    for window in doc.windows(ANALYSIS_WINDOW_CHARS, WINDOW_GROWTH):
+        result = analyze(window)
+        if sufficient(result):
+            break
+    return result
+
+def _decisive(threshold):
+    """Sufficiency test for scores: only rejections just below the threshold are borderline"""
+    return lambda score: not (threshold - BORDERLINE_MARGIN <= score < threshold)
+
+def _accepted(threshold):
+    """
+    Sufficiency test for scorers with a few fixed levels, none of them just
+    below the threshold: every rejection reads further
+    """
+    return lambda score: score >= threshold
+
+def _per_call_fields(article_url):
+    """Result fields that depend on the call rather than the article text"""
+    return {'source': article_url, 'announcement_date': datetime.now().strftime('%Y-%m-%d')}
 
 def fetch_news_from_source(source_url):
     """
@@ -185,45 +233,19 @@ def preprocess_text(text):
     Preprocess text for NLP analysis
     Returns cleaned and normalized text
     """
-    if not text:
-        return ""
-        
-    # Convert to lowercase
-    text = text.lower()
-    
-    # Remove URLs
-    text = re.sub(r'https?://\S+', '', text)
-    
-    # Remove extra whitespace
-    text = re.sub(r'\s+', ' ', text).strip()
-    
-    return text
+    return normalize_text(text)
 
 def is_india_project(text):
     """
     Check if the article is about an Indian project using enhanced NLP techniques
     Returns a score between 0 and 1 indicating confidence
     """
-    if not text:
+    doc = as_document(text)
+    if not doc:
         return 0.0
-        
-    # Preprocess text
-    text = preprocess_text(text)
-    
-    # Key markers for Indian projects
-    india_markers = [
-        'india', 'indian', 'bharat', 'new delhi', 'mumbai', 'bangalore', 
-        'gujarat', 'rajasthan', 'tamil nadu', 'karnataka', 'andhra pradesh',
-        'telangana', 'maharashtra', 'madhya pradesh', 'uttar pradesh',
-        'pli scheme', 'mnre', 'seci', 'ntpc', 'ireda', 'eesl', 'ministry of power',
-        'ministry of new and renewable energy', 'pm modi', 'prime minister modi'
-    ]
     
-    # Count matches
-    matches = 0
-    for marker in india_markers:
-        if re.search(r'\b' + re.escape(marker) + r'\b', text):
-            matches += 1
+    # Distinct Indian places and national markers from the shared gazetteer scan
+    matches = len(india_markers(doc))
     
     # Calculate confidence score
     if matches >= 3:
@@ -238,11 +260,9 @@ def is_pipeline_project(text):
     Check if the project is in pipeline (announced or under construction)
     Returns a score between 0 and 1 indicating confidence
     """
-    if not text:
+    doc = as_document(text)
+    if not doc:
         return 0.0
-        
-    # Preprocess text
-    text = preprocess_text(text)
     
     # Pipeline markers
     pipeline_markers = [
@@ -260,17 +280,9 @@ def is_pipeline_project(text):
         'has been operating', 'in operation since', 'has been running'
     ]
     
-    # Count pipeline matches
-    pipeline_matches = 0
-    for marker in pipeline_markers:
-        if re.search(r'\b' + re.escape(marker) + r'\b', text):
-            pipeline_matches += 1
-    
-    # Count completed matches
-    completed_matches = 0
-    for marker in completed_markers:
-        if re.search(r'\b' + re.escape(marker) + r'\b', text):
-            completed_matches += 1
+    # Count pipeline and completed matches
+    pipeline_matches = doc.count_terms(pipeline_markers)
+    completed_matches = doc.count_terms(completed_markers)
     
     # Calculate score
     if pipeline_matches >= 2 and completed_matches == 0:
@@ -282,16 +294,27 @@ def is_pipeline_project(text):
     else:
         return 0.1  # Likely completed or not a project announcement
 
-def determine_project_type(text):
+def determine_project_type(text, backend=None, training_data=None):
     """
     Determine renewable energy project type across expanded categories
+    
+    Args:
+        text: Article text or a text_analysis.Document
+        backend: 'rules' for keyword patterns plus training enhancement, or
+            'sklearn' for the vectorized classifier; defaults to CLASSIFIER_BACKEND
+        training_data: Optional compiled model snapshot; defaults to the current one
+    
     Returns a dictionary of scores for each type
     """
-    if not text:
+    doc = as_document(text)
+    if not doc:
         return {}
-        
-    # Preprocess text
-    text = preprocess_text(text)
+    text = doc.normalized
+    
+    if (backend or CLASSIFIER_BACKEND) == 'sklearn':
+        scores = get_classifier().predict_scores(text)
+        logger.debug(f"Classifier project type scores: {scores}")
+        return scores
     
     # Define keywords and patterns for each project type
     type_patterns = {
@@ -324,7 +347,8 @@ def determine_project_type(text):
     }
     
     # Load training data to enhance detection
-    training_data = load_training_data()
+    if training_data is None:
+        training_data = load_training_data()
     
     # Track scores for each type and keyword matches for diagnostic purposes
     scores = {}
@@ -345,7 +369,8 @@ def determine_project_type(text):
     
     # Enhance scores using training data if available
     if training_data:
-        enhanced_scores = trainer.enhance_scraper_detection(text, scores)
+        with span('classify.type.trainer_enhancement'):
+            enhanced_scores = training_data.enhance_scores(doc, scores)
         
         # Compare original and enhanced scores for diagnostic purposes
         for project_type, score in enhanced_scores.items():
@@ -360,6 +385,18 @@ def determine_project_type(text):
     
     return scores
 
+def determine_project_types_batch(texts, backend=None):
+    """
+    Determine project type scores for a batch of articles
+    
+    With the sklearn backend the whole batch is classified in one matrix
+    multiply; the rules backend scores each article in turn.
+    """
+    if (backend or CLASSIFIER_BACKEND) == 'sklearn':
+        docs = [as_document(text) for text in texts]
+        return get_classifier().predict_batch([doc.normalized for doc in docs])
+    return [determine_project_type(text, backend='rules') for text in texts]
+
 def extract_project_data(article_url, content=None):
     """
     Extract project data from an article
@@ -386,15 +423,86 @@ def extract_project_data(article_url, content=None):
             title = article.title
         except:
             pass
-            
-    # Check if it's about an Indian project
-    india_score = is_india_project(content)
+    
+    # Pin the training model so a concurrent retrain doesn't change it mid-article
+    training_data = load_training_data()
+    
+    def extract():
+        # Analyze the article once and share the result with every stage
+        doc = Document(content, title)
+        project_type = screen_article(article_url, doc, training_data)
+        if not project_type:
+            return None
+        return build_project_data(article_url, doc, project_type)
+    
+    return cached_extraction('enhanced_scraper', EXTRACTOR_VERSION, _model_version(training_data),
+                             content, title, extract, fields=_per_call_fields(article_url))
+
+def extract_projects_batch(articles):
+    """
+    Extract project data for a batch of articles
+    
+    Relevance checks run per article; the NER stage then annotates every
+    article that passed them in one nlp.pipe batch before field extraction.
+    
+    Args:
+        articles: List of (article_url, content, title) tuples
+        
+    Returns:
+        List of project data dicts (None for rejected articles), in input order
+    """
+    training_data = load_training_data()
+    cache = get_extraction_cache()
+    model_version = _model_version(training_data)
+    
+    results = [None] * len(articles)
+    screened = []
+    for index, (article_url, content, title) in enumerate(articles):
+        fields = _per_call_fields(article_url)
+        key = None
+        if cache is not None:
+            key = cache.key('enhanced_scraper', EXTRACTOR_VERSION, model_version, content, title)
+            found, cached = cache.get(key)
+            if found:
+                results[index] = {**cached, **fields} if cached else None
+                continue
+        
+        doc = Document(content, title)
+        project_type = screen_article(article_url, doc, training_data) if doc else None
+        if project_type:
+            screened.append((index, key, article_url, doc, project_type))
+        elif key is not None:
+            cache.put(key, None)
+    
+    with span('extract.ner'):
+        # Extractors start with the first window, so that is what NER sees
+        annotate_documents([doc.window(ANALYSIS_WINDOW_CHARS) if ANALYSIS_WINDOW_CHARS > 0 else doc
+                            for _, _, _, doc, _ in screened])
+    
+    for index, key, article_url, doc, project_type in screened:
+        results[index] = build_project_data(article_url, doc, project_type)
+        if key is not None:
+            fields = _per_call_fields(article_url)
+            cache.put(key, {k: v for k, v in results[index].items() if k not in fields})
+    
+    return results
+
+def _india_filter(candidate):
+    """Cascade filter: the article is about an Indian project"""
+    india_score = analyze_windowed(candidate.doc, is_india_project, _accepted(0.5))
     if india_score < 0.5:
         logger.info(f"Article rejected: Not about an Indian project (score: {india_score})")
-        return None
-    
-    # Check if it's about a renewable energy project
-    project_type_scores = determine_project_type(content)
+        return False
+    return True
+
+def _project_type_filter(candidate):
+    """Cascade filter: the article is about a renewable energy project; records its type"""
+    doc = candidate.doc
+    project_type_scores = analyze_windowed(
+        doc,
+        lambda window: determine_project_type(window, training_data=candidate.training_data),
+        lambda scores: _decisive(0.4)(max(scores.values(), default=0))
+    )
     
     # Find the most likely project type
     max_score = 0
@@ -405,61 +513,107 @@ def extract_project_data(article_url, content=None):
             max_score = score
             project_type = type_name
     
+    candidate.results['type_scores'] = project_type_scores
+    
     # Reject if no strong project type identified
     if max_score < 0.4:
         logger.info(f"Article rejected: Not about a renewable energy project (max score: {max_score})")
-        
-        # Track potential misses for diagnostics
-        try:
-            from diagnostic_tracker import diagnostic_tracker
-            diagnostic_tracker.track_potential_project(
-                article_url,
-                title or "Unknown Title",
-                content[:500] + "...",
-                project_type_scores,
-                f"Low confidence in project type (max score: {max_score})"
-            )
-            logger.info(f"Tracked as potential miss in diagnostic tracker")
-        except ImportError:
-            logger.debug("Diagnostic tracker not available")
-        
-        return None
+        return False
     
-    # Check if it's a pipeline project
-    pipeline_score = is_pipeline_project(content)
+    candidate.results['project_type'] = project_type
+    return True
+
+def _pipeline_filter(candidate):
+    """Cascade filter: the article is about a project still in the pipeline"""
+    pipeline_score = analyze_windowed(candidate.doc, is_pipeline_project, _accepted(0.4))
     if pipeline_score < 0.4:
         logger.info(f"Article rejected: Not about a pipeline project (score: {pipeline_score})")
+        return False
+    return True
+
+# Screening filters, run in order of measured cost per rejection; the priors
+# put the URL and lead prefilters ahead of the full-text checks
+screening_cascade = FilterCascade(prefilters() + [
+    ArticleFilter('india', _india_filter, prior_cost_ms=2.0, prior_reject_rate=0.4),
+    ArticleFilter('type', _project_type_filter, prior_cost_ms=5.0, prior_reject_rate=0.5),
+    ArticleFilter('pipeline', _pipeline_filter, prior_cost_ms=1.0, prior_reject_rate=0.2,
+                  after=['type']),
+])
+
+# Filters an article must pass before its rejection counts as a potential miss
+DIAGNOSED_AFTER = ['url', 'lead', 'india']
+
+def _track_rejection(candidate, rejected_by):
+    """Record articles rejected for a weak project type as potential misses"""
+    # With filters reordered, make sure the article wasn't irrelevant anyway
+    if rejected_by != 'type' or not screening_cascade.passes(candidate, DIAGNOSED_AFTER):
+        return
+    
+    doc = candidate.doc
+    project_type_scores = candidate.results['type_scores']
+    max_score = max(project_type_scores.values(), default=0)
+    try:
+        from diagnostic_tracker import diagnostic_tracker
+        diagnostic_tracker.track_potential_project(
+            candidate.url,
+            doc.title or "Unknown Title",
+            doc.text[:500] + "...",
+            project_type_scores,
+            f"Low confidence in project type (max score: {max_score})"
+        )
+        logger.info(f"Tracked as potential miss in diagnostic tracker")
+    except ImportError:
+        logger.debug("Diagnostic tracker not available")
+
+def screen_article(article_url, doc, training_data=None):
+    """
+    Run the relevance filters on an analyzed article
+    
+    URL, title and lead prefilters reject obviously irrelevant articles before
+    the India, project type and pipeline checks run over the full text.
+    
+    Returns:
+        The most likely project type key, or None if the article is rejected
+    """
+    candidate = Candidate(article_url, doc, training_data)
+    rejected_by = screening_cascade.run(candidate)
+    if rejected_by:
+        logger.debug(f"Article {article_url} rejected by the {rejected_by} filter")
+        _track_rejection(candidate, rejected_by)
         return None
+    return candidate.results['project_type']
+
+def build_project_data(article_url, doc, project_type):
+    """Extract the project fields from an article that passed screening"""
+    title = doc.title
     
-    # Extract project details based on identified type
+    # Project facts sit near the top, so each field is extracted from the first
+    # window and widens it only when missing; the name only reads the opening
     project_data = {
         'type': project_type.capitalize(),
-        'name': extract_project_name(content, title),
-        'company': extract_company(content),
-        'location': extract_location(content),
+        'name': extract_project_name(doc, title),
+        'company': analyze_windowed(doc, extract_company, lambda company: company != "Unknown"),
+        'location': analyze_windowed(doc, extract_location, lambda location: location != "India"),
         'source': article_url,
         'announcement_date': datetime.now().strftime('%Y-%m-%d')
     }
     
     # Extract capacity based on project type
-    if project_type == 'solar':
-        project_data.update(extract_solar_capacity(content))
-    elif project_type == 'battery':
-        project_data.update(extract_battery_capacity(content))
-    elif project_type == 'wind':
-        project_data.update(extract_wind_capacity(content))
-    elif project_type == 'hydro':
-        project_data.update(extract_hydro_capacity(content))
-    elif project_type == 'hydrogen':
-        project_data.update(extract_hydrogen_capacity(content))
-    elif project_type == 'biofuel':
-        project_data.update(extract_biofuel_capacity(content))
+    project_data.update(analyze_windowed(
+        doc,
+        lambda window: extract_capacity(window, project_type),
+        lambda capacity: any(value is not None for value in capacity.values())
+    ))
     
     # Extract investment information
-    project_data.update(extract_investment(content))
+    project_data.update(analyze_windowed(
+        doc, extract_investment, lambda investment: investment['investment_usd'] is not None
+    ))
     
     # Set expected completion
-    project_data['expected_completion'] = extract_completion_date(content)
+    project_data['expected_completion'] = analyze_windowed(
+        doc, extract_completion_date, lambda date: date != "Unknown"
+    )
     
     logger.info(f"Extracted project data for {project_type} project: {project_data['name']}")
     return project_data
@@ -485,6 +639,7 @@ def extract_project_name(content, title=None):
                 return name
     
     # Extract from first few paragraphs of content as fallback
+    content = as_document(content).text
     if content:
         paragraphs = content.split('\n')
         for para in paragraphs[:3]:
@@ -502,209 +657,76 @@ def extract_project_name(content, title=None):
         return title[:80]
     return "Unnamed Renewable Energy Project"
 
-def extract_solar_capacity(content):
-    """Extract capacity information for solar projects"""
-    result = {'generation_capacity': None}
-    
-    # Patterns for solar capacity
-    capacity_patterns = [
-        r'(\d+(?:\.\d+)?)\s*(?:GW|gigawatt)',
-        r'(\d+(?:\.\d+)?)\s*(?:MW|megawatt)',
-        r'(\d+(?:\.\d+)?)[- ](?:GW|gigawatt)',
-        r'(\d+(?:\.\d+)?)[- ](?:MW|megawatt)'
-    ]
-    
-    for pattern in capacity_patterns:
-        match = re.search(pattern, content, re.IGNORECASE)
-        if match:
-            value = float(match.group(1))
-            # Convert MW to GW if necessary
-            if 'MW' in match.group(0) or 'megawatt' in match.group(0).lower():
-                value /= 1000
-            result['generation_capacity'] = value
-            break
-            
-    # Check for manufacturing capacity
-    manufacturing_patterns = [
-        r'(\d+(?:\.\d+)?)\s*(?:GW|gigawatt)(?:[- ]capacity)?\s+(?:cell|module|manufacturing)',
-        r'(?:cell|module|manufacturing)(?:[- ]capacity)?\s+of\s+(\d+(?:\.\d+)?)\s*(?:GW|gigawatt)'
-    ]
-    
-    for pattern in manufacturing_patterns:
-        match = re.search(pattern, content, re.IGNORECASE)
-        if match:
-            value = float(match.group(1))
-            if 'cell' in match.group(0).lower():
-                result['cell_capacity'] = value
-            elif 'module' in match.group(0).lower():
-                result['module_capacity'] = value
-            else:
-                # Generic manufacturing capacity
-                result['manufacturing_capacity'] = value
-    
-    return result
+def _first_quantity(quantities, context=None):
+    """Return the value of the first quantity, optionally only those next to context words"""
+    for quantity in quantities:
+        if context is None or quantity.near(context):
+            return quantity.value
+    return None
 
-def extract_battery_capacity(content):
-    """Extract capacity information for battery projects"""
-    result = {'storage_capacity': None}
-    
-    # Patterns for battery capacity
-    capacity_patterns = [
-        r'(\d+(?:\.\d+)?)\s*(?:GWh|gigawatt[ -]hour)',
-        r'(\d+(?:\.\d+)?)\s*(?:MWh|megawatt[ -]hour)',
-        r'(\d+(?:\.\d+)?)[- ](?:GWh|gigawatt[ -]hour)',
-        r'(\d+(?:\.\d+)?)[- ](?:MWh|megawatt[ -]hour)',
-        r'storage capacity of (\d+(?:\.\d+)?)\s*(?:GWh|MWh|gigawatt[ -]hour|megawatt[ -]hour)'
-    ]
-    
-    for pattern in capacity_patterns:
-        match = re.search(pattern, content, re.IGNORECASE)
-        if match:
-            value = float(match.group(1))
-            # Convert MWh to GWh if necessary
-            if 'MWh' in match.group(0) or 'megawatt' in match.group(0).lower():
-                value /= 1000
-            result['storage_capacity'] = value
-            break
-            
-    # Check for manufacturing capacity
-    manufacturing_patterns = [
-        r'(\d+(?:\.\d+)?)\s*(?:GWh|gigawatt[ -]hour)(?:[- ]capacity)?\s+(?:cell|battery|manufacturing)',
-        r'(?:cell|battery|manufacturing)(?:[- ]capacity)?\s+of\s+(\d+(?:\.\d+)?)\s*(?:GWh|gigawatt[ -]hour)'
-    ]
-    
-    for pattern in manufacturing_patterns:
-        match = re.search(pattern, content, re.IGNORECASE)
-        if match:
-            value = float(match.group(1))
-            if 'cell' in match.group(0).lower():
-                result['cell_capacity'] = value
-            else:
-                # Generic manufacturing capacity
-                result['manufacturing_capacity'] = value
-    
-    return result
-
-def extract_wind_capacity(content):
-    """Extract capacity information for wind projects"""
-    result = {'generation_capacity': None}
-    
-    # Patterns for wind capacity
-    capacity_patterns = [
-        r'(\d+(?:\.\d+)?)\s*(?:GW|gigawatt)',
-        r'(\d+(?:\.\d+)?)\s*(?:MW|megawatt)',
-        r'(\d+(?:\.\d+)?)[- ](?:GW|gigawatt)',
-        r'(\d+(?:\.\d+)?)[- ](?:MW|megawatt)',
-        r'wind capacity of (\d+(?:\.\d+)?)\s*(?:GW|MW|gigawatt|megawatt)'
-    ]
-    
-    for pattern in capacity_patterns:
-        match = re.search(pattern, content, re.IGNORECASE)
-        if match:
-            value = float(match.group(1))
-            # Convert MW to GW if necessary
-            if 'MW' in match.group(0) or 'megawatt' in match.group(0).lower():
-                value /= 1000
-            result['generation_capacity'] = value
-            break
-    
-    return result
-
-def extract_hydro_capacity(content):
-    """Extract capacity information for hydro projects"""
-    result = {'generation_capacity': None}
-    
-    # Patterns for hydro capacity
-    capacity_patterns = [
-        r'(\d+(?:\.\d+)?)\s*(?:GW|gigawatt)',
-        r'(\d+(?:\.\d+)?)\s*(?:MW|megawatt)',
-        r'hydro(?:power|electric)? capacity of (\d+(?:\.\d+)?)\s*(?:GW|MW|gigawatt|megawatt)'
-    ]
-    
-    for pattern in capacity_patterns:
-        match = re.search(pattern, content, re.IGNORECASE)
-        if match:
-            value = float(match.group(1))
-            # Convert MW to GW if necessary
-            if 'MW' in match.group(0) or 'megawatt' in match.group(0).lower():
-                value /= 1000
-            result['generation_capacity'] = value
-            break
-    
-    return result
-
-def extract_hydrogen_capacity(content):
-    """Extract capacity information for hydrogen projects"""
-    result = {
-        'electrolyzer_capacity': None,
-        'hydrogen_production': None
-    }
-    
-    # Patterns for electrolyzer capacity
-    electrolyzer_patterns = [
-        r'(\d+(?:\.\d+)?)\s*(?:GW|gigawatt)\s+electroly[zs]er',
-        r'(\d+(?:\.\d+)?)\s*(?:MW|megawatt)\s+electroly[zs]er',
-        r'electroly[zs]er capacity of (\d+(?:\.\d+)?)\s*(?:GW|MW|gigawatt|megawatt)'
-    ]
-    
-    for pattern in electrolyzer_patterns:
-        match = re.search(pattern, content, re.IGNORECASE)
-        if match:
-            value = float(match.group(1))
-            # Convert MW to GW if necessary
-            if 'MW' in match.group(0) or 'megawatt' in match.group(0).lower():
-                value /= 1000
-            result['electrolyzer_capacity'] = value
-            break
-    
-    # Patterns for hydrogen production
-    production_patterns = [
-        r'(\d+(?:\.\d+)?)\s*(?:tons|tonnes)\s+(?:per|a|\/)\s+(?:day|annum|year)',
-        r'produce (\d+(?:\.\d+)?)\s*(?:tons|tonnes)',
-        r'production of (\d+(?:\.\d+)?)\s*(?:tons|tonnes)'
-    ]
+@timed('extract.capacity')
+def extract_capacity(content, project_type):
+    """
+    Extract the capacity fields for a project type
     
-    for pattern in production_patterns:
-        match = re.search(pattern, content, re.IGNORECASE)
-        if match:
-            value = float(match.group(1))
-            # We store production in tons per day
-            if 'annum' in match.group(0).lower() or 'year' in match.group(0).lower():
-                value /= 365  # Convert annual to daily
-            result['hydrogen_production'] = value
-            break
+    Every field is read from the document's quantity stream, so the text is
+    scanned for numbers and units only once however many fields are filled.
     
-    return result
+    Args:
+        content: The article text or a text_analysis.Document
+        project_type: Lowercase project type key (solar, battery, ...)
+        
+    Returns:
+        Dict of capacity fields in the units stored on Project
+    """
+    doc = as_document(content)
+    
+    if project_type in ('solar', 'wind', 'hydro'):
+        power = doc.quantities_of(POWER)
+        result = {'generation_capacity': _first_quantity(power)}
+        if project_type == 'solar':
+            # Manufacturing capacity mentioned alongside cells or modules
+            for quantity in power:
+                if quantity.near(['cell']):
+                    result.setdefault('cell_capacity', quantity.value)
+                elif quantity.near(['module']):
+                    result.setdefault('module_capacity', quantity.value)
+                elif quantity.near(['manufacturing']):
+                    result.setdefault('manufacturing_capacity', quantity.value)
+        return result
+    
+    if project_type == 'battery':
+        energy = doc.quantities_of(ENERGY)
+        result = {'storage_capacity': _first_quantity(energy)}
+        for quantity in energy:
+            if quantity.near(['cell']):
+                result.setdefault('cell_capacity', quantity.value)
+            elif quantity.near(['battery', 'manufacturing']):
+                result.setdefault('manufacturing_capacity', quantity.value)
+        return result
+    
+    if project_type == 'hydrogen':
+        production = [quantity for quantity in doc.quantities_of(MASS)
+                      if quantity.period or quantity.preceded_by(['produce', 'production'])]
+        return {
+            'electrolyzer_capacity': _first_quantity(doc.quantities_of(POWER),
+                                                     ['electrolyzer', 'electrolyser']),
+            # Production rates are normalized to tons per day
+            'hydrogen_production': _first_quantity(production)
+        }
+    
+    if project_type == 'biofuel':
+        return {
+            'biofuel_capacity': _first_quantity(doc.quantities_of(VOLUME)),
+            'feedstock_type': extract_feedstock(doc)
+        }
+    
+    return {}
 
-def extract_biofuel_capacity(content):
-    """Extract capacity information for biofuel projects"""
-    result = {
-        'biofuel_capacity': None,
-        'feedstock_type': None
-    }
-    
-    # Patterns for biofuel capacity
-    capacity_patterns = [
-        r'(\d+(?:\.\d+)?)\s*(?:million|thousand)?\s*(?:liters|litres|gallons)',
-        r'produce (\d+(?:\.\d+)?)\s*(?:million|thousand)?\s*(?:liters|litres|gallons)',
-        r'capacity of (\d+(?:\.\d+)?)\s*(?:million|thousand)?\s*(?:liters|litres|gallons)'
-    ]
-    
-    for pattern in capacity_patterns:
-        match = re.search(pattern, content, re.IGNORECASE)
-        if match:
-            value = float(match.group(1))
-            # Apply multiplier based on unit
-            if 'million' in match.group(0).lower():
-                value *= 1000000
-            elif 'thousand' in match.group(0).lower():
-                value *= 1000
-            # Convert gallons to liters if necessary
-            if 'gallons' in match.group(0).lower():
-                value *= 3.78541  # Gallons to liters conversion
-            
-            result['biofuel_capacity'] = value
-            break
+def extract_feedstock(content):
+    """Extract the feedstock used by a biofuel project"""
+    doc = as_document(content)
+    content = doc.text
     
     # Patterns for feedstock type
     feedstock_patterns = [
@@ -721,99 +743,80 @@ def extract_biofuel_capacity(content):
     
     # Direct mentions of feedstock
     for feedstock in feedstock_types:
-        if re.search(r'\b' + re.escape(feedstock) + r'\b', content, re.IGNORECASE):
-            result['feedstock_type'] = feedstock
-            break
+        if doc.has_term(feedstock):
+            return feedstock
     
     # Indirect mentions using patterns
-    if not result['feedstock_type']:
-        for pattern in feedstock_patterns:
-            match = re.search(pattern, content, re.IGNORECASE)
-            if match:
-                result['feedstock_type'] = match.group(1).lower()
-                break
+    for pattern in feedstock_patterns:
+        match = re.search(pattern, content, re.IGNORECASE)
+        if match:
+            return match.group(1).lower()
     
-    return result
+    return None
 
+@timed('extract.location')
 def extract_location(content):
     """Extract location information from text"""
-    indian_states = [
-        'Andhra Pradesh', 'Arunachal Pradesh', 'Assam', 'Bihar', 'Chhattisgarh',
-        'Goa', 'Gujarat', 'Haryana', 'Himachal Pradesh', 'Jharkhand', 'Karnataka',
-        'Kerala', 'Madhya Pradesh', 'Maharashtra', 'Manipur', 'Meghalaya', 'Mizoram',
-        'Nagaland', 'Odisha', 'Punjab', 'Rajasthan', 'Sikkim', 'Tamil Nadu',
-        'Telangana', 'Tripura', 'Uttar Pradesh', 'Uttarakhand', 'West Bengal'
-    ]
-    
-    # Dictionary to hold state and city/district
-    location_data = {'state': None, 'location': None}
+    doc = as_document(content)
     
-    # Extract state
-    for state in indian_states:
-        # Look for both full state name and common abbreviations
-        state_pattern = r'\b' + re.escape(state) + r'\b'
-        if re.search(state_pattern, content, re.IGNORECASE):
-            location_data['state'] = state
-            break
-    
-    # Extract more specific location if state is found
-    if location_data['state']:
-        # Find city or district near mention of state
-        state_pattern = r'\b' + re.escape(location_data['state']) + r'\b'
-        state_matches = list(re.finditer(state_pattern, content, re.IGNORECASE))
-        
-        for match in state_matches:
-            # Look for location before and after state mention
-            start_pos = max(0, match.start() - 100)
-            end_pos = min(len(content), match.end() + 100)
-            
-            context = content[start_pos:end_pos]
-            
-            # Look for "in X" or "at X" patterns
-            location_patterns = [
-                r'in\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)',
-                r'at\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)',
-                r'near\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)',
-                r'district\s+(?:of\s+)?([A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)'
-            ]
-            
-            for pattern in location_patterns:
-                locations = re.findall(pattern, context)
-                if locations:
-                    for loc in locations:
-                        # Skip if location is a state or common words
-                        if loc not in indian_states and loc.lower() not in ['india', 'delhi']:
-                            location_data['location'] = loc
-                            break
-            
-            if location_data['location']:
-                break
+    # Resolve every place mention against the gazetteer in one pass
+    location, state = resolve_location(doc)
     
     # Return state or "India" as fallback if no specific state found
-    if not location_data['state']:
+    if not state:
         return "India"
     
+    # Villages and small districts aren't in the gazetteer; take a place entity
+    # mentioned alongside the resolved state instead
+    if not location:
+        location = _entity_location(doc, state)
+    
     # Return combined location or just state if no specific location
-    if location_data['location']:
-        return f"{location_data['location']}, {location_data['state']}"
+    if location:
+        return f"{location}, {state}"
     else:
-        return location_data['state']
+        return state
+
+def _entity_location(doc, state):
+    """Return the first NER place outside the gazetteer whose sentence names the state"""
+    entities = document_entities(doc)
+    if not entities:
+        return None
+    
+    for entity in entities.places:
+        if gazetteer.find(entity.text):
+            continue
+        sentence = doc.sentence_at(entity.start)
+        if any(place.state == state for place in india_markers(sentence)):
+            return entity.text
+    return None
 
+@timed('extract.company')
 def extract_company(content):
     """Extract company name from text"""
-    # Common Indian renewable energy companies
-    common_companies = [
-        'Adani Green', 'ReNew Power', 'Tata Power', 'NTPC', 'Greenko',
-        'JSW Energy', 'Azure Power', 'Hero Future Energies', 'Acme Solar',
-        'Avaada Energy', 'Amplus Solar', 'Cleantech Solar', 'Sembcorp',
-        'Suzlon', 'SB Energy', 'EDF Renewables', 'Inox Wind', 'SJVN',
-        'Reliance Power', 'Torrent Power', 'SECI', 'CLP India', 'Mytrah Energy'
-    ]
+    doc = as_document(content)
+    
+    # Resolve known companies and their aliases in one pass
+    registry = get_company_registry()
+    company = registry.match(doc)
+    if company:
+        return company
+    
+    # Organizations tagged by the NER stage, mapped to registry names
+    entities = document_entities(doc)
+    if entities:
+        organizations = []
+        for entity in entities.orgs:
+            if any(term in entity.text.lower() for term in ['ministry', 'government']):
+                continue
+            name = clean_company_name(entity.text)
+            if name:
+                organizations.append(registry.canonical(name))
+        if organizations:
+            return Counter(organizations).most_common(1)[0][0]
     
-    # First look for exact matches of common companies
-    for company in common_companies:
-        if re.search(r'\b' + re.escape(company) + r'\b', content, re.IGNORECASE):
-            return company
+    # Fall back to capitalized-phrase patterns for companies not in the registry
+    content = doc.text
     
     # Try to extract using patterns
     company_patterns = [
@@ -849,7 +852,6 @@ def extract_company(content):
             
             if filtered_matches:
                 # Return the most frequently mentioned company
-                from collections import Counter
                 company_counter = Counter(filtered_matches)
                 most_common = company_counter.most_common(1)[0][0]
                 
@@ -861,6 +863,13 @@ def extract_company(content):
     
     return "Unknown"
 
+# Words that mark a currency amount as the project's investment or cost
+INVESTMENT_CONTEXT = [
+    'investment', 'invest', 'invested', 'investing', 'cost', 'costing',
+    'worth', 'valued', 'outlay', 'capex', 'funding'
+]
+
+@timed('extract.investment')
 def extract_investment(content):
     """Extract investment information"""
     result = {
@@ -868,47 +877,19 @@ def extract_investment(content):
         'investment_inr': None
     }
     
-    # USD patterns
-    usd_patterns = [
-        r'(?:investment of|invest|invested|cost of|worth|valued at)\s+(?:USD|US\$|\$)\s*(\d+(?:\.\d+)?)\s*(?:billion|bn|million|mn|m)',
-        r'(?:USD|US\$|\$)\s*(\d+(?:\.\d+)?)\s*(?:billion|bn|million|mn|m)\s+(?:investment|project|cost)',
-        r'(\d+(?:\.\d+)?)\s*(?:billion|bn|million|mn|m)\s+(?:USD|US\$|\$)'
-    ]
-    
-    for pattern in usd_patterns:
-        match = re.search(pattern, content, re.IGNORECASE)
-        if match:
-            value = float(match.group(1))
-            
-            # Apply multiplier based on unit
-            if 'billion' in match.group(0).lower() or 'bn' in match.group(0).lower():
-                value *= 1000  # Convert billion to million
-            
-            result['investment_usd'] = value
-            break
+    amounts = as_document(content).quantities_of(CURRENCY)
+    if not amounts:
+        return result
     
-    # INR patterns
-    inr_patterns = [
-        r'(?:investment of|invest|invested|cost of|worth|valued at)\s+(?:INR|Rs|₹)\s*(\d+(?:\.\d+)?)\s*(?:crore|cr|lakh|billion|bn|million|mn|m)',
-        r'(?:INR|Rs|₹)\s*(\d+(?:\.\d+)?)\s*(?:crore|cr|lakh|billion|bn|million|mn|m)\s+(?:investment|project|cost)',
-        r'(\d+(?:\.\d+)?)\s*(?:crore|cr|lakh|billion|bn|million|mn|m)\s+(?:INR|Rs|₹)'
-    ]
+    # Prefer amounts described as an investment or cost over other figures
+    invested = [amount for amount in amounts if amount.near(INVESTMENT_CONTEXT)] or amounts
     
-    for pattern in inr_patterns:
-        match = re.search(pattern, content, re.IGNORECASE)
-        if match:
-            value = float(match.group(1))
-            
-            # Convert to billion INR
-            if 'crore' in match.group(0).lower() or 'cr' in match.group(0).lower():
-                value /= 100  # Convert crore to billion
-            elif 'lakh' in match.group(0).lower():
-                value /= 10000  # Convert lakh to billion
-            elif 'million' in match.group(0).lower() or 'mn' in match.group(0).lower() or 'm' in match.group(0).lower():
-                value /= 1000  # Convert million to billion
-            
-            result['investment_inr'] = value
-            break
+    for amount in invested:
+        # Amounts are normalized to USD million and INR billion
+        if amount.unit == 'USD million' and result['investment_usd'] is None:
+            result['investment_usd'] = amount.value
+        elif amount.unit == 'INR billion' and result['investment_inr'] is None:
+            result['investment_inr'] = amount.value
     
     # If we have USD but not INR, estimate INR (using approximate conversion)
     if result['investment_usd'] and not result['investment_inr']:
@@ -920,8 +901,47 @@ def extract_investment(content):
     
     return result
 
+# Words that mark a sentence as describing the project's completion
+COMPLETION_CONTEXT = [
+    'commission', 'complete', 'completion', 'operational', 'operations',
+    'ready', 'finish', 'deadline', 'timeline'
+]
+
+def _entity_completion_date(doc):
+    """Return a future date tagged by the NER stage in a completion sentence"""
+    entities = document_entities(doc)
+    if not entities:
+        return None
+    
+    current_year = datetime.now().year
+    for entity in entities.dates:
+        year_match = re.search(r'\b(20\d{2})\b', entity.text)
+        if not year_match or int(year_match.group(1)) < current_year:
+            continue
+        sentence = doc.sentence_at(entity.start).lower()
+        if not any(word in sentence for word in COMPLETION_CONTEXT):
+            continue
+        
+        year = year_match.group(1)
+        quarter_match = re.search(r'\b(?:Q([1-4])|(first|second|third|fourth) quarter)\b', entity.text, re.IGNORECASE)
+        if quarter_match:
+            quarter = quarter_match.group(1) or str(['first', 'second', 'third', 'fourth'].index(quarter_match.group(2).lower()) + 1)
+            return f"Q{quarter} {year}"
+        month_match = re.search(r'(January|February|March|April|May|June|July|August|September|October|November|December)', entity.text, re.IGNORECASE)
+        if month_match:
+            return f"{month_match.group(1).capitalize()} {year}"
+        return year
+    return None
+
+@timed('extract.completion_date')
 def extract_completion_date(content):
     """Extract expected completion date"""
+    # Every date pattern needs a number, so skip texts without any
+    doc = as_document(content)
+    if not doc.has_numbers:
+        return "Unknown"
+    content = doc.text
+    
     # Look for completion date patterns
     date_patterns = [
         r'(?:expected|scheduled|planned|slated) to (?:complete|be completed|commissioned|be commissioned|operational|be operational) by (\d{4})',
@@ -948,6 +968,11 @@ def extract_completion_date(content):
             
             return year
     
+    # Dates tagged by the NER stage in sentences about completion
+    completion_date = _entity_completion_date(doc)
+    if completion_date:
+        return completion_date
+    
     # If no specific year found, look for general timeframes
     timeframe_patterns = [
         r'(?:expected|scheduled|planned|slated) to (?:complete|be completed|commissioned|be operational) in (\d+) (?:years|months)',
@@ -982,7 +1007,7 @@ if __name__ == "__main__":
     
     # Load training data
     training_data = load_training_data()
-    print(f"Loaded training data for project types: {list(training_data.keys())}")
+    print(f"Loaded training data for project types: {training_data.categories}")
     
     # Test extraction (mock data for testing)
     test_content = """
@@ -0,0 +1,195 @@
+"""
+Persistent cache of article extraction results keyed by content hash.
+Stores each extractor's result for an article text in a local SQLite file,
+keyed by the hash of the text together with the extractor and model versions,
+so re-listed or retried articles skip extraction until either version changes.
+Least recently used entries are evicted once the cache is full.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+
+from stage_metrics import count
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Cache location and size; an empty EXTRACTION_CACHE_PATH disables the cache
+CACHE_PATH = os.environ.get("EXTRACTION_CACHE_PATH", "extraction_cache.sqlite3")
+MAX_ENTRIES = int(os.environ.get("EXTRACTION_CACHE_SIZE", "50000"))
+
+# Evict after this many writes rather than on every write
+EVICT_INTERVAL = 100
+
+
+def content_hash(text, title=None):
+    """Return the SHA-256 hex digest of an article's title and text"""
+    digest = hashlib.sha256()
+    digest.update((title or "").encode('utf-8'))
+    digest.update(b"\0")
+    digest.update((text or "").encode('utf-8'))
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """
+    LRU cache of extraction results in a SQLite file.
+
+    Keys combine the extractor name and version, the model version and the
+    content hash, so bumping either version makes old entries unreachable;
+    they then age out through LRU eviction. Results, including None for
+    rejected articles, are stored as JSON. Database errors are logged and
+    treated as cache misses.
+    """
+
+    def __init__(self, path=CACHE_PATH, max_entries=MAX_ENTRIES):
+        """Open (creating if needed) the cache database"""
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS extractions (
+                    key TEXT PRIMARY KEY,
+                    result TEXT,
+                    last_used REAL NOT NULL
+                )
+            """)
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_extractions_last_used ON extractions (last_used)"
+            )
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM extractions").fetchone()[0]
+
+    @staticmethod
+    def key(extractor, version, model_version, text, title=None):
+        """Build the cache key for an extractor run over an article"""
+        return f"{extractor}:{version}:{model_version}:{content_hash(text, title)}"
+
+    def get(self, key):
+        """
+        Look up a cached result and mark it as recently used
+
+        Returns:
+            Tuple of (found, result); result may be None for a cached rejection
+        """
+        try:
+            with self._lock, self._conn:
+                row = self._conn.execute(
+                    "SELECT result FROM extractions WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE extractions SET last_used = ? WHERE key = ?", (time.time(), key)
+                    )
+        except sqlite3.Error as e:
+            logger.warning(f"Extraction cache read failed: {e}")
+            row = None
+
+        if row is None:
+            self.misses += 1
+            count('extraction_cache.miss')
+            return False, None
+        self.hits += 1
+        count('extraction_cache.hit')
+        return True, json.loads(row[0])
+
+    def put(self, key, result):
+        """Store a result, evicting least recently used entries when the cache is full"""
+        try:
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO extractions (key, result, last_used) VALUES (?, ?, ?)",
+                    (key, json.dumps(result), time.time())
+                )
+                self._writes += 1
+                if self._writes % EVICT_INTERVAL == 0:
+                    self._evict()
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            logger.warning(f"Extraction cache write failed: {e}")
+
+    def _evict(self):
+        """Delete the least recently used entries beyond max_entries; caller holds the lock"""
+        deleted = self._conn.execute("""
+            DELETE FROM extractions WHERE key IN (
+                SELECT key FROM extractions ORDER BY last_used DESC LIMIT -1 OFFSET ?
+            )
+        """, (self.max_entries,)).rowcount
+        if deleted:
+            logger.info(f"Evicted {deleted} entries from the extraction cache")
+
+    def clear(self):
+        """Remove every cached result"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM extractions")
+
+    def memoize(self, key, compute, fields=None):
+        """
+        Return the cached result for a key, computing and storing it on a miss
+
+        Args:
+            key: Cache key from ExtractionCache.key
+            compute: Function returning the extraction result (dict or None)
+            fields: Per-call values (e.g. the article URL) that are not cached
+                but set on every returned result
+
+        Returns:
+            The extraction result
+        """
+        fields = fields or {}
+        found, result = self.get(key)
+        if not found:
+            result = compute()
+            stored = result
+            if isinstance(result, dict):
+                stored = {k: v for k, v in result.items() if k not in fields}
+            self.put(key, stored)
+        if isinstance(result, dict):
+            result = {**result, **fields}
+        return result
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_extraction_cache():
+    """Return the process-wide extraction cache, or None if it's disabled or unavailable"""
+    global _cache
+    if not CACHE_PATH:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                try:
+                    _cache = ExtractionCache()
+                except sqlite3.Error as e:
+                    logger.error(f"Could not open extraction cache {CACHE_PATH}: {e}")
+                    # Don't retry on every article
+                    _cache = False
+    return _cache if _cache is not False else None
+
+
+def cached_extraction(extractor, version, model_version, text, title, compute, fields=None):
+    """
+    Run an extractor through the process-wide cache
+
+    Falls back to calling compute directly when the cache is disabled.
+    """
+    cache = get_extraction_cache()
+    if cache is None:
+        return compute()
+    key = cache.key(extractor, version, model_version, text, title)
+    return cache.memoize(key, compute, fields)
@@ -0,0 +1,245 @@
+"""
+Cost-aware rejection cascade for article screening.
+Runs relevance filters in order of their measured cost per rejection, so the
+cheap and selective ones reject most articles before the expensive full-text
+checks run. Includes prefilters that only look at the URL, title and lead
+paragraph and pass every ambiguous article on to the full pipeline.
+"""
+
+import re
+import time
+import logging
+import threading
+
+from stage_metrics import count, span
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Characters of the article body treated as its lead paragraph
+LEAD_CHARS = 1000
+
+# Filters are re-sorted after this many articles
+REORDER_INTERVAL = 50
+
+# Pseudo-observations that anchor a filter's statistics to its priors
+PRIOR_WEIGHT = 20
+
+# URL path segments of sections that never carry project announcements
+IRRELEVANT_URL_SECTIONS = [
+    'sport', 'sports', 'cricket', 'football', 'entertainment', 'bollywood',
+    'movies', 'movie-reviews', 'lifestyle', 'fashion', 'food', 'travel',
+    'horoscope', 'astrology', 'relationships', 'recipes', 'celebrity',
+    'photos', 'photogallery', 'videos', 'web-stories', 'quiz', 'crossword',
+]
+
+URL_SECTION_PATTERN = re.compile(
+    r'/(?:' + '|'.join(re.escape(section) for section in IRRELEVANT_URL_SECTIONS) + r')(?:/|$)',
+    re.IGNORECASE
+)
+
+# Terms at least one of which appears in the title or lead of every project article
+ENERGY_LEAD_TERMS = [
+    'energy', 'power', 'solar', 'wind', 'battery', 'batteries', 'storage', 'hydro',
+    'hydroelectric', 'hydropower', 'hydel', 'hydrogen', 'electrolyser', 'electrolyzer',
+    'biofuel', 'biofuels', 'biogas', 'ethanol', 'biomass', 'renewable', 'renewables',
+    'photovoltaic', 'pv', 'module', 'modules', 'cell', 'cells', 'gigafactory',
+    'mw', 'gw', 'mwh', 'gwh', 'mwp', 'gwp', 'megawatt', 'gigawatt', 'electricity',
+    'grid', 'clean', 'green', 'ev', 'electric', 'turbine', 'turbines', 'plant',
+]
+
+ENERGY_LEAD_PATTERN = re.compile(
+    r'(?<![a-z])(?:' + '|'.join(re.escape(term) for term in ENERGY_LEAD_TERMS) + r')(?![a-z])'
+    r'|\d\s*(?:mw|gw)',
+    re.IGNORECASE
+)
+
+
+class Candidate:
+    """
+    An article going through screening.
+
+    Filters read the URL, title and lead cheaply, and the full-text Document
+    only when they need it; results they compute (such as the project type)
+    are stored in results for later stages, and passed holds the names of
+    the filters the article got through.
+    """
+
+    def __init__(self, url, doc, training_data=None):
+        """Initialize a candidate from its URL and text_analysis.Document"""
+        self.url = url or ""
+        self.doc = doc
+        self.title = doc.title or ""
+        self.training_data = training_data
+        self.results = {}
+        self.passed = set()
+
+    @property
+    def lead(self):
+        """The start of the article body"""
+        return self.doc.text[:LEAD_CHARS]
+
+
+class ArticleFilter:
+    """
+    A screening check that can reject an article, with its running cost and
+    rejection statistics.
+
+    check(candidate) returns True to pass the article on and False to reject
+    it. Priors stand in for measurements until enough articles have been seen.
+    Filters named in after always run before this one, for checks that read
+    results they store.
+    """
+
+    def __init__(self, name, check, prior_cost_ms=1.0, prior_reject_rate=0.5, after=()):
+        """Initialize a filter with priors for its cost and selectivity"""
+        self.name = name
+        self.check = check
+        self.after = tuple(after)
+        self.prior_cost_ms = prior_cost_ms
+        self.prior_reject_rate = prior_reject_rate
+        self.calls = 0
+        self.rejections = 0
+        self.total_ms = 0.0
+
+    @property
+    def mean_cost_ms(self):
+        return ((self.total_ms + self.prior_cost_ms * PRIOR_WEIGHT)
+                / (self.calls + PRIOR_WEIGHT))
+
+    @property
+    def reject_rate(self):
+        return ((self.rejections + self.prior_reject_rate * PRIOR_WEIGHT)
+                / (self.calls + PRIOR_WEIGHT))
+
+    @property
+    def cost_per_rejection(self):
+        """Expected milliseconds spent per article this filter rejects"""
+        return self.mean_cost_ms / max(self.reject_rate, 1e-3)
+
+    def record(self, elapsed_ms, rejected):
+        """Update the running statistics with one execution"""
+        self.calls += 1
+        self.rejections += bool(rejected)
+        self.total_ms += elapsed_ms
+
+    def to_dict(self):
+        return {
+            'calls': self.calls,
+            'rejections': self.rejections,
+            'mean_cost_ms': round(self.mean_cost_ms, 3),
+            'reject_rate': round(self.reject_rate, 3),
+            'cost_per_rejection_ms': round(self.cost_per_rejection, 3),
+        }
+
+
+class FilterCascade:
+    """
+    Filters run cheapest-per-rejection first, stopping at the first rejection.
+
+    With independent filters this order minimizes the expected cost per
+    article; filters that depend on others follow them. The order is recomputed from the measured statistics every
+    REORDER_INTERVAL articles. Statistics are updated without locking; a lost
+    update only nudges an estimate.
+    """
+
+    def __init__(self, filters, reorder_interval=REORDER_INTERVAL):
+        """Initialize the cascade; filters start in prior cost-per-rejection order"""
+        self.filters = list(filters)
+        self.reorder_interval = reorder_interval
+        self._runs = 0
+        self._lock = threading.Lock()
+        self._order = self._sorted()
+
+    def _sorted(self):
+        """Filters by cost per rejection, each after the filters it depends on"""
+        names = {f.name for f in self.filters}
+        pending = sorted(self.filters, key=lambda f: f.cost_per_rejection)
+        order, placed = [], set()
+        while pending:
+            # The cheapest filter whose dependencies are placed; on a cycle, the cheapest
+            ready = next((f for f in pending
+                          if all(name in placed or name not in names for name in f.after)),
+                         pending[0])
+            order.append(ready)
+            placed.add(ready.name)
+            pending.remove(ready)
+        return order
+
+    @property
+    def order(self):
+        """Names of the filters in their current execution order"""
+        return [f.name for f in self._order]
+
+    def run(self, candidate):
+        """
+        Screen a candidate
+
+        Returns:
+            Name of the filter that rejected the article, or None if it passed all
+        """
+        rejected_by = None
+        for article_filter in self._order:
+            start = time.perf_counter()
+            with span(f'classify.{article_filter.name}'):
+                passed = article_filter.check(candidate)
+            article_filter.record((time.perf_counter() - start) * 1000, not passed)
+            if not passed:
+                rejected_by = article_filter.name
+                count(f'rejected.{rejected_by}')
+                break
+            candidate.passed.add(article_filter.name)
+
+        self._runs += 1
+        if self._runs % self.reorder_interval == 0:
+            with self._lock:
+                order = self._sorted()
+                if order != self._order:
+                    logger.info(f"Reordered screening filters: {[f.name for f in order]}")
+                    self._order = order
+        return rejected_by
+
+    def passes(self, candidate, names):
+        """
+        Tell whether a candidate passes the named filters
+
+        Runs the ones it hasn't been through yet, without updating their
+        statistics; for deciding what a rejection means, such as whether the
+        article would have reached the filter that rejected it in a fixed order.
+        """
+        for article_filter in self.filters:
+            if article_filter.name not in names or article_filter.name in candidate.passed:
+                continue
+            if not article_filter.check(candidate):
+                return False
+            candidate.passed.add(article_filter.name)
+        return True
+
+    def stats(self):
+        """Per-filter statistics in execution order"""
+        return {f.name: f.to_dict() for f in self._order}
+
+
+def url_prefilter(candidate):
+    """Reject articles filed under sections like sports or entertainment"""
+    return not URL_SECTION_PATTERN.search(candidate.url)
+
+
+def lead_prefilter(candidate):
+    """
+    Reject articles whose title and lead paragraph never mention energy
+
+    Only the first LEAD_CHARS characters are scanned. Anything with a single
+    energy term is left for the full-text filters to decide.
+    """
+    if ENERGY_LEAD_PATTERN.search(candidate.title):
+        return True
+    return bool(ENERGY_LEAD_PATTERN.search(candidate.lead))
+
+
+def prefilters():
+    """Return fresh instances of the cheap URL, title and lead prefilters"""
+    return [
+        ArticleFilter('url', url_prefilter, prior_cost_ms=0.01, prior_reject_rate=0.05),
+        ArticleFilter('lead', lead_prefilter, prior_cost_ms=0.05, prior_reject_rate=0.3),
+    ]
@@ -0,0 +1,242 @@
+"""
+Gazetteer of Indian states, union territories, districts and cities.
+Compiles every place name and alias into a single token trie so an article's
+place mentions are resolved in one pass, returning normalized (location, state)
+pairs and the India-relevance markers used by the scrapers.
+"""
+
+import hashlib
+from collections import Counter, namedtuple
+
+from text_analysis import TermMatcher, as_document
+
+# Kinds of gazetteer entries
+STATE = 'state'
+UNION_TERRITORY = 'union_territory'
+CITY = 'city'
+NATIONAL = 'national'
+
+# A gazetteer entry; state is None for national markers
+Place = namedtuple('Place', ['name', 'state', 'kind'])
+
+# A place found in a document, as token offsets into Document.token_list
+PlaceMention = namedtuple('PlaceMention', ['start', 'end', 'place'])
+
+# State name -> aliases
+STATES = {
+    'Andhra Pradesh': [], 'Arunachal Pradesh': [], 'Assam': [], 'Bihar': [],
+    'Chhattisgarh': ['chattisgarh'], 'Goa': [], 'Gujarat': [], 'Haryana': [],
+    'Himachal Pradesh': [], 'Jharkhand': [], 'Karnataka': [], 'Kerala': [],
+    'Madhya Pradesh': [], 'Maharashtra': [], 'Manipur': [], 'Meghalaya': [],
+    'Mizoram': [], 'Nagaland': [], 'Odisha': ['orissa'], 'Punjab': [],
+    'Rajasthan': [], 'Sikkim': [], 'Tamil Nadu': [], 'Telangana': [],
+    'Tripura': [], 'Uttar Pradesh': [], 'Uttarakhand': ['uttaranchal'],
+    'West Bengal': [],
+}
+
+# Union territory name -> aliases
+UNION_TERRITORIES = {
+    'Andaman and Nicobar Islands': ['andaman', 'andaman and nicobar'],
+    'Chandigarh': [],
+    'Dadra and Nagar Haveli and Daman and Diu': ['dadra and nagar haveli', 'daman and diu'],
+    'Delhi': ['nct of delhi'],
+    'Jammu and Kashmir': ['jammu & kashmir'],
+    'Ladakh': [],
+    'Lakshadweep': [],
+    'Puducherry': ['pondicherry'],
+}
+
+# State -> districts and major cities, each with its aliases
+CITIES = {
+    'Andhra Pradesh': {
+        'Visakhapatnam': ['vizag'], 'Vijayawada': [], 'Guntur': [], 'Nellore': [],
+        'Kurnool': [], 'Anantapur': ['ananthapuramu', 'anantapuramu'], 'Kadapa': ['cuddapah'],
+        'Tirupati': [], 'Kakinada': [], 'Sri City': [], 'Amaravati': [],
+    },
+    'Assam': {'Guwahati': [], 'Dibrugarh': []},
+    'Bihar': {'Patna': [], 'Gaya': [], 'Bhagalpur': [], 'Muzaffarpur': []},
+    'Chhattisgarh': {'Raipur': [], 'Korba': [], 'Bilaspur': [], 'Bhilai': []},
+    'Delhi': {'New Delhi': []},
+    'Goa': {'Panaji': ['panjim'], 'Vasco da Gama': []},
+    'Gujarat': {
+        'Ahmedabad': [], 'Gandhinagar': [], 'Surat': [], 'Vadodara': ['baroda'],
+        'Rajkot': [], 'Bhavnagar': [], 'Jamnagar': [], 'Kutch': ['kachchh'],
+        'Khavda': [], 'Mundra': [], 'Dholera': [], 'Sanand': [], 'Dahej': [],
+        'Bharuch': [], 'Banaskantha': [], 'Mehsana': [], 'Morbi': [], 'Hazira': [],
+    },
+    'Haryana': {
+        'Gurugram': ['gurgaon'], 'Faridabad': [], 'Panipat': [], 'Hisar': [],
+        'Sonipat': [],
+    },
+    'Himachal Pradesh': {'Shimla': [], 'Kullu': [], 'Kinnaur': [], 'Chamba': []},
+    'Jammu and Kashmir': {'Srinagar': [], 'Jammu': []},
+    'Jharkhand': {'Ranchi': [], 'Jamshedpur': [], 'Dhanbad': [], 'Bokaro': []},
+    'Karnataka': {
+        'Bengaluru': ['bangalore'], 'Mysuru': ['mysore'], 'Mangaluru': ['mangalore'],
+        'Hubballi': ['hubli'], 'Belagavi': ['belgaum'], 'Tumakuru': ['tumkur'],
+        'Pavagada': [], 'Ballari': ['bellary'], 'Koppal': [], 'Chitradurga': [],
+        'Vijayapura': ['bijapur'], 'Kalaburagi': ['gulbarga'], 'Gadag': [],
+    },
+    'Kerala': {
+        'Thiruvananthapuram': ['trivandrum'], 'Kochi': ['cochin'],
+        'Kozhikode': ['calicut'], 'Kasaragod': [],
+    },
+    'Ladakh': {'Leh': [], 'Kargil': []},
+    'Madhya Pradesh': {
+        'Bhopal': [], 'Indore': [], 'Jabalpur': [], 'Gwalior': [], 'Rewa': [],
+        'Neemuch': [], 'Omkareshwar': [], 'Agar Malwa': [], 'Shajapur': [],
+    },
+    'Maharashtra': {
+        'Mumbai': ['bombay'], 'Pune': ['poona'], 'Nagpur': [], 'Nashik': [],
+        'Aurangabad': ['chhatrapati sambhajinagar'], 'Solapur': [], 'Ratnagiri': [],
+        'Raigad': [], 'Navi Mumbai': [], 'Thane': [], 'Dhule': [], 'Chandrapur': [],
+    },
+    'Odisha': {
+        'Bhubaneswar': [], 'Cuttack': [], 'Angul': [], 'Paradip': [],
+        'Jharsuguda': [], 'Gopalpur': [],
+    },
+    'Puducherry': {'Karaikal': []},
+    'Punjab': {'Ludhiana': [], 'Amritsar': [], 'Jalandhar': [], 'Bathinda': [], 'Mohali': []},
+    'Rajasthan': {
+        'Jaipur': [], 'Jodhpur': [], 'Jaisalmer': [], 'Bikaner': [], 'Barmer': [],
+        'Bhadla': [], 'Udaipur': [], 'Ajmer': [], 'Kota': [], 'Phalodi': [],
+    },
+    'Tamil Nadu': {
+        'Chennai': ['madras'], 'Coimbatore': [], 'Madurai': [],
+        'Tiruchirappalli': ['trichy'], 'Salem': [], 'Tirunelveli': [],
+        'Thoothukudi': ['tuticorin'], 'Ramanathapuram': [], 'Kamuthi': [],
+        'Hosur': [], 'Sriperumbudur': [], 'Kanchipuram': [], 'Vellore': [],
+        'Krishnagiri': [],
+    },
+    'Telangana': {
+        'Hyderabad': [], 'Warangal': [], 'Ramagundam': [], 'Karimnagar': [],
+        'Mahbubnagar': ['mahabubnagar'],
+    },
+    'Tripura': {'Agartala': []},
+    'Uttar Pradesh': {
+        'Lucknow': [], 'Noida': [], 'Greater Noida': [], 'Kanpur': [],
+        'Varanasi': [], 'Prayagraj': ['allahabad'], 'Agra': [], 'Jhansi': [],
+        'Ghaziabad': [], 'Mirzapur': [],
+    },
+    'Uttarakhand': {'Dehradun': [], 'Haridwar': [], 'Roorkee': []},
+    'West Bengal': {
+        'Kolkata': ['calcutta'], 'Durgapur': [], 'Haldia': [], 'Asansol': [],
+        'Kharagpur': [],
+    },
+    'Meghalaya': {'Shillong': []},
+    'Manipur': {'Imphal': []},
+    'Mizoram': {'Aizawl': []},
+    'Nagaland': {'Kohima': []},
+    'Sikkim': {'Gangtok': []},
+    'Arunachal Pradesh': {'Itanagar': []},
+    'Andaman and Nicobar Islands': {'Port Blair': []},
+}
+
+# Country-level terms that mark an article as Indian without naming a place
+INDIA_MARKERS = [
+    'india', 'indian', 'bharat', 'government of india', 'goi', 'make in india',
+    'atmanirbhar bharat', 'pli scheme', 'mnre', 'ministry of new and renewable energy',
+    'ministry of power', 'seci', 'ireda', 'eesl', 'ntpc', 'niti aayog',
+    'pm modi', 'prime minister modi', 'narendra modi',
+]
+
+
+class Gazetteer:
+    """
+    Token trie over every Indian place name and India marker.
+
+    Overlapping matches resolve to the longest name, so "New Delhi" is one
+    city mention rather than "new" plus the Delhi territory.
+    """
+
+    def __init__(self):
+        """Initialize an empty gazetteer"""
+        self.matcher = TermMatcher()
+        self._digest = hashlib.sha1()
+
+    @property
+    def version(self):
+        """Content hash of the registered places, for keying cached extractions"""
+        return self._digest.hexdigest()[:16]
+
+    def add(self, name, state, kind, aliases=()):
+        """Register a place under its name and every alias"""
+        place = Place(name, state, kind)
+        self._digest.update('\x1f'.join([name, state or '', kind, *aliases, '\x1e']).encode('utf-8'))
+        for term in [name, *aliases]:
+            self.matcher.add(term, place)
+        return place
+
+    def find(self, text):
+        """
+        Find every place and India marker in a text or Document
+
+        Returns:
+            List of PlaceMention in document order, without overlaps
+        """
+        doc = as_document(text)
+        matches = sorted(self.matcher.find(doc.token_list), key=lambda m: (m[0], m[0] - m[1]))
+
+        mentions = []
+        covered = 0
+        for start, end, place in matches:
+            if start < covered:
+                continue
+            mentions.append(PlaceMention(start, end, place))
+            covered = end
+        return mentions
+
+
+def _build_gazetteer():
+    """Compile the built-in place lists into a Gazetteer"""
+    gazetteer = Gazetteer()
+    for state, aliases in STATES.items():
+        gazetteer.add(state, state, STATE, aliases)
+    for territory, aliases in UNION_TERRITORIES.items():
+        gazetteer.add(territory, territory, UNION_TERRITORY, aliases)
+    for state, cities in CITIES.items():
+        for city, aliases in cities.items():
+            gazetteer.add(city, state, CITY, aliases)
+    for marker in INDIA_MARKERS:
+        gazetteer.add(marker, None, NATIONAL)
+    return gazetteer
+
+
+# Create a global instance for easy import
+gazetteer = _build_gazetteer()
+
+
+def place_mentions(text):
+    """Return the gazetteer mentions of a text or Document, cached on the Document"""
+    return as_document(text).places
+
+
+def india_markers(text):
+    """Return the distinct gazetteer entries (places and India markers) found in a text"""
+    return {mention.place for mention in place_mentions(text)}
+
+
+def resolve_location(text):
+    """
+    Resolve the main project location of a text
+
+    The state is the one mentioned most often, directly or through its
+    cities, with ties going to the earliest mention. The location is the first
+    city or district mentioned in that state.
+
+    Returns:
+        Tuple of (location, state); either may be None
+    """
+    mentions = [m for m in place_mentions(text) if m.place.state]
+    if not mentions:
+        return None, None
+
+    counts = Counter(m.place.state for m in mentions)
+    first_seen = {}
+    for index, mention in enumerate(mentions):
+        first_seen.setdefault(mention.place.state, index)
+    state = max(counts, key=lambda s: (counts[s], -first_seen[s]))
+
+    location = next((m.place.name for m in mentions
+                     if m.place.kind == CITY and m.place.state == state), None)
+    return location, state
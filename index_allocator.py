@@ -0,0 +1,153 @@
+"""
+Race-free allocation of project index numbers.
+Hands out Project.index values from a Postgres sequence, or on SQLite from a
+counter row in the id_allocator table, so concurrent crawl workers never get
+the same number and bulk inserts reserve a whole block in one round trip
+instead of running max(index) for every row.
+"""
+
+import logging
+import threading
+
+from sqlalchemy import text
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class IndexAllocator:
+    """
+    Allocator of increasing integers for one column.
+
+    On Postgres, values come from a sequence; they're never reused, even when
+    the inserting transaction rolls back. Elsewhere a counter row is updated in
+    the caller's transaction, which holds SQLite's write lock until it commits,
+    so concurrent writers are serialized and a rollback returns the numbers.
+    migrations.py creates the sequence or counter at deploy; otherwise it is
+    created on first use, starting after the column's current maximum.
+    """
+
+    def __init__(self, name, table, column):
+        """Initialize an allocator for table.column, identified by name"""
+        self.name = name
+        self.table = table
+        self.column = column
+        self.sequence = f"{name}_seq"
+        self._ready = set()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _bind(session):
+        """The engine or connection behind a session; connections are their own"""
+        return session.get_bind() if hasattr(session, 'get_bind') else session
+
+    def _is_postgres(self, session):
+        return self._bind(session).dialect.name == 'postgresql'
+
+    def _current_max(self):
+        return f'SELECT COALESCE(MAX("{self.column}"), 0) FROM "{self.table}"'
+
+    def _ensure(self, session):
+        """Create the sequence or counter row if this process hasn't seen it yet"""
+        bind = self._bind(session)
+        key = str(bind.engine.url)
+        if key in self._ready:
+            return
+        with self._lock:
+            if key in self._ready:
+                return
+            if self._is_postgres(session):
+                exists = session.execute(text("SELECT to_regclass(:sequence)"),
+                                         {'sequence': self.sequence}).scalar()
+                if exists is None:
+                    # Serialize creation so two workers can't both seed the sequence
+                    session.execute(text("SELECT pg_advisory_xact_lock(hashtext(:name))"),
+                                    {'name': self.sequence})
+                    session.execute(text(f"CREATE SEQUENCE IF NOT EXISTS {self.sequence}"))
+                    self._advance_sequence(session, None)
+            else:
+                session.execute(text("""
+                    CREATE TABLE IF NOT EXISTS id_allocator (
+                        name VARCHAR(64) PRIMARY KEY,
+                        last_value BIGINT NOT NULL
+                    )
+                """))
+                self._seed_counter(session)
+            self._ready.add(key)
+
+    def _seed_counter(self, session):
+        """Insert the counter row, starting at the column maximum, if it's missing"""
+        session.execute(text(f"""
+            INSERT INTO id_allocator (name, last_value)
+            SELECT :name, ({self._current_max()})
+            WHERE NOT EXISTS (SELECT 1 FROM id_allocator WHERE name = :name)
+        """), {'name': self.name})
+
+    def _advance_sequence(self, session, value):
+        """Move the sequence past value (or the column maximum), never backwards"""
+        floor = f"({self._current_max()})" if value is None else ":value"
+        session.execute(text(f"""
+            SELECT setval(:sequence, {floor})
+            FROM {self.sequence}
+            WHERE {floor} > CASE WHEN is_called THEN last_value ELSE last_value - 1 END
+        """), {'sequence': self.sequence, 'value': value})
+
+    def reserve(self, session, count=1):
+        """
+        Reserve count consecutive-order values in one round trip
+
+        Args:
+            session: SQLAlchemy session (or connection) whose transaction the
+                reservation joins
+            count: Number of values needed
+
+        Returns:
+            List of the reserved values, increasing
+        """
+        if count <= 0:
+            return []
+        self._ensure(session)
+        if self._is_postgres(session):
+            rows = session.execute(
+                text("SELECT nextval(:sequence) FROM generate_series(1, :count)"),
+                {'sequence': self.sequence, 'count': count}
+            ).fetchall()
+            return sorted(row[0] for row in rows)
+
+        increment = text("UPDATE id_allocator SET last_value = last_value + :count WHERE name = :name")
+        params = {'count': count, 'name': self.name}
+        if session.execute(increment, params).rowcount == 0:
+            # The transaction that created the counter row was rolled back
+            self._seed_counter(session)
+            session.execute(increment, params)
+        last = session.execute(text("SELECT last_value FROM id_allocator WHERE name = :name"),
+                               {'name': self.name}).scalar()
+        return list(range(last - count + 1, last + 1))
+
+    def next(self, session):
+        """Allocate a single value"""
+        return self.reserve(session, 1)[0]
+
+    def advance_to(self, session, value):
+        """
+        Make sure future values are greater than value
+
+        Call after inserting rows with explicit values, such as indices read
+        from an imported spreadsheet. On Postgres the check and the move are
+        one statement, but a nextval racing with it can still be repeated, so
+        don't run imports with explicit values during a crawl.
+        """
+        if value is None:
+            return
+        self._ensure(session)
+        if self._is_postgres(session):
+            self._advance_sequence(session, int(value))
+        else:
+            session.execute(
+                text("UPDATE id_allocator SET last_value = MAX(last_value, :value) WHERE name = :name"),
+                {'value': int(value), 'name': self.name}
+            )
+
+
+# Create a global instance for easy import
+project_index_allocator = IndexAllocator('project_index', 'project', 'index')
@@ -0,0 +1,450 @@
+#!/usr/bin/env python3
+"""
+Versioned schema migrations for the project tracker database.
+Migrations are ordered Python functions registered with @migration; upgrade()
+applies the ones not yet recorded in the schema_migrations table. Run it at
+deploy time, before the new code starts serving:
+    python migrations.py upgrade
+    python migrations.py status
+"""
+
+import sys
+import logging
+from collections import namedtuple
+from datetime import datetime
+
+from sqlalchemy import inspect, text
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Arbitrary key for the Postgres advisory lock that serializes concurrent deploys
+ADVISORY_LOCK_ID = 4107201
+
+# A registered migration; transactional=False runs it in autocommit mode
+Migration = namedtuple('Migration', ['version', 'description', 'apply', 'transactional'])
+
+MIGRATIONS = []
+
+
+def migration(version, description, transactional=True):
+    """Register a function of (connection) as a schema migration"""
+    def decorator(func):
+        if any(existing.version == version for existing in MIGRATIONS):
+            raise ValueError(f"Duplicate migration version {version}")
+        MIGRATIONS.append(Migration(version, description, func, transactional))
+        MIGRATIONS.sort(key=lambda m: m.version)
+        return func
+    return decorator
+
+
+def create_index(connection, index):
+    """
+    Create a model-declared index if it doesn't exist yet
+
+    Postgres builds it CONCURRENTLY so the table stays writable; that requires
+    the connection to be in autocommit mode.
+    """
+    table = index.table.name
+    quote = connection.dialect.identifier_preparer.quote
+    columns = ', '.join(quote(column.name) for column in index.columns)
+    unique = 'UNIQUE ' if index.unique else ''
+    concurrently = 'CONCURRENTLY ' if connection.dialect.name == 'postgresql' else ''
+    connection.execute(text(
+        f'CREATE {unique}INDEX {concurrently}IF NOT EXISTS {index.name} ON "{table}" ({columns})'
+    ))
+    logger.info(f"Ensured index {index.name} on {table} ({columns})")
+
+
+def create_model_indexes(connection, *names):
+    """Create the named indexes as the models declare them"""
+    from app import db
+    import models  # noqa: F401  (registers the tables)
+
+    declared = {index.name: index for table in db.metadata.tables.values() for index in table.indexes}
+    for name in names:
+        create_index(connection, declared[name])
+
+
+def add_column(connection, model, name):
+    """Add a model-declared column to its table if the table doesn't have it yet"""
+    table = model.__table__
+    existing = {column['name'] for column in inspect(connection).get_columns(table.name)}
+    if name in existing:
+        return False
+    column = table.columns[name]
+    column_type = column.type.compile(dialect=connection.dialect)
+    connection.execute(text(f'ALTER TABLE "{table.name}" ADD COLUMN {name} {column_type}'))
+    logger.info(f"Added column {table.name}.{name}")
+    return True
+
+
+# ---------------------------------------------------------------------------
+# Migrations. Never edit one that has shipped; add a new version instead.
+# ---------------------------------------------------------------------------
+
+@migration('0001', 'Baseline: create any missing tables')
+def baseline(connection):
+    from app import db
+    import models  # noqa: F401  (registers the tables)
+
+    db.metadata.create_all(bind=connection, checkfirst=True)
+
+
+@migration('0002', 'Indexes for project listings, dashboard and source detail pages',
+           transactional=False)
+def hot_path_indexes(connection):
+    create_model_indexes(connection,
+                         'ix_project_type_created_at', 'ix_project_created_at',
+                         'ix_project_state', 'ix_project_status',
+                         'ix_news_article_source_id_created_at',
+                         'ix_scrape_log_source_id_timestamp', 'ix_scrape_log_timestamp',
+                         'ix_stage_metrics_run_id')
+
+
+@migration('0003', 'Project fingerprints for indexed duplicate detection', transactional=False)
+def project_fingerprints(connection):
+    from models import Project
+    from project_dedup import project_fingerprint, CAPACITY_FIELDS
+
+    add_column(connection, Project, 'fingerprint')
+    add_column(connection, Project, 'company_key')
+
+    # Backfill in batches; rerunning only touches rows still missing a fingerprint
+    table = Project.__table__
+    columns = [table.c.id, table.c.type, table.c.company, table.c.state, table.c.location]
+    columns += [table.c[field] for field in CAPACITY_FIELDS]
+    backfilled = 0
+    while True:
+        rows = connection.execute(
+            table.select().with_only_columns(*columns)
+            .where(table.c.fingerprint.is_(None)).limit(1000)
+        ).mappings().all()
+        if not rows:
+            break
+        updates = []
+        for row in rows:
+            fingerprint, key = project_fingerprint(dict(row))
+            updates.append({'row_id': row['id'], 'fingerprint': fingerprint, 'company_key': key})
+        connection.execute(
+            text('UPDATE project SET fingerprint = :fingerprint, company_key = :company_key '
+                 'WHERE id = :row_id'),
+            updates
+        )
+        backfilled += len(rows)
+    logger.info(f"Backfilled fingerprints of {backfilled} projects")
+
+    create_model_indexes(connection, 'ix_project_fingerprint', 'ix_project_company_key_type')
+
+    if connection.dialect.name == 'postgresql':
+        # Trigram index for fuzzy name matching; skipped where the extension can't be installed
+        try:
+            connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            connection.execute(text(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_project_name_trgm "
+                "ON project USING gin (name gin_trgm_ops)"
+            ))
+        except Exception as e:
+            logger.warning(f"pg_trgm unavailable, fuzzy matching falls back to in-process: {e}")
+
+
+@migration('0004', 'Project index allocator seeded from the current maximum')
+def project_index_allocator(connection):
+    from index_allocator import project_index_allocator as allocator
+
+    allocator.advance_to(connection, connection.execute(
+        text('SELECT MAX("index") FROM project')
+    ).scalar() or 0)
+
+
+@migration('0005', 'Unique project index, renumbering duplicates', transactional=False)
+def unique_project_index(connection):
+    from index_allocator import project_index_allocator as allocator
+
+    # Concurrent crawls used to hand out the same index twice; keep the
+    # oldest project on each index and move the others to new numbers
+    duplicates = connection.execute(text("""
+        SELECT id FROM project p
+        WHERE "index" IS NOT NULL AND EXISTS (
+            SELECT 1 FROM project q WHERE q."index" = p."index" AND q.id < p.id
+        )
+        ORDER BY id
+    """)).scalars().all()
+    for project_id, index in zip(duplicates, allocator.reserve(connection, len(duplicates))):
+        connection.execute(text('UPDATE project SET "index" = :index WHERE id = :id'),
+                           {'index': index, 'id': project_id})
+    if duplicates:
+        logger.info(f"Renumbered {len(duplicates)} projects with duplicate indices")
+
+    create_model_indexes(connection, 'ux_project_index')
+
+
+@migration('0006', 'Article bodies moved to the compressed article_body table')
+def compressed_article_bodies(connection):
+    from models import ArticleBody, NewsArticle
+    from article_store import compress_text, summarize
+
+    ArticleBody.__table__.create(bind=connection, checkfirst=True)
+    add_column(connection, NewsArticle, 'summary')
+    existing = {column['name'] for column in inspect(connection).get_columns('news_article')}
+    if 'content' not in existing:
+        return
+
+    # Copy in batches so the bodies never have to fit in memory at once
+    last_id, moved = 0, 0
+    while True:
+        rows = connection.execute(text(
+            "SELECT id, content FROM news_article "
+            "WHERE id > :last_id AND content IS NOT NULL ORDER BY id LIMIT 1000"
+        ), {'last_id': last_id}).all()
+        if not rows:
+            break
+        bodies, summaries = [], []
+        for article_id, content in rows:
+            codec, data = compress_text(content)
+            bodies.append({'article_id': article_id, 'codec': codec,
+                           'size': len(content), 'data': data})
+            summaries.append({'row_id': article_id, 'summary': summarize(content)})
+        connection.execute(ArticleBody.__table__.insert(), bodies)
+        connection.execute(text('UPDATE news_article SET summary = :summary WHERE id = :row_id'),
+                           summaries)
+        last_id = rows[-1][0]
+        moved += len(rows)
+    logger.info(f"Compressed the bodies of {moved} articles")
+
+    connection.execute(text('ALTER TABLE news_article DROP COLUMN content'))
+
+
+@migration('0007', 'Trigger-maintained project summary for the dashboard and home page')
+def project_summary_table(connection):
+    from models import ProjectSummary
+    from project_summary import install_triggers, rebuild
+
+    ProjectSummary.__table__.create(bind=connection, checkfirst=True)
+    install_triggers(connection)
+    rebuild(connection)
+
+
+@migration('0008', 'Daily source statistics and monthly scrape log partitions')
+def scrape_log_partitions(connection):
+    from models import SourceDailyStats
+    from retention import PARTITION_MONTHS_AHEAD, create_partition, month_start, next_month
+
+    SourceDailyStats.__table__.create(bind=connection, checkfirst=True)
+    if connection.dialect.name != 'postgresql':
+        # SQLite keeps one hot table and moves finished months to rollover tables
+        return
+    if connection.execute(text("""
+        SELECT 1 FROM pg_partitioned_table JOIN pg_class ON pg_class.oid = partrelid
+        WHERE relname = 'scrape_log'
+    """)).first():
+        return
+
+    # A partitioned table can't be the target of stage_metrics' foreign key
+    for foreign_key in inspect(connection).get_foreign_keys('stage_metrics'):
+        if foreign_key['referred_table'] == 'scrape_log':
+            connection.execute(text(f'ALTER TABLE stage_metrics DROP CONSTRAINT "{foreign_key["name"]}"'))
+
+    # The partition key must be part of the primary key and never NULL
+    connection.execute(text('UPDATE scrape_log SET "timestamp" = :now WHERE "timestamp" IS NULL'),
+                       {'now': datetime.utcnow()})
+    connection.execute(text("ALTER TABLE scrape_log RENAME TO scrape_log_unpartitioned"))
+    connection.execute(text("ALTER TABLE scrape_log_unpartitioned RENAME CONSTRAINT scrape_log_pkey "
+                            "TO scrape_log_unpartitioned_pkey"))
+    connection.execute(text("DROP INDEX IF EXISTS ix_scrape_log_source_id_timestamp"))
+    connection.execute(text("DROP INDEX IF EXISTS ix_scrape_log_timestamp"))
+    connection.execute(text("""
+        CREATE TABLE scrape_log (LIKE scrape_log_unpartitioned INCLUDING DEFAULTS)
+        PARTITION BY RANGE ("timestamp")
+    """))
+    connection.execute(text('ALTER TABLE scrape_log ALTER COLUMN "timestamp" SET NOT NULL'))
+    connection.execute(text('ALTER TABLE scrape_log ADD PRIMARY KEY (id, "timestamp")'))
+
+    # One partition per month from the oldest log to PARTITION_MONTHS_AHEAD from now
+    oldest = connection.execute(text('SELECT MIN("timestamp") FROM scrape_log_unpartitioned')).scalar()
+    month = month_start(oldest or datetime.utcnow())
+    last = month_start(datetime.utcnow())
+    for _ in range(PARTITION_MONTHS_AHEAD):
+        last = next_month(last)
+    while month <= last:
+        create_partition(connection, month)
+        month = next_month(month)
+    connection.execute(text("CREATE TABLE scrape_log_default PARTITION OF scrape_log DEFAULT"))
+
+    moved = connection.execute(text("INSERT INTO scrape_log SELECT * FROM scrape_log_unpartitioned")).rowcount
+    sequence = connection.execute(text("SELECT pg_get_serial_sequence('scrape_log_unpartitioned', 'id')")).scalar()
+    if sequence:
+        connection.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY scrape_log.id"))
+    connection.execute(text("DROP TABLE scrape_log_unpartitioned"))
+    connection.execute(text('CREATE INDEX ix_scrape_log_source_id_timestamp ON scrape_log (source_id, "timestamp")'))
+    connection.execute(text('CREATE INDEX ix_scrape_log_timestamp ON scrape_log ("timestamp")'))
+    logger.info(f"Moved {moved} scrape logs into monthly partitions")
+
+
+@migration('0009', 'Index for archiving old article bodies', transactional=False)
+def article_created_at_index(connection):
+    create_model_indexes(connection, 'ix_news_article_created_at')
+
+
+@migration('0010', 'Project fingerprints keyed by the multi-word company name', transactional=False)
+def multi_word_company_keys(connection):
+    from models import Project
+    from project_dedup import project_fingerprint, CAPACITY_FIELDS
+
+    # Company keys used to drop descriptors down to one word; recompute them in
+    # id batches, writing only rows whose fingerprint changed, so reruns are cheap
+    table = Project.__table__
+    columns = [table.c.id, table.c.type, table.c.company, table.c.state, table.c.location,
+               table.c.fingerprint, table.c.company_key]
+    columns += [table.c[field] for field in CAPACITY_FIELDS]
+    last_id, updated = 0, 0
+    while True:
+        rows = connection.execute(
+            table.select().with_only_columns(*columns)
+            .where(table.c.id > last_id).order_by(table.c.id).limit(1000)
+        ).mappings().all()
+        if not rows:
+            break
+        updates = []
+        for row in rows:
+            fingerprint, key = project_fingerprint(dict(row))
+            if (fingerprint, key) != (row['fingerprint'], row['company_key']):
+                updates.append({'row_id': row['id'], 'fingerprint': fingerprint, 'company_key': key})
+        if updates:
+            connection.execute(
+                text('UPDATE project SET fingerprint = :fingerprint, company_key = :company_key '
+                     'WHERE id = :row_id'),
+                updates
+            )
+        updated += len(updates)
+        last_id = rows[-1]['id']
+    logger.info(f"Recomputed fingerprints of {updated} projects")
+
+
+@migration('0011', 'Missing created_at dates set to the epoch for paginated listings')
+def epoch_created_at(connection):
+    from models import NewsArticle, Project, Source
+    from pagination import EPOCH
+
+    # Keyset pagination leaves out rows without a created_at; dating them to the
+    # epoch keeps them listed, after every dated row. The model columns store the
+    # date in the same format as every other row, which SQLite compares as text
+    for model in (Project, Source, NewsArticle):
+        table = model.__table__
+        result = connection.execute(
+            table.update().where(table.c.created_at.is_(None)).values(created_at=EPOCH)
+        )
+        if result.rowcount:
+            logger.info(f"Dated {result.rowcount} {table.name} rows to the epoch")
+
+
+# ---------------------------------------------------------------------------
+
+
+def _ensure_version_table(connection):
+    connection.execute(text("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version VARCHAR(32) PRIMARY KEY,
+            description VARCHAR(200),
+            applied_at TIMESTAMP NOT NULL
+        )
+    """))
+
+
+def applied_versions(engine):
+    """Return the set of migration versions recorded in the database"""
+    with engine.begin() as connection:
+        _ensure_version_table(connection)
+        rows = connection.execute(text("SELECT version FROM schema_migrations")).fetchall()
+    return {row[0] for row in rows}
+
+
+def pending_migrations(engine):
+    """Return the registered migrations not yet applied, in order"""
+    applied = applied_versions(engine)
+    return [m for m in MIGRATIONS if m.version not in applied]
+
+
+def _record(connection, migration_entry):
+    connection.execute(
+        text("INSERT INTO schema_migrations (version, description, applied_at) "
+             "VALUES (:version, :description, :applied_at)"),
+        {'version': migration_entry.version, 'description': migration_entry.description,
+         'applied_at': datetime.utcnow()}
+    )
+
+
+def upgrade(engine=None):
+    """
+    Apply every pending migration in version order
+
+    Each transactional migration commits together with its version record;
+    autocommit migrations must be idempotent, since a failure part-way leaves
+    their completed steps in place and they are rerun on the next upgrade.
+
+    Returns:
+        List of versions applied
+    """
+    if engine is None:
+        from app import app, db
+        with app.app_context():
+            return upgrade(db.engine)
+
+    is_postgres = engine.dialect.name == 'postgresql'
+    applied = []
+    with engine.connect() as lock_connection:
+        if is_postgres:
+            # Concurrent deploys wait here instead of racing through migrations
+            lock_connection.execute(text("SELECT pg_advisory_lock(:id)"), {'id': ADVISORY_LOCK_ID})
+            lock_connection.commit()
+        try:
+            for entry in pending_migrations(engine):
+                logger.info(f"Applying migration {entry.version}: {entry.description}")
+                if entry.transactional:
+                    with engine.begin() as connection:
+                        entry.apply(connection)
+                        _record(connection, entry)
+                else:
+                    with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+                        entry.apply(connection)
+                        _record(connection, entry)
+                applied.append(entry.version)
+        finally:
+            if is_postgres:
+                lock_connection.execute(text("SELECT pg_advisory_unlock(:id)"), {'id': ADVISORY_LOCK_ID})
+                lock_connection.commit()
+
+    if applied:
+        logger.info(f"Applied migrations: {', '.join(applied)}")
+    else:
+        logger.info("Database schema is up to date")
+    return applied
+
+
+def status(engine):
+    """Return (version, description, applied) for every registered migration"""
+    applied = applied_versions(engine)
+    return [(m.version, m.description, m.version in applied) for m in MIGRATIONS]
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Manage the project tracker database schema")
+    parser.add_argument('command', choices=['upgrade', 'status'])
+    args = parser.parse_args(argv)
+
+    from app import app, db
+
+    with app.app_context():
+        if args.command == 'upgrade':
+            applied = upgrade(db.engine)
+            print(f"Applied {len(applied)} migration(s)" + (f": {', '.join(applied)}" if applied else ""))
+        else:
+            for version, description, done in status(db.engine):
+                print(f"{version}  {'applied' if done else 'pending':8}  {description}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
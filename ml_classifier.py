@@ -0,0 +1,318 @@
+"""
+Vectorized batch classifier for renewable energy project types.
+Trains a hashing vectorizer with a linear model on the project rows in the Excel
+corpora and on articles already linked to a stored project, and classifies whole
+batches of articles with a single sparse matrix multiply.
+"""
+
+import os
+import glob
+import hashlib
+import logging
+import threading
+
+import numpy as np
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Backend used by enhanced_scraper.determine_project_type ('rules' or 'sklearn')
+CLASSIFIER_BACKEND = os.environ.get("PROJECT_CLASSIFIER", "rules").lower()
+
+MODEL_PATH = "project_classifier.joblib"
+
+# Excel corpora used for training
+EXCEL_PATTERNS = ['india_renewable_projects_*.xlsx', 'training_data_*.xlsx']
+
+# Column names (lowercase) whose text describes the project
+TEXT_COLUMNS = [
+    'name', 'project name', 'project_name', 'project', 'company', 'developer / promoter',
+    'category', 'value chain', 'input', 'input material', 'output', 'end product',
+    'feedstock type'
+]
+TYPE_COLUMNS = ['type', 'project_type', 'energy_type', 'renewable_type']
+
+
+def normalize_project_type(label):
+    """
+    Map a free-form project type label to the scraper's category keys
+    Returns one of solar/battery/wind/hydro/hydrogen/biofuel or None
+    """
+    if label is None:
+        return None
+    label = str(label).strip().lower()
+    if not label or label == 'nan':
+        return None
+
+    if 'hydrogen' in label:
+        return 'hydrogen'
+    if any(word in label for word in ['bio', 'ethanol']):
+        return 'biofuel'
+    if 'hydro' in label:
+        return 'hydro'
+    if any(word in label for word in ['battery', 'storage']):
+        return 'battery'
+    if 'wind' in label:
+        return 'wind'
+    if 'solar' in label:
+        return 'solar'
+    return None
+
+
+def load_excel_corpus(excel_files=None):
+    """
+    Build (texts, labels) from every project sheet of the Excel corpora
+
+    Rows take their label from a type column when present, otherwise from the
+    sheet name (e.g. 'Battery_Fin.'). Source and summary sheets are skipped.
+    """
+    import pandas as pd
+
+    if excel_files is None:
+        excel_files = sorted({f for pattern in EXCEL_PATTERNS for f in glob.glob(pattern)})
+
+    texts, labels = [], []
+    for excel_file in excel_files:
+        try:
+            sheets = pd.read_excel(excel_file, sheet_name=None)
+        except Exception as e:
+            logger.error(f"Error reading Excel file {excel_file}: {e}")
+            continue
+
+        for sheet_name, df in sheets.items():
+            if df.empty:
+                continue
+            columns = {str(col).strip().lower(): col for col in df.columns}
+            text_cols = [columns[c] for c in TEXT_COLUMNS if c in columns]
+            if not text_cols:
+                continue
+
+            type_col = next((columns[c] for c in TYPE_COLUMNS if c in columns), None)
+            if type_col is not None:
+                row_labels = df[type_col].map(normalize_project_type)
+            else:
+                sheet_label = normalize_project_type(sheet_name)
+                if sheet_label is None:
+                    continue
+                row_labels = pd.Series(sheet_label, index=df.index)
+
+            row_texts = (
+                df[text_cols].fillna('').astype(str)
+                .agg(' '.join, axis=1)
+                .str.strip()
+            )
+            mask = row_labels.notna() & (row_texts != '')
+            texts.extend(row_texts[mask].tolist())
+            labels.extend(row_labels[mask].tolist())
+
+    # Exports repeat the same projects, so drop duplicate rows
+    unique_rows = list(dict.fromkeys(zip(texts, labels)))
+    texts = [text for text, _ in unique_rows]
+    labels = [label for _, label in unique_rows]
+
+    logger.info(f"Loaded {len(texts)} labelled rows from {len(excel_files)} Excel files")
+    return texts, labels
+
+
+def load_article_corpus():
+    """
+    Build (texts, labels) from stored articles that produced a project
+
+    An article is labelled with the type of the project whose source URL is the
+    article URL. Requires an application context.
+    """
+    from app import db
+    from models import ArticleBody, NewsArticle, Project
+    from article_store import decompress_text
+
+    rows = (
+        db.session.query(NewsArticle.title, ArticleBody.codec, ArticleBody.data, Project.type)
+        .join(ArticleBody, ArticleBody.article_id == NewsArticle.id)
+        .join(Project, Project.source == NewsArticle.url)
+        .all()
+    )
+
+    texts, labels = [], []
+    for title, codec, data, project_type in rows:
+        label = normalize_project_type(project_type)
+        content = decompress_text(codec, data) if label else None
+        if label and content:
+            texts.append(f"{title or ''} {content}")
+            labels.append(label)
+
+    logger.info(f"Loaded {len(texts)} labelled articles from the database")
+    return texts, labels
+
+
+class ProjectTypeClassifier:
+    """
+    Linear project-type classifier over hashed unigram and bigram features.
+
+    The hashing vectorizer is stateless, so only the linear weights need to be
+    trained and persisted.
+    """
+
+    def __init__(self, n_features=2 ** 18):
+        """Initialize an untrained classifier"""
+        from sklearn.feature_extraction.text import HashingVectorizer
+
+        self.vectorizer = HashingVectorizer(
+            n_features=n_features,
+            ngram_range=(1, 2),
+            alternate_sign=False,
+            norm='l2',
+            lowercase=True
+        )
+        self.classes = []
+        self.coef = None
+        self.intercept = None
+        self.version = None
+
+    @property
+    def is_trained(self):
+        return self.coef is not None
+
+    def _compute_version(self):
+        """Content hash identifying the trained weights"""
+        digest = hashlib.sha1()
+        digest.update('\x1f'.join(self.classes).encode('utf-8'))
+        digest.update(np.ascontiguousarray(self.coef).tobytes())
+        digest.update(np.ascontiguousarray(self.intercept).tobytes())
+        return digest.hexdigest()[:16]
+
+    def fit(self, texts, labels):
+        """Train the linear model on labelled texts"""
+        from sklearn.linear_model import LogisticRegression
+
+        if len(set(labels)) < 2:
+            raise ValueError("Need examples from at least two project types to train")
+
+        X = self.vectorizer.transform(texts)
+        model = LogisticRegression(max_iter=1000, C=10.0)
+        model.fit(X, labels)
+
+        self.classes = [str(c) for c in model.classes_]
+        # Keep weights as a dense (features x classes) matrix for one matmul per batch
+        self.coef = np.ascontiguousarray(model.coef_.T, dtype=np.float32)
+        self.intercept = model.intercept_.astype(np.float32)
+        if len(self.classes) == 2:
+            # Binary models expose a single weight column for the second class;
+            # a zero column for the first class keeps the softmax equal to the sigmoid
+            self.coef = np.hstack([np.zeros_like(self.coef), self.coef])
+            self.intercept = np.array([0.0, self.intercept[0]], dtype=np.float32)
+        self.version = self._compute_version()
+
+        logger.info(f"Trained classifier on {len(texts)} examples for {self.classes}")
+        return self
+
+    def predict_batch(self, texts):
+        """
+        Classify a batch of texts with a single sparse matrix multiply
+
+        Returns:
+            List of dicts mapping each project type to a probability
+        """
+        if not self.is_trained:
+            raise RuntimeError("Classifier has not been trained")
+        if not texts:
+            return []
+
+        X = self.vectorizer.transform(texts)
+        logits = X @ self.coef + self.intercept
+        logits -= logits.max(axis=1, keepdims=True)
+        probs = np.exp(logits)
+        probs /= probs.sum(axis=1, keepdims=True)
+
+        return [
+            {label: float(p) for label, p in zip(self.classes, row)}
+            for row in probs
+        ]
+
+    def predict_scores(self, text):
+        """Classify a single text; returns a dict of probabilities"""
+        return self.predict_batch([text])[0]
+
+    def save(self, path=MODEL_PATH):
+        """Persist the trained weights"""
+        import joblib
+
+        joblib.dump({
+            'n_features': self.vectorizer.n_features,
+            'classes': self.classes,
+            'coef': self.coef,
+            'intercept': self.intercept
+        }, path)
+        logger.info(f"Saved classifier to {path}")
+
+    @classmethod
+    def load(cls, path=MODEL_PATH):
+        """Load persisted weights"""
+        import joblib
+
+        data = joblib.load(path)
+        classifier = cls(n_features=data['n_features'])
+        classifier.classes = data['classes']
+        classifier.coef = data['coef']
+        classifier.intercept = data['intercept']
+        classifier.version = classifier._compute_version()
+        return classifier
+
+
+def train_classifier(excel_files=None, include_articles=True, save=True):
+    """Train a classifier from the Excel corpora and, if available, stored articles"""
+    texts, labels = load_excel_corpus(excel_files)
+
+    if include_articles:
+        try:
+            article_texts, article_labels = load_article_corpus()
+            texts.extend(article_texts)
+            labels.extend(article_labels)
+        except Exception as e:
+            logger.warning(f"Skipping article corpus: {e}")
+
+    classifier = ProjectTypeClassifier().fit(texts, labels)
+    if save:
+        classifier.save()
+    return classifier
+
+
+_classifier = None
+_classifier_mtime = None
+_classifier_lock = threading.Lock()
+
+
+def _model_mtime():
+    """Return the saved model's mtime, or None if it doesn't exist"""
+    try:
+        return os.stat(MODEL_PATH).st_mtime_ns
+    except OSError:
+        return None
+
+
+def get_classifier():
+    """
+    Return the process-wide classifier, loading or training it on first use
+
+    A model retrained and saved by another process replaces the loaded one.
+    """
+    global _classifier, _classifier_mtime
+
+    def current(mtime):
+        return _classifier is not None and (mtime is None or mtime == _classifier_mtime)
+
+    mtime = _model_mtime()
+    if not current(mtime):
+        with _classifier_lock:
+            if not current(mtime):
+                if mtime is not None:
+                    _classifier = ProjectTypeClassifier.load(MODEL_PATH)
+                else:
+                    _classifier = train_classifier()
+                _classifier_mtime = _model_mtime()
+    return _classifier
+
+
+if __name__ == "__main__":
+    classifier = train_classifier()
+    print(f"Trained classifier for project types: {classifier.classes}")
@@ -1,8 +1,22 @@
 from datetime import datetime
+from sqlalchemy import event
 from app import db
+from article_store import compress_text, decompress_text, summarize
 
 class Project(db.Model):
     """Model for storing project information for all renewable energy categories"""
+    # Indexes for the listing, dashboard and summary access paths; existing
+    # databases get them through migrations.py
+    __table_args__ = (
+        db.Index('ix_project_type_created_at', 'type', 'created_at'),
+        db.Index('ix_project_created_at', 'created_at'),
+        db.Index('ix_project_state', 'state'),
+        db.Index('ix_project_status', 'status'),
+        db.Index('ix_project_fingerprint', 'fingerprint'),
+        db.Index('ix_project_company_key_type', 'company_key', 'type'),
+        db.Index('ux_project_index', 'index', unique=True),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     index = db.Column(db.Integer)
     type = db.Column(db.String(50))  # Solar, Battery, Wind, Hydro, Green Hydrogen, etc.
@@ -51,6 +65,10 @@ class Project(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Duplicate detection keys, maintained on every write (see project_dedup)
+    fingerprint = db.Column(db.String(255))
+    company_key = db.Column(db.String(100))
+    
     def __repr__(self):
         return f'<Project {self.name} ({self.type}) by {self.company}>'
     
@@ -103,6 +121,44 @@ class Project(db.Model):
         }
 
 
+@event.listens_for(Project, 'before_insert')
+@event.listens_for(Project, 'before_update')
+def update_project_fingerprint(mapper, connection, project):
+    """Keep the duplicate detection keys in step with the project's fields"""
+    # Import here to avoid circular imports
+    from project_dedup import assign_fingerprint
+    assign_fingerprint(project)
+
+
+class ProjectSummary(db.Model):
+    """
+    Model for project count and capacity deltas, maintained by triggers on project
+
+    Each row adds (or, negative, removes) projects of one type, state and
+    status; project_summary.py reads, compacts and rebuilds them.
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    type = db.Column(db.String(50))
+    state = db.Column(db.String(100))
+    status = db.Column(db.String(50))
+    project_count = db.Column(db.Integer, nullable=False, default=0)
+    generation_capacity = db.Column(db.Float, default=0)
+    storage_capacity = db.Column(db.Float, default=0)
+    electrolyzer_capacity = db.Column(db.Float, default=0)
+    biofuel_capacity = db.Column(db.Float, default=0)
+    
+    def __repr__(self):
+        return f'<ProjectSummary {self.type}/{self.state}/{self.status}: {self.project_count}>'
+
+
+@event.listens_for(db.metadata, 'after_create')
+def create_project_summary_triggers(target, connection, **kw):
+    """Install the summary triggers whenever the tables are created"""
+    # Import here to avoid circular imports
+    from project_summary import install_triggers
+    install_triggers(connection)
+
+
 class Source(db.Model):
     """Model for storing information about news sources"""
     id = db.Column(db.Integer, primary_key=True)
@@ -119,22 +175,72 @@ class Source(db.Model):
 
 class NewsArticle(db.Model):
     """Model for storing processed news articles"""
+    __table_args__ = (
+        db.Index('ix_news_article_source_id_created_at', 'source_id', 'created_at'),
+        db.Index('ix_news_article_created_at', 'created_at'),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     url = db.Column(db.String(500), unique=True, nullable=False)
     title = db.Column(db.String(500))
-    content = db.Column(db.Text)
+    summary = db.Column(db.String(300))  # Start of the body, for listings
     published_date = db.Column(db.DateTime)
     source_id = db.Column(db.Integer, db.ForeignKey('source.id'))
     source = db.relationship('Source', backref=db.backref('articles', lazy=True))
     is_processed = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    # The body lives compressed in article_body and is loaded on first access
+    body = db.relationship('ArticleBody', uselist=False, lazy='select',
+                           cascade='all, delete-orphan', passive_deletes=True)
+    
+    @property
+    def content(self):
+        """The article text, decompressed from article_body"""
+        return self.body.text if self.body is not None else None
+    
+    @content.setter
+    def content(self, text):
+        self.summary = summarize(text)
+        if text is None:
+            self.body = None
+        elif self.body is None:
+            self.body = ArticleBody(text=text)
+        else:
+            self.body.text = text
+    
     def __repr__(self):
         return f'<NewsArticle {self.title}>'
 
 
+class ArticleBody(db.Model):
+    """Model for compressed article text, kept apart from the article rows listings read"""
+    article_id = db.Column(db.Integer, db.ForeignKey('news_article.id', ondelete='CASCADE'),
+                           primary_key=True)
+    codec = db.Column(db.String(10), nullable=False)  # zstd, zlib or raw
+    size = db.Column(db.Integer)  # Uncompressed length in characters
+    data = db.Column(db.LargeBinary)
+    
+    @property
+    def text(self):
+        return decompress_text(self.codec, self.data)
+    
+    @text.setter
+    def text(self, value):
+        self.codec, self.data = compress_text(value)
+        self.size = len(value or "")
+    
+    def __repr__(self):
+        return f'<ArticleBody {self.article_id} ({self.codec})>'
+
+
 class ScrapeLog(db.Model):
     """Model for logging scraping activities"""
+    __table_args__ = (
+        db.Index('ix_scrape_log_source_id_timestamp', 'source_id', 'timestamp'),
+        db.Index('ix_scrape_log_timestamp', 'timestamp'),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     source_id = db.Column(db.Integer, db.ForeignKey('source.id'))
     source = db.relationship('Source', backref=db.backref('logs', lazy=True))
@@ -146,3 +252,36 @@ class ScrapeLog(db.Model):
     
     def __repr__(self):
         return f'<ScrapeLog {self.source.name if self.source else "Unknown"} {self.timestamp}>'
+
+
+class SourceDailyStats(db.Model):
+    """Model for per-source daily totals of scrape logs past their retention period"""
+    __table_args__ = (
+        db.Index('ux_source_daily_stats_source_id_day', 'source_id', 'day', unique=True),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    source_id = db.Column(db.Integer, db.ForeignKey('source.id'), nullable=False)
+    day = db.Column(db.Date, nullable=False)
+    runs = db.Column(db.Integer, default=0)
+    completed_runs = db.Column(db.Integer, default=0)
+    failed_runs = db.Column(db.Integer, default=0)
+    articles_found = db.Column(db.Integer, default=0)
+    projects_added = db.Column(db.Integer, default=0)
+    
+    def __repr__(self):
+        return f'<SourceDailyStats {self.source_id} {self.day}: {self.runs} runs>'
+
+class StageMetrics(db.Model):
+    """Model for per-stage pipeline timings of a crawl run or one source within it"""
+    id = db.Column(db.Integer, primary_key=True)
+    run_id = db.Column(db.String(36), index=True, nullable=False)
+    source_id = db.Column(db.Integer, db.ForeignKey('source.id'))  # None for the whole-run aggregate
+    source = db.relationship('Source', backref=db.backref('stage_metrics', lazy=True))
+    # No foreign key: scrape_log is partitioned on Postgres and its old rows are dropped
+    scrape_log_id = db.Column(db.Integer)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    metrics = db.Column(db.Text)  # JSON from stage_metrics.MetricsRecorder.to_dict()
+    
+    def __repr__(self):
+        return f'<StageMetrics {self.run_id} {self.source.name if self.source else "run"}>'
@@ -0,0 +1,128 @@
+"""
+Optional spaCy named-entity stage for the extraction pipeline.
+Runs a small spaCy model over batches of articles with nlp.pipe, keeping only
+the components NER needs, and attaches organization, place and date entities
+to each text_analysis.Document for the company, location and completion date
+extractors. Disabled unless PROJECT_NER=spacy and spaCy is installed.
+"""
+
+import os
+import logging
+import threading
+from collections import namedtuple
+
+from text_analysis import as_document
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Configuration via environment
+NER_BACKEND = os.environ.get("PROJECT_NER", "none").lower()
+SPACY_MODEL = os.environ.get("SPACY_MODEL", "en_core_web_sm")
+NER_BATCH_SIZE = int(os.environ.get("NER_BATCH_SIZE", "32"))
+NER_PROCESSES = int(os.environ.get("NER_PROCESSES", "1"))
+
+# Components that never contribute to entity recognition
+UNUSED_COMPONENTS = ['parser', 'tagger', 'attribute_ruler', 'lemmatizer', 'senter', 'textcat']
+
+# Entity labels kept, grouped by how the extractors use them
+ORG_LABELS = {'ORG'}
+PLACE_LABELS = {'GPE', 'LOC'}
+DATE_LABELS = {'DATE'}
+
+# Only the start of long articles is annotated; project facts sit up front
+MAX_NER_CHARS = 20000
+
+# An entity found by the NER stage, with character offsets into the raw text
+Entity = namedtuple('Entity', ['text', 'label', 'start', 'end'])
+
+# Entities of one document, grouped for the extractors
+Entities = namedtuple('Entities', ['orgs', 'places', 'dates'])
+
+try:
+    import spacy
+    SPACY_AVAILABLE = True
+except ImportError:
+    SPACY_AVAILABLE = False
+
+_nlp = None
+_nlp_lock = threading.Lock()
+
+
+def is_enabled():
+    """Whether the NER stage is configured and spaCy is importable"""
+    return NER_BACKEND == 'spacy' and SPACY_AVAILABLE
+
+
+def get_nlp():
+    """
+    Return the process-wide spaCy pipeline, loading it on first use
+
+    Worker processes started by nlp.pipe receive the loaded pipeline, so the
+    model is loaded once per process.
+    """
+    global _nlp
+    if _nlp is None:
+        with _nlp_lock:
+            if _nlp is None:
+                _nlp = spacy.load(SPACY_MODEL, exclude=UNUSED_COMPONENTS)
+                logger.info(f"Loaded spaCy model {SPACY_MODEL} with pipes {_nlp.pipe_names}")
+    return _nlp
+
+
+def _group_entities(spacy_doc):
+    """Convert a spaCy Doc's entities into an Entities tuple"""
+    orgs, places, dates = [], [], []
+    for ent in spacy_doc.ents:
+        entity = Entity(ent.text.strip(), ent.label_, ent.start_char, ent.end_char)
+        if ent.label_ in ORG_LABELS:
+            orgs.append(entity)
+        elif ent.label_ in PLACE_LABELS:
+            places.append(entity)
+        elif ent.label_ in DATE_LABELS:
+            dates.append(entity)
+    return Entities(orgs, places, dates)
+
+
+def annotate_documents(docs, batch_size=None, n_process=None):
+    """
+    Run NER over a batch of documents and attach the results
+
+    Sets Document.entities on every document that doesn't have them yet. Does
+    nothing when the NER stage is disabled.
+
+    Args:
+        docs: Iterable of texts or text_analysis.Document
+        batch_size: Texts per nlp.pipe batch (default NER_BATCH_SIZE)
+        n_process: Worker processes for nlp.pipe (default NER_PROCESSES)
+
+    Returns:
+        List of the Documents, in input order
+    """
+    docs = [as_document(doc) for doc in docs]
+    if not is_enabled():
+        return docs
+
+    pending = [doc for doc in docs if doc.entities is None and doc]
+    if not pending:
+        return docs
+
+    nlp = get_nlp()
+    texts = (doc.text[:MAX_NER_CHARS] for doc in pending)
+    try:
+        for doc, spacy_doc in zip(pending, nlp.pipe(texts,
+                                                    batch_size=batch_size or NER_BATCH_SIZE,
+                                                    n_process=n_process or NER_PROCESSES)):
+            doc.entities = _group_entities(spacy_doc)
+    except Exception as e:
+        logger.error(f"NER batch failed: {e}")
+
+    return docs
+
+
+def document_entities(content):
+    """Return the Entities of a text or Document, annotating it if needed; None when disabled"""
+    doc = as_document(content)
+    if doc.entities is None and is_enabled():
+        annotate_documents([doc], n_process=1)
+    return doc.entities
@@ -4,28 +4,18 @@ import logging
 import urllib.parse
 import requests
 import json
-import nltk
 from datetime import datetime
 from bs4 import BeautifulSoup
 from urllib.parse import urlparse
 import trafilatura
 
+from gazetteer import NATIONAL, india_markers
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, 
                     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger('scraper')
 
-# Initialize NLTK resources if needed
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt', quiet=True)
-    
-try:
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('stopwords', quiet=True)
-
 # Energy category definitions
 ENERGY_CATEGORIES = {
     "Solar": {
@@ -270,19 +260,15 @@ def is_india_project(text):
     # Convert to lowercase for case-insensitive matching
     text_lower = text.lower()
     
-    # Strong India indicators
-    strong_indicators = [
-        'india', 'indian', 'new delhi', 'goi', 'government of india', 
-        'ministry of', 'make in india', 'niti aayog', 'pm modi', 'narendra modi'
-    ]
+    # Indian places and national markers in one gazetteer pass
+    markers = india_markers(text)
     
-    # Indian states and cities
-    indian_locations = [
-        'gujarat', 'maharashtra', 'tamil nadu', 'karnataka', 'rajasthan',
-        'uttar pradesh', 'madhya pradesh', 'andhra pradesh', 'punjab', 'odisha',
-        'telangana', 'kerala', 'haryana', 'delhi', 'west bengal', 'goa',
-        'mumbai', 'delhi', 'chennai', 'bengaluru', 'hyderabad', 'pune', 'ahmedabad'
-    ]
+    # Check for strong indicators
+    if any(marker.kind == NATIONAL or marker.name == 'New Delhi' for marker in markers):
+        return True
+    
+    # Check for locations
+    location_count = sum(1 for marker in markers if marker.state)
     
     # Indian companies
     indian_companies = [
@@ -292,17 +278,6 @@ def is_india_project(text):
         'nhpc', 'powergrid', 'suzlon', 'inox wind', 'indian oil', 'hindustan'
     ]
     
-    # Check for strong indicators
-    for indicator in strong_indicators:
-        if indicator in text_lower:
-            return True
-    
-    # Check for locations
-    location_count = 0
-    for location in indian_locations:
-        if location in text_lower:
-            location_count += 1
-    
     # Check for companies
     company_count = 0
     for company in indian_companies:
@@ -0,0 +1,126 @@
+"""
+Keyset pagination for project, source and article listings.
+Pages are ordered newest first by (created_at, id) and addressed by opaque
+cursors holding the position of a row, so fetching any page is an index
+range scan of one page of rows, however deep into the listing it is,
+unlike OFFSET, which reads and discards every row before the page.
+Rows without a created_at have no position and are left out; migrations
+date existing ones to EPOCH, so they are listed last.
+"""
+
+import os
+import json
+import base64
+import datetime
+from collections import namedtuple
+
+from sqlalchemy import or_
+
+# Rows per page unless a request asks for another size, and the largest size allowed
+PAGE_SIZE = int(os.environ.get("PAGE_SIZE", "50"))
+MAX_PAGE_SIZE = int(os.environ.get("MAX_PAGE_SIZE", "500"))
+
+# One page of rows; a cursor is None when there is no page in that direction
+Page = namedtuple('Page', ['items', 'next_cursor', 'prev_cursor', 'page_size'])
+
+# created_at given to rows that were stored without one
+EPOCH = datetime.datetime(1970, 1, 1)
+
+
+def encode_cursor(created_at, row_id):
+    """Return the opaque cursor of a row position"""
+    position = [created_at.isoformat(), row_id]
+    return base64.urlsafe_b64encode(json.dumps(position).encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    Return the (created_at, id) position of a cursor
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return datetime.datetime.fromisoformat(created_at), int(row_id)
+    except (TypeError, ValueError, UnicodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def page_args(args):
+    """
+    Read after, before and limit from request arguments
+
+    Raises:
+        ValueError: If a cursor or the limit is invalid, or both cursors are given
+    """
+    after, before = args.get('after'), args.get('before')
+    if after and before:
+        raise ValueError("Give either after or before, not both")
+    try:
+        limit = int(args.get('limit', PAGE_SIZE))
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid limit: {args.get('limit')}")
+    if limit < 1:
+        raise ValueError("limit must be at least 1")
+    return {
+        'after': decode_cursor(after) if after else None,
+        'before': decode_cursor(before) if before else None,
+        'limit': min(limit, MAX_PAGE_SIZE),
+    }
+
+
+def paginate(query, model, after=None, before=None, limit=PAGE_SIZE):
+    """
+    Return one page of a query, newest first by (created_at, id)
+
+    Args:
+        query: Query of model rows, filtered but not ordered
+        model: Model class with created_at and id columns
+        after: Position the page starts after (older rows), or None
+        before: Position the page ends before (newer rows), or None
+        limit: Rows per page
+
+    Returns:
+        Page of the rows
+    """
+    created_at, row_id = model.created_at, model.id
+    # NULLs sort differently per database and can't be encoded in a cursor
+    query = query.filter(created_at.isnot(None))
+    if before is not None:
+        # Walk towards newer rows, then put the page back in listing order.
+        # The bounds on created_at alone let the (created_at) index serve the range
+        position_at, position_id = before
+        query = query.filter(created_at >= position_at,
+                             or_(created_at > position_at, row_id > position_id))
+        rows = query.order_by(created_at.asc(), row_id.asc()).limit(limit + 1).all()
+        more_newer = len(rows) > limit
+        items = list(reversed(rows[:limit]))
+        more_older = True
+    else:
+        if after is not None:
+            position_at, position_id = after
+            query = query.filter(created_at <= position_at,
+                                 or_(created_at < position_at, row_id < position_id))
+        rows = query.order_by(created_at.desc(), row_id.desc()).limit(limit + 1).all()
+        more_older = len(rows) > limit
+        items = rows[:limit]
+        more_newer = after is not None
+
+    next_cursor = prev_cursor = None
+    if items and more_older:
+        next_cursor = encode_cursor(items[-1].created_at, items[-1].id)
+    if items and more_newer:
+        prev_cursor = encode_cursor(items[0].created_at, items[0].id)
+    return Page(items, next_cursor, prev_cursor, limit)
+
+
+def page_json(page, serialize):
+    """Return the JSON body of a page, serializing each row with serialize"""
+    return {
+        'items': [serialize(item) for item in page.items],
+        'next_cursor': page.next_cursor,
+        'prev_cursor': page.prev_cursor,
+        'page_size': page.page_size,
+    }
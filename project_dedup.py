@@ -0,0 +1,232 @@
+"""
+Duplicate project detection by fingerprint and name similarity.
+Every project stores a fingerprint built from its canonical company, type,
+state and a capacity bucket, so an exact duplicate is one indexed lookup.
+Near duplicates (a capacity on a bucket edge, a missing state) are then
+found among the same company's projects of that type by trigram similarity
+of the names, computed by pg_trgm on Postgres and in-process elsewhere.
+"""
+
+import re
+import math
+import logging
+
+from sqlalchemy import text
+
+from company_registry import clean_company_name, company_aliases
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Neighbouring capacity buckets differ by this factor
+CAPACITY_BUCKET_RATIO = 1.25
+
+# Minimum trigram similarity of two names to call the projects duplicates
+NAME_SIMILARITY = 0.5
+
+# Fuzzy candidates fetched per lookup
+MAX_CANDIDATES = 50
+
+# Capacity fields in the order that identifies a project's size
+CAPACITY_FIELDS = ['generation_capacity', 'storage_capacity', 'electrolyzer_capacity',
+                   'biofuel_capacity', 'module_capacity', 'cell_capacity', 'integration_capacity']
+
+# Values treated as an unknown state
+UNKNOWN_VALUES = {'', 'unknown', 'n/a', 'na', 'nan', 'none', 'india'}
+
+NON_ALNUM_PATTERN = re.compile(r'[^a-z0-9]+')
+
+
+def _compact(value):
+    """Lowercase a value and drop everything but letters and digits"""
+    compact = NON_ALNUM_PATTERN.sub('', str(value or '').lower())
+    return '' if compact in UNKNOWN_VALUES else compact
+
+
+def _field(record, name):
+    """Read a field from a dict or a model instance"""
+    if isinstance(record, dict):
+        return record.get(name)
+    return getattr(record, name, None)
+
+
+def company_key(company):
+    """
+    Return the canonical key a company is fingerprinted by
+
+    Legal suffixes and generic trailing descriptors are dropped, so "Adani
+    Green Energy Ltd" and "Adani Green" share a key, but the key keeps at
+    least two words: "Adani Solar" and "Adani Green Energy" are different
+    companies. The key depends only on the name, not on the company
+    registry, so stored fingerprints never go stale.
+    """
+    if not isinstance(company, str):
+        return ''
+    cleaned = clean_company_name(company) or company
+    aliases = company_aliases(cleaned)
+    return _compact(aliases[-1] if aliases else cleaned)
+
+
+def primary_capacity(record):
+    """Return the first positive capacity of a project, or None"""
+    for field in CAPACITY_FIELDS:
+        try:
+            value = float(_field(record, field) or 0)
+        except (TypeError, ValueError):
+            continue
+        if value > 0:
+            return value
+    return None
+
+
+def capacity_bucket(capacity):
+    """Return the logarithmic bucket of a capacity, or None when unknown"""
+    if not capacity or capacity <= 0:
+        return None
+    return int(round(math.log(capacity, CAPACITY_BUCKET_RATIO)))
+
+
+def project_fingerprint(record):
+    """
+    Return (fingerprint, company_key) for a project dict or Project
+
+    Dicts from the scrapers carry the state as "location"; it's used when no
+    "state" is present.
+    """
+    key = company_key(_field(record, 'company'))
+    state = _field(record, 'state') or _field(record, 'location')
+    bucket = capacity_bucket(primary_capacity(record))
+    fingerprint = '|'.join([
+        _compact(_field(record, 'type')), key, _compact(state),
+        '' if bucket is None else str(bucket)
+    ])
+    return fingerprint[:255], key[:100]
+
+
+def assign_fingerprint(project):
+    """Set the fingerprint and company_key columns of a Project from its fields"""
+    project.fingerprint, project.company_key = project_fingerprint(project)
+
+
+def trigrams(value):
+    """Return the set of word trigrams of a string, padded the way pg_trgm pads them"""
+    grams = set()
+    for word in re.findall(r'[a-z0-9]+', (value or '').lower()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def name_similarity(a, b):
+    """Trigram similarity of two names, matching pg_trgm's similarity()"""
+    grams_a, grams_b = trigrams(a), trigrams(b)
+    if not grams_a or not grams_b:
+        return 0.0
+    return len(grams_a & grams_b) / len(grams_a | grams_b)
+
+
+_trgm_available = None
+
+
+def trigram_search_available(session):
+    """Whether the database has the pg_trgm extension installed"""
+    global _trgm_available
+    if _trgm_available is None:
+        _trgm_available = False
+        if session.get_bind().dialect.name == 'postgresql':
+            try:
+                _trgm_available = session.execute(
+                    text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+                ).first() is not None
+            except Exception as e:
+                logger.warning(f"Could not check for pg_trgm: {e}")
+    return _trgm_available
+
+
+def _compatible_capacity(a, b):
+    """Whether two capacity buckets could describe the same project"""
+    return a is None or b is None or abs(a - b) <= 1
+
+
+def duplicates(record, other):
+    """
+    Whether two projects (dicts or Projects) describe the same project
+
+    The in-memory counterpart of find_duplicate, for projects not yet stored.
+    """
+    fingerprint, key = project_fingerprint(record)
+    other_fingerprint, other_key = project_fingerprint(other)
+    bucket = capacity_bucket(primary_capacity(record))
+    similar_names = name_similarity(_field(record, 'name'), _field(other, 'name')) >= NAME_SIMILARITY
+    if key and bucket is not None and fingerprint == other_fingerprint:
+        return similar_names
+
+    if not key or key != other_key or _field(record, 'type') != _field(other, 'type'):
+        return False
+    if not _compatible_capacity(bucket, capacity_bucket(primary_capacity(other))):
+        return False
+    state = _compact(_field(record, 'state') or _field(record, 'location'))
+    other_state = _compact(_field(other, 'state') or _field(other, 'location'))
+    if state and other_state and state != other_state:
+        return False
+    return similar_names
+
+
+def find_duplicate(record):
+    """
+    Return a stored Project that duplicates a project dict or Project, or None
+
+    Projects of the same type are duplicates when their names are similar,
+    their companies share a key, their states don't conflict and their
+    capacities are in the same or a neighbouring bucket. Projects with an
+    identical fingerprint, which includes a company and a capacity, are
+    looked up first by index; their names must still be similar, since one
+    company often builds several plants of a size in the same state.
+    """
+    # Import here to avoid circular imports
+    from app import db
+    from models import Project
+
+    fingerprint, key = project_fingerprint(record)
+    project_id = getattr(record, 'id', None)
+    bucket = capacity_bucket(primary_capacity(record))
+
+    name = _field(record, 'name')
+    if not name:
+        return None
+
+    if key and bucket is not None:
+        exact = Project.query.filter(Project.fingerprint == fingerprint)
+        if project_id is not None:
+            exact = exact.filter(Project.id != project_id)
+        for candidate in exact.limit(MAX_CANDIDATES):
+            if name_similarity(name, candidate.name) >= NAME_SIMILARITY:
+                return candidate
+    project_type = _field(record, 'type')
+    state = _compact(_field(record, 'state') or _field(record, 'location'))
+
+    if trigram_search_available(db.session):
+        similarity = db.func.similarity(Project.name, name)
+        candidates = Project.query.filter(Project.type == project_type,
+                                          similarity >= NAME_SIMILARITY)
+        # Without a company only the trigram index on name narrows the search
+        candidates = (candidates.filter(Project.company_key == key) if key
+                      else candidates.filter(Project.name.op('%')(name)))
+        candidates = candidates.order_by(similarity.desc())
+    elif key:
+        candidates = Project.query.filter(Project.company_key == key,
+                                          Project.type == project_type)
+    else:
+        return None
+
+    for candidate in candidates.limit(MAX_CANDIDATES):
+        if candidate.id == project_id:
+            continue
+        if not _compatible_capacity(bucket, capacity_bucket(primary_capacity(candidate))):
+            continue
+        candidate_state = _compact(candidate.state)
+        if state and candidate_state and state != candidate_state:
+            continue
+        if name_similarity(name, candidate.name) >= NAME_SIMILARITY:
+            return candidate
+    return None
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Incrementally maintained project counts and capacity totals.
+Database triggers on the project table append a delta row to project_summary
+for every insert, delete and relevant update, whichever code path wrote it
+(ORM, bulk upserts or plain SQL). The dashboard and home page add up this
+small table instead of aggregating every project on each view. compact()
+folds the deltas back into one row per (type, state, status) and rebuild()
+recomputes the table from scratch for repair:
+    python project_summary.py rebuild
+    python project_summary.py compact
+"""
+
+import sys
+import logging
+from collections import namedtuple
+
+from sqlalchemy import delete, func, select, text
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Capacity totals kept per summary row
+SUMMARY_CAPACITIES = ['generation_capacity', 'storage_capacity',
+                      'electrolyzer_capacity', 'biofuel_capacity']
+
+# Project columns whose changes move a project between summary rows
+SUMMARY_COLUMNS = ['type', 'state', 'status'] + SUMMARY_CAPACITIES
+
+# Rows returned by ProjectTotals.by(), shaped like the GROUP BY rows the templates read
+DIMENSION_ROWS = {
+    'type': namedtuple('TypeCount', ['type', 'count']),
+    'state': namedtuple('StateCount', ['state', 'count']),
+    'status': namedtuple('StatusCount', ['status', 'count']),
+}
+
+
+def _delta_values(row, sign):
+    """SQL value list of a delta row for NEW or OLD"""
+    sign_prefix = '-' if sign < 0 else ''
+    values = [f"{row}.type", f"{row}.state", f"{row}.status", f"{sign}"]
+    values += [f"{sign_prefix}COALESCE({row}.{column}, 0)" for column in SUMMARY_CAPACITIES]
+    return ', '.join(values)
+
+
+def _insert_delta(row, sign):
+    columns = ', '.join(['type', 'state', 'status', 'project_count'] + SUMMARY_CAPACITIES)
+    return f"INSERT INTO project_summary ({columns}) VALUES ({_delta_values(row, sign)});"
+
+
+def _sqlite_triggers():
+    changed = ' OR '.join(f"OLD.{column} IS NOT NEW.{column}" for column in SUMMARY_COLUMNS)
+    return [
+        f"""CREATE TRIGGER IF NOT EXISTS project_summary_insert AFTER INSERT ON project
+            BEGIN {_insert_delta('NEW', 1)} END""",
+        f"""CREATE TRIGGER IF NOT EXISTS project_summary_delete AFTER DELETE ON project
+            BEGIN {_insert_delta('OLD', -1)} END""",
+        f"""CREATE TRIGGER IF NOT EXISTS project_summary_update
+            AFTER UPDATE OF {', '.join(SUMMARY_COLUMNS)} ON project WHEN {changed}
+            BEGIN {_insert_delta('OLD', -1)} {_insert_delta('NEW', 1)} END""",
+    ]
+
+
+def _postgres_triggers():
+    old = ', '.join(f"OLD.{column}" for column in SUMMARY_COLUMNS)
+    new = ', '.join(f"NEW.{column}" for column in SUMMARY_COLUMNS)
+    return [
+        f"""CREATE OR REPLACE FUNCTION project_summary_delta() RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP = 'UPDATE' AND ROW({old}) IS NOT DISTINCT FROM ROW({new}) THEN
+                    RETURN NULL;
+                END IF;
+                IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                    {_insert_delta('OLD', -1)}
+                END IF;
+                IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                    {_insert_delta('NEW', 1)}
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql""",
+        f"""CREATE TRIGGER project_summary_delta
+            AFTER INSERT OR DELETE OR UPDATE OF {', '.join(SUMMARY_COLUMNS)} ON project
+            FOR EACH ROW EXECUTE PROCEDURE project_summary_delta()""",
+    ]
+
+
+def install_triggers(connection):
+    """Create the triggers that keep project_summary current, if they're missing"""
+    if connection.dialect.name == 'postgresql':
+        exists = connection.execute(text(
+            "SELECT 1 FROM pg_trigger WHERE tgname = 'project_summary_delta'"
+        )).first()
+        if exists:
+            return
+        statements = _postgres_triggers()
+    elif connection.dialect.name == 'sqlite':
+        statements = _sqlite_triggers()
+    else:
+        logger.warning(f"Project summary triggers are not supported on {connection.dialect.name}")
+        return
+    for statement in statements:
+        connection.execute(text(statement))
+    logger.info("Installed project summary triggers")
+
+
+def rebuild(session=None):
+    """
+    Recompute project_summary from the project table
+
+    Repairs totals after writes that bypass triggers, like TRUNCATE, or the
+    rounding drift of many capacity updates. Takes a session or a
+    connection; the caller commits.
+    """
+    if session is None:
+        from app import db
+        session = db.session
+
+    bind = session.get_bind() if hasattr(session, 'get_bind') else session
+    if bind.dialect.name == 'postgresql':
+        # Hold off project writes, whose deltas would otherwise be lost or doubled
+        session.execute(text("LOCK TABLE project IN SHARE MODE"))
+    session.execute(text("DELETE FROM project_summary"))
+    sums = ', '.join(f"COALESCE(SUM({column}), 0)" for column in SUMMARY_CAPACITIES)
+    columns = ', '.join(['type', 'state', 'status', 'project_count'] + SUMMARY_CAPACITIES)
+    result = session.execute(text(f"""
+        INSERT INTO project_summary ({columns})
+        SELECT type, state, status, COUNT(*), {sums}
+        FROM project GROUP BY type, state, status
+    """))
+    logger.info(f"Rebuilt project summary: {result.rowcount} rows")
+    return result.rowcount
+
+
+def compact(session=None):
+    """
+    Fold the delta rows into one row per (type, state, status)
+
+    Deletes and re-adds exactly the rows it read, so deltas committed
+    meanwhile are kept. The caller commits.
+
+    Returns:
+        Number of delta rows folded
+    """
+    # Import here to avoid circular imports
+    from models import ProjectSummary
+
+    if session is None:
+        from app import db
+        session = db.session
+
+    table = ProjectSummary.__table__
+    last_id = session.execute(select(func.max(table.c.id))).scalar()
+    if last_id is None:
+        return 0
+    rows = session.execute(
+        delete(table).where(table.c.id <= last_id)
+        .returning(table.c.type, table.c.state, table.c.status, table.c.project_count,
+                   *[table.c[column] for column in SUMMARY_CAPACITIES])
+    ).all()
+
+    folded = {}
+    for row in rows:
+        key = (row.type, row.state, row.status)
+        totals = folded.setdefault(key, [0] + [0.0] * len(SUMMARY_CAPACITIES))
+        totals[0] += row.project_count
+        for i, column in enumerate(SUMMARY_CAPACITIES, start=1):
+            totals[i] += getattr(row, column) or 0.0
+
+    compacted = [dict(zip(['type', 'state', 'status', 'project_count'] + SUMMARY_CAPACITIES,
+                          key + tuple(totals)))
+                 for key, totals in folded.items() if totals[0] != 0]
+    if compacted:
+        session.execute(table.insert(), compacted)
+    logger.info(f"Compacted {len(rows)} project summary rows into {len(compacted)}")
+    return len(rows)
+
+
+def compact_summary():
+    """Compact and commit, logging instead of raising; for the end of crawl runs and imports"""
+    from app import db
+
+    try:
+        compact(db.session)
+        db.session.commit()
+    except Exception as e:
+        logger.error(f"Error compacting project summary: {str(e)}")
+        db.session.rollback()
+
+
+class ProjectTotals:
+    """Project counts and capacity totals by type, state and status."""
+
+    def __init__(self, rows):
+        """Initialize from (type, state, status, count, *capacities) rows"""
+        self.rows = [row for row in rows if row[3]]
+
+    def count(self, *types):
+        """Number of projects of the given types, or of all projects"""
+        return sum(row[3] for row in self.rows if not types or row[0] in types)
+
+    def capacity(self, column, *types):
+        """Total of a capacity column over projects of the given types"""
+        index = 4 + SUMMARY_CAPACITIES.index(column)
+        return sum(row[index] for row in self.rows if not types or row[0] in types)
+
+    def by(self, dimension, by_count=False):
+        """
+        Project counts grouped by 'type', 'state' or 'status'
+
+        Returns:
+            List of (value, count) rows with attributes named after the
+            dimension and count, ordered by value or by count, largest first
+        """
+        position = ['type', 'state', 'status'].index(dimension)
+        counts = {}
+        for row in self.rows:
+            counts[row[position]] = counts.get(row[position], 0) + row[3]
+        grouped = [DIMENSION_ROWS[dimension](value, count)
+                   for value, count in counts.items() if count]
+        if by_count:
+            return sorted(grouped, key=lambda row: row.count, reverse=True)
+        return sorted(grouped, key=lambda row: (row[0] is not None, row[0] or ''))
+
+
+def load_totals(session=None):
+    """Read the project totals with one query over project_summary"""
+    # Import here to avoid circular imports
+    from models import ProjectSummary
+
+    if session is None:
+        from app import db
+        session = db.session
+
+    table = ProjectSummary.__table__
+    rows = session.execute(
+        select(table.c.type, table.c.state, table.c.status,
+               func.sum(table.c.project_count),
+               *[func.coalesce(func.sum(table.c[column]), 0.0) for column in SUMMARY_CAPACITIES])
+        .group_by(table.c.type, table.c.state, table.c.status)
+    ).all()
+    return ProjectTotals(rows)
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Maintain the project summary table")
+    parser.add_argument('command', choices=['rebuild', 'compact'])
+    args = parser.parse_args(argv)
+
+    from app import app, db
+
+    with app.app_context():
+        if args.command == 'rebuild':
+            rows = rebuild(db.session)
+            print(f"Rebuilt project summary: {rows} rows")
+        else:
+            rows = compact(db.session)
+            print(f"Compacted {rows} project summary rows")
+        db.session.commit()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,11 +3,16 @@ import logging
 import time
 import datetime
 import sys
+import json
+import uuid
 import threading
 from app import app, db
-from models import Project, Source, NewsArticle, ScrapeLog
-from scraper import fetch_news_from_source, extract_article_content, extract_project_data
+from models import Project, Source, NewsArticle, ScrapeLog, StageMetrics
 from progress_tracker import progress
+from project_dedup import find_duplicate
+from unit_of_work import SourceUnitOfWork
+from project_summary import compact_summary
+from stage_metrics import MetricsRecorder, count, recording, span
 
 logger = logging.getLogger(__name__)
 
@@ -97,9 +102,113 @@ def initialize_sources():
             return 0
 
 
-def check_source(source):
-    """Check a source for new articles and projects"""
+def save_stage_metrics(run_id, recorder, source=None, log_entry=None):
+    """Store a recorder's stage timings with its crawl run"""
+    try:
+        db.session.add(StageMetrics(
+            run_id=run_id,
+            source_id=source.id if source else None,
+            scrape_log_id=log_entry.id if log_entry else None,
+            metrics=json.dumps(recorder.to_dict())
+        ))
+        db.session.commit()
+    except Exception as e:
+        logger.error(f"Error saving stage metrics: {str(e)}")
+        db.session.rollback()
+
+
+def _safe_float(value):
+    """Safely convert value to float, return None if conversion fails"""
+    if value is None:
+        return None
+    try:
+        if isinstance(value, str) and value.lower() in ['unknown', 'n/a', '']:
+            return None
+        return float(value)
+    except (ValueError, TypeError):
+        return None
+
+
+def build_project(project_data, article_url):
+    """Create an unsaved Project from scraper output; its index is assigned when stored"""
+    # Format dates
+    if isinstance(project_data.get("Announcement Date"), str):
+        try:
+            announcement_date = datetime.datetime.strptime(
+                project_data["Announcement Date"], "%d-%m-%Y"
+            ).date()
+        except ValueError:
+            announcement_date = datetime.datetime.now().date()
+    else:
+        announcement_date = datetime.datetime.now().date()
+    
+    # Create new project with correct lowercase keys from scraper
+    new_project = Project()
+    new_project.type = project_data.get("type", "Unknown")
+    new_project.name = project_data.get("name", "Renewable Energy Project")
+    new_project.company = project_data.get("company", "Unknown")
+    new_project.ownership = "Private"  # Default value
+    new_project.pli_status = "Non-PLI"  # Default value
+    new_project.state = project_data.get("location", "Unknown")
+    new_project.location = project_data.get("location", "Unknown")
+    new_project.announcement_date = announcement_date
+    new_project.category = "Generation"  # Default category
+    new_project.input_type = "N/A"
+    new_project.output_type = "Electricity"
+    
+    # Set capacity based on project type
+    if project_data.get("generation_capacity"):
+        new_project.generation_capacity = _safe_float(project_data["generation_capacity"])
+    if project_data.get("storage_capacity"):
+        new_project.storage_capacity = _safe_float(project_data["storage_capacity"])
+    if project_data.get("electrolyzer_capacity"):
+        new_project.electrolyzer_capacity = _safe_float(project_data["electrolyzer_capacity"])
+    if project_data.get("biofuel_capacity"):
+        new_project.biofuel_capacity = _safe_float(project_data["biofuel_capacity"])
+    
+    new_project.status = project_data.get("status", "Pipeline")
+    new_project.land_acquisition = "N/A"
+    new_project.power_approval = "N/A"
+    new_project.environment_clearance = "N/A"
+    new_project.almm_listing = "N/A"
+    new_project.investment_usd = _safe_float(project_data.get("investment_usd", 0))
+    new_project.investment_inr = 0  # Will be calculated if needed
+    new_project.expected_completion = project_data.get("expected_completion", "2025")
+    new_project.last_updated = datetime.datetime.now().date()
+    new_project.source = article_url
+    return new_project
+
+
+def check_source(source, run_metrics=None):
+    """
+    Check a source for new articles and projects, recording stage timings
+    
+    Args:
+        source: Source to check
+        run_metrics: Optional MetricsRecorder of the crawl run; the source's
+            timings are stored under its run id and merged into it
+    
+    Returns:
+        Number of projects added
+    """
+    run_id = run_metrics.name if run_metrics else str(uuid.uuid4())
+    source_metrics = MetricsRecorder(source.name)
+    
+    with recording(source_metrics):
+        with span('source'):
+            projects_added, log_entry = _check_source(source)
+    
+    save_stage_metrics(run_id, source_metrics, source, log_entry)
+    if run_metrics:
+        run_metrics.merge(source_metrics)
+    return projects_added
+
+
+def _check_source(source):
+    """Check a source for new articles and projects; returns (projects added, log entry)"""
     global progress
+    # The scraping stack is only loaded by crawls, not by web workers
+    from scraper import fetch_news_from_source, extract_article_content, extract_project_data
     
     start_time = time.time()
     
@@ -111,7 +220,6 @@ def check_source(source):
         log_entry.status = "Started"
         log_entry.message = f"Starting scrape of {source.name} ({source.url})"
         db.session.add(log_entry)
-        db.session.commit()
     except Exception as e:
         logger.error(f"Error creating log entry: {str(e)}")
         # Continue even if we can't create a log entry
@@ -120,27 +228,21 @@ def check_source(source):
     try:
         logger.info(f"Checking source: {source.name} ({source.url})")
         
-        # Update source status
+        # Update source status, committed together with the log entry
         source.last_checked = datetime.datetime.utcnow()
         source.status = "Checking"
         db.session.commit()
         
         # Fetch news links with timeout protection
         try:
-            article_links = fetch_news_from_source(source.url)
+            with span('fetch.links'):
+                article_links = fetch_news_from_source(source.url)
             logger.info(f"Found {len(article_links)} potential article links at {source.url}")
         except Exception as e:
             logger.error(f"Error fetching links from {source.url}: {str(e)}")
             article_links = []
         
-        # Update log if it exists
-        if log_entry:
-            log_entry.message = f"Found {len(article_links)} potential articles"
-            log_entry.articles_found = len(article_links)
-            db.session.commit()
-        
-        projects_added = 0
-        processed_count = 0
+        articles_found = len(article_links)
         
         # Limit number of articles to check per source to prevent timeouts
         max_articles_per_source = 10
@@ -148,174 +250,107 @@ def check_source(source):
             logger.info(f"Limiting to {max_articles_per_source} articles for source {source.name}")
             article_links = article_links[:max_articles_per_source]
         
+        # Look up every link's stored article in one query
+        stored_articles = {}
+        if article_links:
+            with span('persist.seen_check'):
+                stored_articles = {
+                    article.url: article
+                    for article in NewsArticle.query.filter(NewsArticle.url.in_(article_links))
+                }
+        
+        # Articles, projects and processed flags are written in batches
+        unit_of_work = SourceUnitOfWork(db.session, on_projects_added=progress.add_projects)
+        
         for article_url in article_links:
             try:
                 # Check if already processed
-                existing_article = NewsArticle.query.filter_by(url=article_url).first()
+                count('articles.seen')
+                existing_article = stored_articles.get(article_url)
                 if existing_article and existing_article.is_processed:
+                    count('articles.already_processed')
                     continue
                 
                 # Extract content with error handling
                 try:
-                    content = extract_article_content(article_url)
+                    with span('fetch.article'):
+                        content = extract_article_content(article_url)
                 except Exception as e:
                     logger.error(f"Error extracting content from {article_url}: {str(e)}")
                     continue
                 
                 if not content or not content.get('text'):
+                    count('articles.empty')
                     continue
                 
-                # Store article if new
+                # Prepare the article if new; it's stored with its batch
                 if not existing_article:
-                    try:
-                        # Create new article with separate attribute assignment
-                        new_article = NewsArticle()
-                        new_article.url = article_url
-                        new_article.title = content.get('title', 'Untitled')
-                        # Limit text size for database
-                        new_article.content = content.get('text', '')[:65535]
-                        new_article.published_date = content.get('publish_date')
-                        new_article.source_id = source.id
-                        new_article.created_at = datetime.datetime.utcnow()
-                        
-                        db.session.add(new_article)
-                        db.session.commit()
-                        existing_article = new_article
-                    except Exception as e:
-                        # Handle duplicate URL or other database errors
-                        logger.error(f"Error adding article {article_url}: {str(e)}")
-                        db.session.rollback()
-                        # Try to get the article again after rollback
-                        existing_article = NewsArticle.query.filter_by(url=article_url).first()
-                        if not existing_article:
-                            # Skip this article if we can't add or retrieve it
-                            continue
+                    new_article = NewsArticle()
+                    new_article.url = article_url
+                    new_article.title = content.get('title', 'Untitled')
+                    # Limit text size for database
+                    new_article.content = content.get('text', '')[:65535]
+                    new_article.published_date = content.get('publish_date')
+                    new_article.source_id = source.id
+                    new_article.created_at = datetime.datetime.utcnow()
+                    existing_article = new_article
                 
                 # Try to extract project data
                 try:
-                    project_data = extract_project_data(article_url, content)
+                    with span('extract'):
+                        project_data = extract_project_data(article_url, content)
                 except Exception as e:
                     logger.error(f"Error extracting project data from {article_url}: {str(e)}")
                     project_data = None
                 
+                new_project = None
                 if project_data:
-                    # Check if project already exists with similar name and company
+                    count('projects.extracted')
+                    # Check stored and batched projects, by fingerprint or similar name
                     try:
-                        name = project_data.get('name', '')
-                        company = project_data.get('company', '')
-                        if name and company:
-                            existing_projects = Project.query.filter(
-                                Project.name.ilike(f"%{name}%"),
-                                Project.company.ilike(f"%{company}%")
-                            ).all()
-                        else:
-                            existing_projects = []
+                        with span('persist.duplicate_check'):
+                            existing_project = (find_duplicate(project_data)
+                                                or unit_of_work.pending_duplicate(project_data))
                     except Exception as e:
                         logger.error(f"Error querying existing projects: {str(e)}")
-                        existing_projects = []
+                        db.session.rollback()
+                        existing_project = None
                     
-                    if not existing_projects:
+                    if existing_project is None:
                         try:
-                            # Calculate the next index
-                            max_index = db.session.query(db.func.max(Project.index)).scalar() or 0
-                            next_index = max_index + 1
-                            
-                            # Format dates
-                            if isinstance(project_data.get("Announcement Date"), str):
-                                try:
-                                    announcement_date = datetime.datetime.strptime(
-                                        project_data["Announcement Date"], "%d-%m-%Y"
-                                    ).date()
-                                except ValueError:
-                                    announcement_date = datetime.datetime.now().date()
-                            else:
-                                announcement_date = datetime.datetime.now().date()
-                            
-                            # Create new project with correct lowercase keys from scraper
-                            new_project = Project()
-                            new_project.index = next_index
-                            new_project.type = project_data.get("type", "Unknown")
-                            new_project.name = project_data.get("name", "Renewable Energy Project")
-                            new_project.company = project_data.get("company", "Unknown")
-                            new_project.ownership = "Private"  # Default value
-                            new_project.pli_status = "Non-PLI"  # Default value
-                            new_project.state = project_data.get("location", "Unknown")
-                            new_project.location = project_data.get("location", "Unknown")
-                            new_project.announcement_date = announcement_date
-                            new_project.category = "Generation"  # Default category
-                            new_project.input_type = "N/A"
-                            new_project.output_type = "Electricity"
-                            
-                            # Set capacity based on project type with proper error handling
-                            def safe_float_conversion(value):
-                                """Safely convert value to float, return None if conversion fails"""
-                                if value is None:
-                                    return None
-                                try:
-                                    if isinstance(value, str) and value.lower() in ['unknown', 'n/a', '']:
-                                        return None
-                                    return float(value)
-                                except (ValueError, TypeError):
-                                    return None
-                            
-                            if project_data.get("generation_capacity"):
-                                new_project.generation_capacity = safe_float_conversion(project_data["generation_capacity"])
-                            if project_data.get("storage_capacity"):
-                                new_project.storage_capacity = safe_float_conversion(project_data["storage_capacity"])
-                            if project_data.get("electrolyzer_capacity"):
-                                new_project.electrolyzer_capacity = safe_float_conversion(project_data["electrolyzer_capacity"])
-                            if project_data.get("biofuel_capacity"):
-                                new_project.biofuel_capacity = safe_float_conversion(project_data["biofuel_capacity"])
-                            
-                            new_project.status = project_data.get("status", "Pipeline")
-                            new_project.land_acquisition = "N/A"
-                            new_project.power_approval = "N/A"
-                            new_project.environment_clearance = "N/A"
-                            new_project.almm_listing = "N/A"
-                            new_project.investment_usd = safe_float_conversion(project_data.get("investment_usd", 0))
-                            new_project.investment_inr = 0  # Will be calculated if needed
-                            new_project.expected_completion = project_data.get("expected_completion", "2025")
-                            new_project.last_updated = datetime.datetime.now().date()
-                            new_project.source = article_url
-                            
-                            db.session.add(new_project)
-                            db.session.commit()
-                            projects_added += 1
-                            progress.add_projects(1)  # Update the progress tracker
-                            logger.info(f"✓ NEW PROJECT ADDED ({projects_added}): {new_project.name} [{new_project.type}] from {article_url}")
+                            new_project = build_project(project_data, article_url)
                         except Exception as e:
-                            logger.error(f"Error adding project from {article_url}: {str(e)}")
-                            db.session.rollback()
+                            logger.error(f"Error preparing project from {article_url}: {str(e)}")
+                    else:
+                        count('projects.duplicate')
                 
-                # Mark article as processed
-                try:
-                    if existing_article:
-                        existing_article.is_processed = True
-                        db.session.commit()
-                        processed_count += 1
-                except Exception as e:
-                    logger.error(f"Error marking article as processed: {str(e)}")
-                    db.session.rollback()
+                unit_of_work.add(existing_article, new_project)
             
             except Exception as article_error:
                 logger.error(f"Error processing article {article_url}: {str(article_error)}")
                 # Continue to next article
         
+        unit_of_work.flush()
+        projects_added = unit_of_work.projects_added
+        processed_count = unit_of_work.processed_count
+        count('projects.added', projects_added)
+        
         # Update source status
         source.status = "Success"
-        db.session.commit()
         
-        # Update log
+        # Update log; left untouched until now so the session stays clean
+        # between batches and SQLite's write lock is only held while flushing
         if log_entry:
+            log_entry.articles_found = articles_found
             log_entry.status = "Completed"
             log_entry.message = f"Processed {processed_count} articles, added {projects_added} projects"
             log_entry.projects_added = projects_added
-            db.session.commit()
+        db.session.commit()
         
         logger.info(f"✓ COMPLETED {source.name}. Processed: {processed_count}, Projects added: {projects_added}")
         
         # Return the number of projects added from this source
-        return projects_added
+        return projects_added, log_entry
         
     except Exception as e:
         # Update source status on error
@@ -335,7 +370,7 @@ def check_source(source):
                 pass
         
         logger.error(f"Error checking source {source.name}: {str(e)}")
-        return 0  # No projects added when there's an error
+        return 0, log_entry  # No projects added when there's an error
     
     finally:
         # Log execution time
@@ -362,12 +397,18 @@ def check_all_sources():
     # Reset progress tracker
     progress.reset()
     
+    # Aggregate stage timings across the whole run
+    run_metrics = MetricsRecorder(str(uuid.uuid4()))
+    
     # Process each source
     for source in sources:
-        check_source(source)
+        check_source(source, run_metrics)
         progress.increment_source()  # Update progress tracker
         time.sleep(5)  # Small delay between sources to avoid overloading
     
+    save_stage_metrics(run_metrics.name, run_metrics)
+    compact_summary()
+    
     # Mark as completed
     progress.complete()
     logger.info("Completed check of all sources")
@@ -416,6 +457,9 @@ def _run_check_thread():
             # Track the actual processed sources to ensure accurate reporting
             actual_processed = 0
             
+            # Aggregate stage timings across the whole run
+            run_metrics = MetricsRecorder(str(uuid.uuid4()))
+            
             # Set timeout limits
             max_source_time_per_source = 120  # seconds per source (increased)
             max_total_time = 3600  # 60 minutes total max (increased)
@@ -433,7 +477,7 @@ def _run_check_thread():
                     # No additional app context needed
                     try:
                         # Process the source and get project count
-                        projects_added = check_source(source)
+                        projects_added = check_source(source, run_metrics)
                         actual_processed += 1
                         
                         # Reset error count on success
@@ -467,6 +511,8 @@ def _run_check_thread():
                     break
             
             logger.info(f"Completed checking all sources. Processed {actual_processed} of {total_sources}.")
+            save_stage_metrics(run_metrics.name, run_metrics)
+            compact_summary()
         
         except Exception as e:
             logger.error(f"Error in source processing: {str(e)}")
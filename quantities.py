@@ -0,0 +1,191 @@
+"""
+Single-pass quantity tokenizer for article text.
+Finds every number with a capacity, production, volume or currency unit in one
+scan, normalizes it to a canonical unit and records the words around it so
+extractors can tell what each quantity refers to.
+"""
+
+import re
+from collections import namedtuple
+
+# Canonical units per dimension
+POWER = 'power'          # GW
+ENERGY = 'energy'        # GWh
+MASS = 'mass'            # tonnes, or tonnes/day when a period is given
+VOLUME = 'volume'        # litres
+CURRENCY = 'currency'    # USD million or INR billion
+
+CANONICAL_UNITS = {
+    POWER: 'GW',
+    ENERGY: 'GWh',
+    MASS: 'tonnes',
+    VOLUME: 'litres',
+}
+
+# Raw unit (lowercase, spaces and hyphens removed) -> (dimension, factor to canonical, implied period)
+UNITS = {
+    'gw': (POWER, 1.0, None), 'gwp': (POWER, 1.0, None), 'gigawatt': (POWER, 1.0, None),
+    'mw': (POWER, 1e-3, None), 'mwp': (POWER, 1e-3, None), 'megawatt': (POWER, 1e-3, None),
+    'kw': (POWER, 1e-6, None), 'kwp': (POWER, 1e-6, None), 'kilowatt': (POWER, 1e-6, None),
+    'gwh': (ENERGY, 1.0, None), 'gigawatthour': (ENERGY, 1.0, None),
+    'mwh': (ENERGY, 1e-3, None), 'megawatthour': (ENERGY, 1e-3, None),
+    'kwh': (ENERGY, 1e-6, None), 'kilowatthour': (ENERGY, 1e-6, None),
+    'tonne': (MASS, 1.0, None), 'ton': (MASS, 1.0, None), 'metrictonne': (MASS, 1.0, None),
+    'tpd': (MASS, 1.0, 'day'), 'tpa': (MASS, 1.0, 'year'),
+    'ktpa': (MASS, 1e3, 'year'), 'mtpa': (MASS, 1e6, 'year'),
+    'litre': (VOLUME, 1.0, None), 'liter': (VOLUME, 1.0, None),
+    'kilolitre': (VOLUME, 1e3, None), 'kiloliter': (VOLUME, 1e3, None),
+    'klpd': (VOLUME, 1e3, 'day'),
+    'gallon': (VOLUME, 3.78541, None),
+}
+
+# Number words that scale the value that precedes them
+SCALES = {
+    'thousand': 1e3, 'lakh': 1e5, 'lakhs': 1e5,
+    'million': 1e6, 'mn': 1e6, 'm': 1e6,
+    'crore': 1e7, 'crores': 1e7, 'cr': 1e7,
+    'billion': 1e9, 'bn': 1e9,
+}
+
+# Currency markers -> currency code
+CURRENCIES = {
+    'us$': 'USD', 'usd': 'USD', '$': 'USD', 'dollars': 'USD',
+    'inr': 'INR', 'rs': 'INR', 'rs.': 'INR', '₹': 'INR', 'rupees': 'INR',
+}
+
+# Currency amounts are stored in USD million and INR billion
+CURRENCY_UNITS = {'USD': ('USD million', 1e-6), 'INR': ('INR billion', 1e-9)}
+
+PERIODS = {'day': 'day', 'annum': 'year', 'year': 'year', 'yr': 'year'}
+
+# Words kept on each side of a quantity
+CONTEXT_WORDS = 4
+CONTEXT_CHARS = 60
+
+# Lookbehind for a number written right after a currency, as in "Rs15,000" or
+# "Rs.15000"; use with re.IGNORECASE
+GLUED_CURRENCY = r'(?:(?<=\bus\$)|(?<=\busd)|(?<=\binr)|(?<=\brs)|(?<=\brs\.)|(?<=₹)|(?<=\$))'
+
+QUANTITY_PATTERN = re.compile(r"""
+    (?:(?<![a-z])(?P<currency>us\$|usd|inr|rs\.?|₹|\$)\s*)?
+    (?:""" + GLUED_CURRENCY + r"""|(?<![\w,])(?<!\d\.))(?P<number>\d+(?:,\d{2,3})*(?:\.\d+)?)
+    (?:[\s-]*(?P<scale>thousand|lakhs?|million|mn|crores?|cr|billion|bn|m)(?![a-z]))?
+    (?:[\s-]*(?P<unit>
+        (?:giga|mega|kilo)watt[\s-]*hours?|[gmk]wh
+        |(?:giga|mega|kilo)watts?|[gmk]wp?
+        |[mk]tpa|tp[da]
+        |metric\s+tonnes?|tonnes?|tons?
+        |kilo[\s-]?lit(?:re|er)s?|klpd|lit(?:re|er)s?|gallons?
+    )(?![a-z]))?
+    (?:\s*(?:per|a|/)\s*(?P<period>day|annum|year|yr)(?![a-z]))?
+    (?:\s+(?P<currency_after>usd|inr|dollars|rupees)(?![a-z]))?
+""", re.IGNORECASE | re.VERBOSE)
+
+WORD_PATTERN = re.compile(r'\w+')
+
+
+class Quantity(namedtuple('Quantity', ['start', 'end', 'value', 'unit', 'dimension',
+                                       'period', 'before', 'after'])):
+    """
+    A number with a recognized unit, normalized to its dimension's canonical unit.
+
+    before and after hold up to CONTEXT_WORDS lowercase words on each side.
+    """
+
+    __slots__ = ()
+
+    def near(self, words):
+        """Whether any of the given lowercase words appears next to the quantity"""
+        return any(word in self.before or word in self.after for word in words)
+
+    def preceded_by(self, words):
+        """Whether any of the given lowercase words appears just before the quantity"""
+        return any(word in self.before for word in words)
+
+    def followed_by(self, words):
+        """Whether any of the given lowercase words appears just after the quantity"""
+        return any(word in self.after for word in words)
+
+
+def _context(text, start, end):
+    """Return the lowercase words just before and after a span"""
+    before = WORD_PATTERN.findall(text[max(0, start - CONTEXT_CHARS):start].lower())
+    after = WORD_PATTERN.findall(text[end:end + CONTEXT_CHARS].lower())
+    # Drop words cut off at the window edge
+    if start > CONTEXT_CHARS and before:
+        before = before[1:]
+    if end + CONTEXT_CHARS < len(text) and after:
+        after = after[:-1]
+    return tuple(before[-CONTEXT_WORDS:]), tuple(after[:CONTEXT_WORDS])
+
+
+def _unit_key(unit):
+    """Reduce a raw unit to its UNITS key"""
+    key = re.sub(r'[\s-]+', '', unit.lower())
+    if key.endswith('hours'):
+        key = key[:-1]
+    elif key.endswith('s') and key not in UNITS:
+        key = key[:-1]
+    return key
+
+
+def tokenize_quantities(text):
+    """
+    Find every quantity in a text in a single pass
+
+    Args:
+        text: Raw article text
+
+    Returns:
+        List of Quantity tuples in document order
+    """
+    quantities = []
+    if not text:
+        return quantities
+
+    for match in QUANTITY_PATTERN.finditer(text):
+        unit = match.group('unit')
+        scale = (match.group('scale') or '').lower()
+        currency_marker = match.group('currency') or match.group('currency_after')
+        currency = CURRENCIES.get(currency_marker.lower()) if currency_marker else None
+        # Crore and lakh amounts without a marker are rupees
+        if currency is None and unit is None and scale in ('crore', 'crores', 'cr', 'lakh', 'lakhs'):
+            currency = 'INR'
+
+        # Plain numbers (years, percentages, counts) are not quantities
+        if unit is None and currency is None:
+            continue
+
+        try:
+            value = float(match.group('number').replace(',', ''))
+        except ValueError:
+            continue
+        value *= SCALES.get(scale, 1.0)
+        period = PERIODS.get((match.group('period') or '').lower())
+
+        if unit is not None:
+            spec = UNITS.get(_unit_key(unit))
+            if spec is None:
+                continue
+            dimension, factor, implied_period = spec
+            value *= factor
+            period = period or implied_period
+            canonical = CANONICAL_UNITS[dimension]
+            if dimension == MASS and period:
+                # Production rates are stored per day
+                if period == 'year':
+                    value /= 365
+                period = 'day'
+                canonical = 'tonnes/day'
+        else:
+            dimension = CURRENCY
+            canonical, factor = CURRENCY_UNITS[currency]
+            value *= factor
+
+        # Drop float noise from unit conversion (e.g. 3000 crore -> 30.000000000000004)
+        value = float(f"{value:.9g}")
+        before, after = _context(text, match.start(), match.end())
+        quantities.append(Quantity(match.start(), match.end(), value, canonical,
+                                   dimension, period, before, after))
+
+    return quantities
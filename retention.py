@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""
+Retention and archival for scrape logs and article bodies.
+Scrape logs are stored by month: in native range partitions of scrape_log on
+Postgres, and on SQLite in scrape_log_YYYY_MM rollover tables that finished
+months are moved to. Months older than the log retention are summed into
+per-source daily statistics and dropped whole. Article bodies older than the
+article retention are exported to gzip-compressed JSON-lines files and
+removed from the database; the slim article rows stay, so articles are still
+recognised as seen. Only one process applies retention at a time. Run daily by
+the scheduler, or by hand:
+    python retention.py run
+    python retention.py status
+"""
+
+import os
+import re
+import sys
+import json
+import gzip
+import logging
+import datetime
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    # No advisory file locks on this platform; only Postgres runs are exclusive
+    fcntl = None
+
+from sqlalchemy import text
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Days of detailed scrape logs and stage metrics kept
+LOG_RETENTION_DAYS = int(os.environ.get("LOG_RETENTION_DAYS", "90"))
+
+# Days article bodies are kept in the database before they're archived
+ARTICLE_RETENTION_DAYS = int(os.environ.get("ARTICLE_RETENTION_DAYS", "365"))
+
+# Directory of the article archive files
+ARCHIVE_DIR = os.environ.get("ARCHIVE_DIR", "archive")
+
+# Lock file keeping retention to one process when the database isn't Postgres
+RETENTION_LOCK_PATH = os.environ.get("RETENTION_LOCK_PATH", "retention.lock")
+
+# Months of Postgres partitions created ahead of time
+PARTITION_MONTHS_AHEAD = int(os.environ.get("PARTITION_MONTHS_AHEAD", "2"))
+
+# Articles archived per transaction
+ARCHIVE_BATCH_SIZE = 500
+
+# Logs that cross a month boundary may still be updated by a running check
+ROLLOVER_GRACE = datetime.timedelta(days=1)
+
+MONTH_TABLE_PATTERN = re.compile(r'^scrape_log_(\d{4})_(\d{2})$')
+
+
+def month_start(value):
+    """First moment of the month containing a date or datetime"""
+    return datetime.datetime(value.year, value.month, 1)
+
+
+def next_month(value):
+    """First moment of the month after the one containing value"""
+    start = month_start(value)
+    return datetime.datetime(start.year + start.month // 12, start.month % 12 + 1, 1)
+
+
+def month_table(month):
+    """Name of the partition or rollover table of a month"""
+    return f"scrape_log_{month.year:04d}_{month.month:02d}"
+
+
+def _bind(session):
+    return session.get_bind() if hasattr(session, 'get_bind') else session
+
+
+def _is_postgres(session):
+    return _bind(session).dialect.name == 'postgresql'
+
+
+def month_tables(session):
+    """Return {month start: table name} of the scrape log partitions or rollover tables"""
+    if _is_postgres(session):
+        names = session.execute(text("""
+            SELECT child.relname FROM pg_inherits
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            WHERE parent.relname = 'scrape_log'
+        """)).scalars().all()
+    else:
+        names = session.execute(text(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE 'scrape_log_%'"
+        )).scalars().all()
+    tables = {}
+    for name in names:
+        match = MONTH_TABLE_PATTERN.match(name)
+        if match:
+            tables[datetime.datetime(int(match.group(1)), int(match.group(2)), 1)] = name
+    return tables
+
+
+def create_partition(session, month):
+    """Create the Postgres partition of scrape_log for a month, if it's missing"""
+    start = month_start(month)
+    session.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {month_table(start)} PARTITION OF scrape_log "
+        f"FOR VALUES FROM ('{start:%Y-%m-%d}') TO ('{next_month(start):%Y-%m-%d}')"
+    ))
+
+
+def ensure_partitions(session, now=None):
+    """Create this month's partition and the next PARTITION_MONTHS_AHEAD (Postgres only)"""
+    if not _is_postgres(session):
+        return 0
+    month = month_start(now or datetime.datetime.utcnow())
+    for _ in range(PARTITION_MONTHS_AHEAD + 1):
+        create_partition(session, month)
+        month = next_month(month)
+    return PARTITION_MONTHS_AHEAD + 1
+
+
+def rollover_logs(session, now=None):
+    """
+    Move scrape logs of finished months into their rollover tables (SQLite only)
+
+    Postgres routes rows to their partition on insert, so there is nothing to
+    move there.
+
+    Returns:
+        Number of logs moved
+    """
+    if _is_postgres(session):
+        return 0
+    now = now or datetime.datetime.utcnow()
+    cutoff = min(month_start(now), now - ROLLOVER_GRACE)
+    months = session.execute(text(
+        "SELECT DISTINCT strftime('%Y-%m', timestamp) FROM scrape_log WHERE timestamp < :cutoff"
+    ), {'cutoff': cutoff}).scalars().all()
+
+    moved = 0
+    for value in months:
+        start = datetime.datetime.strptime(value, '%Y-%m')
+        end = min(next_month(start), cutoff)
+        table = month_table(start)
+        params = {'start': start, 'end': end}
+        session.execute(text(f"CREATE TABLE IF NOT EXISTS {table} AS SELECT * FROM scrape_log WHERE 0"))
+        session.execute(text(
+            f"INSERT INTO {table} SELECT * FROM scrape_log "
+            f"WHERE timestamp >= :start AND timestamp < :end"
+        ), params)
+        moved += session.execute(text(
+            "DELETE FROM scrape_log WHERE timestamp >= :start AND timestamp < :end"
+        ), params).rowcount
+    if moved:
+        logger.info(f"Moved {moved} scrape logs to rollover tables")
+    return moved
+
+
+def _roll_up(session, table, where="", params=None):
+    """Add the logs of a table (optionally filtered) to the daily statistics"""
+    # Import here to avoid circular imports
+    from models import SourceDailyStats
+    from bulk_upsert import accumulate
+
+    day = 'CAST("timestamp" AS DATE)' if _is_postgres(session) else 'date(timestamp)'
+    condition = "source_id IS NOT NULL" + (f" AND {where}" if where else "")
+    rows = session.execute(text(f"""
+        SELECT source_id, {day} AS day, COUNT(*) AS runs,
+               SUM(CASE WHEN status = 'Completed' THEN 1 ELSE 0 END) AS completed_runs,
+               SUM(CASE WHEN status = 'Error' THEN 1 ELSE 0 END) AS failed_runs,
+               COALESCE(SUM(articles_found), 0) AS articles_found,
+               COALESCE(SUM(projects_added), 0) AS projects_added
+        FROM {table} WHERE {condition}
+        GROUP BY source_id, {day}
+    """), params or {}).mappings().all()
+
+    stats = []
+    for row in rows:
+        stat = dict(row)
+        if isinstance(stat['day'], str):
+            stat['day'] = datetime.date.fromisoformat(stat['day'])
+        stats.append(stat)
+    accumulate(SourceDailyStats, stats, ['source_id', 'day'],
+               ['runs', 'completed_runs', 'failed_runs', 'articles_found', 'projects_added'],
+               session=session)
+    return sum(stat['runs'] for stat in stats)
+
+
+def expire_logs(session, now=None):
+    """
+    Roll up and drop the months of scrape logs older than LOG_RETENTION_DAYS
+
+    Only whole months are dropped, so a month's logs are kept until all of
+    them have expired. Stage metrics older than the retention are deleted too.
+
+    Returns:
+        Number of logs rolled up
+    """
+    now = now or datetime.datetime.utcnow()
+    cutoff = now - datetime.timedelta(days=LOG_RETENTION_DAYS)
+
+    rolled_up = 0
+    for month, table in sorted(month_tables(session).items()):
+        if next_month(month) > cutoff:
+            continue
+        rolled_up += _roll_up(session, table)
+        session.execute(text(f"DROP TABLE {table}"))
+        logger.info(f"Rolled up and dropped scrape logs of {month:%Y-%m}")
+
+    if _is_postgres(session):
+        # Rows that landed in the default partition, outside every month partition
+        default_params = {'cutoff': cutoff}
+        rolled_up += _roll_up(session, 'scrape_log_default', '"timestamp" < :cutoff', default_params)
+        session.execute(text('DELETE FROM scrape_log_default WHERE "timestamp" < :cutoff'),
+                        default_params)
+
+    pruned = session.execute(text("DELETE FROM stage_metrics WHERE created_at < :cutoff"),
+                             {'cutoff': cutoff}).rowcount
+    if pruned:
+        logger.info(f"Deleted {pruned} stage metrics older than {LOG_RETENTION_DAYS} days")
+    return rolled_up
+
+
+def archive_article_bodies(session, now=None, archive_dir=None):
+    """
+    Export article bodies older than ARTICLE_RETENTION_DAYS and delete them
+
+    Each batch is written and synced to the archive file before its bodies
+    are deleted, so a failure never loses a body; at worst it's archived
+    twice.
+
+    Returns:
+        Tuple of (articles archived, archive file path or None)
+    """
+    # Import here to avoid circular imports
+    from models import ArticleBody, NewsArticle
+    from article_store import decompress_text
+
+    now = now or datetime.datetime.utcnow()
+    cutoff = now - datetime.timedelta(days=ARTICLE_RETENTION_DAYS)
+    archive_dir = archive_dir or ARCHIVE_DIR
+    query = (session.query(NewsArticle.id, NewsArticle.url, NewsArticle.title,
+                           NewsArticle.source_id, NewsArticle.published_date,
+                           NewsArticle.created_at, ArticleBody.codec, ArticleBody.data)
+             .join(ArticleBody, ArticleBody.article_id == NewsArticle.id)
+             .filter(NewsArticle.created_at < cutoff)
+             .order_by(NewsArticle.id))
+
+    path = None
+    raw_file = archive = None
+    archived = 0
+    try:
+        while True:
+            rows = query.limit(ARCHIVE_BATCH_SIZE).all()
+            if not rows:
+                break
+            if archive is None:
+                os.makedirs(archive_dir, exist_ok=True)
+                path = os.path.join(archive_dir, f"articles-{now:%Y%m%d-%H%M%S}.jsonl.gz")
+                raw_file = open(path, 'wb')
+                archive = gzip.GzipFile(fileobj=raw_file, mode='wb')
+            for row in rows:
+                archive.write((json.dumps({
+                    'id': row.id, 'url': row.url, 'title': row.title, 'source_id': row.source_id,
+                    'published_date': row.published_date.isoformat() if row.published_date else None,
+                    'created_at': row.created_at.isoformat() if row.created_at else None,
+                    'content': decompress_text(row.codec, row.data),
+                }) + '\n').encode('utf-8'))
+            archive.flush()
+            raw_file.flush()
+            os.fsync(raw_file.fileno())
+
+            session.query(ArticleBody).filter(
+                ArticleBody.article_id.in_([row.id for row in rows])
+            ).delete(synchronize_session=False)
+            session.commit()
+            archived += len(rows)
+    finally:
+        if archive is not None:
+            archive.close()
+            raw_file.close()
+
+    if archived:
+        logger.info(f"Archived {archived} article bodies to {path}")
+    return archived, path
+
+
+def read_archive(path):
+    """Yield the article dicts of an archive file"""
+    with gzip.open(path, 'rt', encoding='utf-8') as archive:
+        for line in archive:
+            if line.strip():
+                yield json.loads(line)
+
+
+@contextmanager
+def retention_lock(session, path=None):
+    """
+    Try to take the retention lock without waiting
+
+    Every web worker runs the scheduler, so several processes reach retention
+    at once. On Postgres this is the migrations advisory lock, which also keeps
+    retention from dropping tables while a migration runs; elsewhere it's an
+    exclusive lock on RETENTION_LOCK_PATH.
+
+    Yields:
+        True if this process holds the lock, False if another one does
+    """
+    if _is_postgres(session):
+        # Import here to avoid circular imports
+        from migrations import ADVISORY_LOCK_ID
+
+        # A connection of its own, since the session's changes after each commit
+        with _bind(session).engine.connect() as lock_connection:
+            acquired = lock_connection.execute(text("SELECT pg_try_advisory_lock(:id)"),
+                                               {'id': ADVISORY_LOCK_ID}).scalar()
+            lock_connection.commit()
+            try:
+                yield acquired
+            finally:
+                if acquired:
+                    lock_connection.execute(text("SELECT pg_advisory_unlock(:id)"),
+                                            {'id': ADVISORY_LOCK_ID})
+                    lock_connection.commit()
+        return
+
+    with open(path or RETENTION_LOCK_PATH, 'a') as lock_file:
+        if fcntl is None:
+            yield True
+            return
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def apply_retention(session=None, now=None):
+    """
+    Run every retention step, committing after each
+
+    Returns:
+        Dict of the number of rows each step handled, empty if another process
+        was already applying retention
+    """
+    if session is None:
+        from app import db
+        session = db.session
+
+    with retention_lock(session) as acquired:
+        if not acquired:
+            logger.info("Retention is already running in another process, skipping")
+            return {}
+        return _apply_steps(session, now)
+
+
+def _apply_steps(session, now):
+    """Run the retention steps; the caller holds the retention lock"""
+    results = {}
+    for name, step in [('partitions', ensure_partitions), ('rolled_over', rollover_logs),
+                       ('rolled_up', expire_logs)]:
+        try:
+            results[name] = step(session, now)
+            session.commit()
+        except Exception as e:
+            logger.error(f"Retention step {name} failed: {str(e)}")
+            session.rollback()
+            results[name] = None
+    try:
+        results['archived'], _ = archive_article_bodies(session, now)
+    except Exception as e:
+        logger.error(f"Archiving article bodies failed: {str(e)}")
+        session.rollback()
+        results['archived'] = None
+    return results
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Apply retention to scrape logs and article bodies")
+    parser.add_argument('command', choices=['run', 'status'])
+    args = parser.parse_args(argv)
+
+    from app import app, db
+
+    with app.app_context():
+        if args.command == 'run':
+            results = apply_retention(db.session)
+            if not results:
+                print("Retention is already running in another process")
+            for step, count in results.items():
+                print(f"{step:12} {'failed' if count is None else count}")
+        else:
+            print(f"Log retention: {LOG_RETENTION_DAYS} days; article bodies: "
+                  f"{ARTICLE_RETENTION_DAYS} days, archived to {ARCHIVE_DIR}")
+            for month, table in sorted(month_tables(db.session).items()):
+                rows = db.session.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar()
+                print(f"{table:24} {rows} logs")
+            # On Postgres the parent table counts the rows of every partition
+            label = 'scrape_log (all)' if db.engine.dialect.name == 'postgresql' else 'scrape_log (hot)'
+            hot = db.session.execute(text("SELECT COUNT(*) FROM scrape_log")).scalar()
+            print(f"{label:24} {hot} logs")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,23 +1,26 @@
 import flask
 from flask import render_template, request, jsonify, flash, redirect, url_for, send_file
 from app import app, db, logger
-from models import Project, Source, NewsArticle, ScrapeLog
-from project_tracker import run_manual_check
-from data_manager import export_to_excel, import_from_excel
+from models import Project, Source, NewsArticle, ScrapeLog, SourceDailyStats
+from index_allocator import project_index_allocator
+from project_summary import load_totals
+from pagination import PAGE_SIZE, page_args, page_json, paginate
+# Scraping (project_tracker) and Excel (data_manager) modules are imported
+# inside the routes that use them, so serving pages doesn't load them
 import os
-import pandas as pd
 from datetime import datetime
 import threading
 
 @app.route('/')
 def index():
     # Get summary statistics for all renewable energy categories
-    solar_count = Project.query.filter_by(type='Solar').count()
-    battery_count = Project.query.filter_by(type='Battery').count()
-    wind_count = Project.query.filter_by(type='Wind').count()
-    hydro_count = Project.query.filter_by(type='Hydro').count()
-    hydrogen_count = Project.query.filter(Project.type.in_(['Green Hydrogen', 'GreenHydrogen'])).count()
-    biofuel_count = Project.query.filter_by(type='Biofuel').count()
+    totals = load_totals()
+    solar_count = totals.count('Solar')
+    battery_count = totals.count('Battery')
+    wind_count = totals.count('Wind')
+    hydro_count = totals.count('Hydro')
+    hydrogen_count = totals.count('Green Hydrogen', 'GreenHydrogen')
+    biofuel_count = totals.count('Biofuel')
     sources_count = Source.query.count()
     
     # Total projects count
@@ -27,10 +30,7 @@ def index():
     recent_projects = Project.query.order_by(Project.created_at.desc()).limit(5).all()
     
     # Summary by state
-    state_summary = db.session.query(
-        Project.state, 
-        db.func.count(Project.id).label('count')
-    ).group_by(Project.state).all()
+    state_summary = totals.by('state')
     
     return render_template('index.html', 
                           solar_count=solar_count,
@@ -47,40 +47,26 @@ def index():
 
 @app.route('/dashboard')
 def dashboard():
-    # Get projects by type and status
-    projects_by_type = db.session.query(
-        Project.type, 
-        db.func.count(Project.id).label('count')
-    ).group_by(Project.type).all()
+    # Counts and capacities come from the trigger-maintained summary table
+    totals = load_totals()
     
-    projects_by_status = db.session.query(
-        Project.status, 
-        db.func.count(Project.id).label('count')
-    ).group_by(Project.status).all()
+    # Get projects by type and status
+    projects_by_type = totals.by('type')
+    projects_by_status = totals.by('status')
     
     # Projects by state
-    projects_by_state = db.session.query(
-        Project.state, 
-        db.func.count(Project.id).label('count')
-    ).group_by(Project.state).order_by(db.func.count(Project.id).desc()).all()
-    
-    # Get all project types
-    project_types = db.session.query(Project.type, db.func.count(Project.id)).group_by(Project.type).all()
+    projects_by_state = totals.by('state', by_count=True)
     
     # Total capacity by type for all renewable energy categories
-    solar_capacity = db.session.query(db.func.sum(Project.generation_capacity)).filter_by(type='Solar').scalar() or 0
-    wind_capacity = db.session.query(db.func.sum(Project.generation_capacity)).filter_by(type='Wind').scalar() or 0
-    hydro_capacity = db.session.query(db.func.sum(Project.generation_capacity)).filter_by(type='Hydro').scalar() or 0
-    storage_capacity = db.session.query(db.func.sum(Project.storage_capacity)).filter_by(type='Battery').scalar() or 0
+    solar_capacity = totals.capacity('generation_capacity', 'Solar')
+    wind_capacity = totals.capacity('generation_capacity', 'Wind')
+    hydro_capacity = totals.capacity('generation_capacity', 'Hydro')
+    storage_capacity = totals.capacity('storage_capacity', 'Battery')
     
     # Handle both "Green Hydrogen" and "GreenHydrogen" variations
-    hydrogen_capacity = (
-        db.session.query(db.func.sum(Project.electrolyzer_capacity))
-        .filter(Project.type.in_(['Green Hydrogen', 'GreenHydrogen']))
-        .scalar() or 0
-    )
+    hydrogen_capacity = totals.capacity('electrolyzer_capacity', 'Green Hydrogen', 'GreenHydrogen')
     
-    biofuel_capacity = db.session.query(db.func.sum(Project.biofuel_capacity)).filter_by(type='Biofuel').scalar() or 0
+    biofuel_capacity = totals.capacity('biofuel_capacity', 'Biofuel')
     
     # Recent scrape logs
     recent_logs = ScrapeLog.query.order_by(ScrapeLog.timestamp.desc()).limit(10).all()
@@ -98,18 +84,36 @@ def dashboard():
                           recent_logs=recent_logs,
                           datetime=datetime)
 
+def _projects_of_type(project_type):
+    """Query of the projects the type filter of the listings selects"""
+    if project_type.lower() == 'solar':
+        return Project.query.filter_by(type='Solar')
+    elif project_type.lower() == 'battery':
+        return Project.query.filter_by(type='Battery')
+    return Project.query
+
+def _page_args_or_400():
+    """Pagination arguments of the request; aborts with 400 when they're invalid"""
+    try:
+        return page_args(request.args)
+    except ValueError as e:
+        flask.abort(400, description=str(e))
+
+@app.template_global()
+def page_url(**cursor):
+    """URL of the current listing at another cursor, keeping its other arguments"""
+    args = {key: value for key, value in request.args.items() if key not in ('after', 'before')}
+    args.update(cursor)
+    return url_for(request.endpoint, **(request.view_args or {}), **args)
+
 @app.route('/projects')
 def projects():
     project_type = request.args.get('type', 'all')
     
-    if project_type.lower() == 'solar':
-        projects = Project.query.filter_by(type='Solar').order_by(Project.created_at.desc()).all()
-    elif project_type.lower() == 'battery':
-        projects = Project.query.filter_by(type='Battery').order_by(Project.created_at.desc()).all()
-    else:
-        projects = Project.query.order_by(Project.created_at.desc()).all()
+    page = paginate(_projects_of_type(project_type), Project, **_page_args_or_400())
     
-    return render_template('projects.html', projects=projects, project_type=project_type, datetime=datetime)
+    return render_template('projects.html', projects=page.items, page=page,
+                           project_type=project_type, datetime=datetime)
 
 @app.route('/project/<int:project_id>')
 def project_detail(project_id):
@@ -118,16 +122,26 @@ def project_detail(project_id):
 
 @app.route('/sources')
 def sources():
-    sources = Source.query.all()
-    return render_template('sources.html', sources=sources, datetime=datetime)
+    page = paginate(Source.query, Source, **_page_args_or_400())
+    return render_template('sources.html', sources=page.items, page=page, datetime=datetime)
 
 @app.route('/source/<int:source_id>')
 def source_detail(source_id):
     source = Source.query.get_or_404(source_id)
-    articles = NewsArticle.query.filter_by(source_id=source.id).order_by(NewsArticle.created_at.desc()).all()
-    logs = ScrapeLog.query.filter_by(source_id=source.id).order_by(ScrapeLog.timestamp.desc()).all()
+    articles = NewsArticle.query.filter_by(source_id=source.id)
+    article_count = articles.count()
+    page = paginate(articles, NewsArticle, **_page_args_or_400())
+    # The most recent logs; older activity is summarized below them
+    logs = (ScrapeLog.query.filter_by(source_id=source.id)
+            .order_by(ScrapeLog.timestamp.desc()).limit(PAGE_SIZE).all())
     
-    return render_template('source_detail.html', source=source, articles=articles, logs=logs, datetime=datetime)
+    # Logs past their retention survive as daily totals
+    daily_stats = (SourceDailyStats.query.filter_by(source_id=source.id)
+                   .order_by(SourceDailyStats.day.desc()).limit(30).all())
+    
+    return render_template('source_detail.html', source=source, articles=page.items, page=page,
+                           article_count=article_count,
+                           logs=logs, daily_stats=daily_stats, datetime=datetime)
 
 @app.route('/about')
 def about():
@@ -137,26 +151,28 @@ def about():
 def api_projects():
     project_type = request.args.get('type', 'all')
     
-    if project_type.lower() == 'solar':
-        projects = Project.query.filter_by(type='Solar').all()
-    elif project_type.lower() == 'battery':
-        projects = Project.query.filter_by(type='Battery').all()
-    else:
-        projects = Project.query.all()
+    try:
+        page = paginate(_projects_of_type(project_type), Project, **page_args(request.args))
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
     
-    return jsonify([project.to_dict() for project in projects])
+    return jsonify(page_json(page, lambda project: project.to_dict()))
 
 @app.route('/api/sources')
 def api_sources():
-    sources = Source.query.all()
-    return jsonify([{
+    try:
+        page = paginate(Source.query, Source, **page_args(request.args))
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    
+    return jsonify(page_json(page, lambda source: {
         'id': source.id,
         'url': source.url,
         'name': source.name,
         'description': source.description,
         'last_checked': source.last_checked.strftime('%Y-%m-%d %H:%M:%S') if source.last_checked else None,
         'status': source.status
-    } for source in sources])
+    }))
 
 @app.route('/api/run-check', methods=['POST'])
 def api_run_check():
@@ -182,7 +198,7 @@ def run_check_with_progress():
     """Run manual check with progress tracking"""
     try:
         # Initialize sources to make sure all new sources are included
-        from project_tracker import initialize_sources
+        from project_tracker import initialize_sources, run_manual_check
         with app.app_context():
             initialize_sources()
             
@@ -231,6 +247,7 @@ def api_check_progress():
 @app.route('/api/export-excel', methods=['GET'])
 def api_export_excel():
     try:
+        from data_manager import export_to_excel
         filename = export_to_excel()
         # Return the file path so frontend knows where to download from
         return jsonify({'status': 'success', 'filename': f'/download-excel/{filename}'})
@@ -268,6 +285,7 @@ def api_import_excel():
             file.save(temp_path)
             
             # Import the data
+            from data_manager import import_from_excel
             result = import_from_excel(temp_path)
             
             # Clean up
@@ -354,9 +372,8 @@ def add_project():
             expected_completion = request.form.get('expected_completion')
             source = request.form.get('source')
             
-            # Calculate the next index
-            max_index = db.session.query(db.func.max(Project.index)).scalar() or 0
-            next_index = max_index + 1
+            # Allocate the next index
+            next_index = project_index_allocator.next(db.session)
             
             # Create new project
             new_project = Project(
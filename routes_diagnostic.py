@@ -1,9 +1,10 @@
 """
 Routes for diagnostic information about potential renewable energy projects
 """
+import json
 import logging
-from flask import Blueprint, jsonify, render_template
-from app import app
+from flask import Blueprint, jsonify, render_template, request
+from app import app, db
 
 # Create a logger for this module
 logger = logging.getLogger(__name__)
@@ -65,6 +66,56 @@ def api_potential_projects():
             'enabled': True
         })
 
+@diagnostic_bp.route('/api/stage-metrics', methods=['GET'])
+def api_stage_metrics():
+    """Get per-stage pipeline timings of a crawl run (the latest by default) and its sources"""
+    from models import StageMetrics
+    from stage_metrics import MetricsRecorder
+    
+    try:
+        limit = request.args.get('limit', 10, type=int)
+        recent = (StageMetrics.query
+                  .with_entities(StageMetrics.run_id, db.func.max(StageMetrics.created_at))
+                  .group_by(StageMetrics.run_id)
+                  .order_by(db.func.max(StageMetrics.created_at).desc())
+                  .limit(limit).all())
+        run_id = request.args.get('run_id') or (recent[0][0] if recent else None)
+        if not run_id:
+            return jsonify({'success': True, 'runs': [], 'run_id': None, 'run': None, 'sources': []})
+        
+        rows = StageMetrics.query.filter_by(run_id=run_id).all()
+        run_row = next((row for row in rows if row.source_id is None), None)
+        source_rows = [row for row in rows if row.source_id is not None]
+        
+        if run_row:
+            run = json.loads(run_row.metrics)
+        else:
+            # Single-source checks store no run aggregate; build it from the sources
+            run_metrics = MetricsRecorder(run_id)
+            for row in source_rows:
+                run_metrics.merge(MetricsRecorder.from_dict(json.loads(row.metrics)))
+            run = run_metrics.to_dict()
+            run.pop('wall_ms')
+        
+        return jsonify({
+            'success': True,
+            'runs': [{'run_id': rid, 'finished': finished.isoformat() if finished else None}
+                     for rid, finished in recent],
+            'run_id': run_id,
+            'run': run,
+            'sources': [{
+                'source': row.source.name if row.source else row.source_id,
+                'scrape_log_id': row.scrape_log_id,
+                'metrics': json.loads(row.metrics)
+            } for row in source_rows]
+        })
+    except Exception as e:
+        logger.error(f"Error getting stage metrics: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        })
+
 @diagnostic_bp.route('/', methods=['GET'])
 def diagnostic_dashboard():
     """Render the diagnostic dashboard page"""
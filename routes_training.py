@@ -4,13 +4,10 @@ Routes for training the renewable energy project detection system
 
 import os
 import logging
-import pandas as pd
 from flask import Blueprint, jsonify, render_template, request, send_file
 from werkzeug.utils import secure_filename
 from datetime import datetime
 
-from training_module import ProjectTypeTrainer
-
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -18,9 +15,6 @@ logger = logging.getLogger(__name__)
 # Create a blueprint for training routes
 training_bp = Blueprint('training_bp', __name__, url_prefix='/training')
 
-# Initialize trainer
-trainer = ProjectTypeTrainer()
-
 @training_bp.route('/', methods=['GET'])
 def training_dashboard():
     """Render the training dashboard page"""
@@ -31,8 +25,11 @@ def training_dashboard():
 def get_training_stats():
     """Get current training statistics"""
     try:
+        # The trainer pulls in pandas, so it's only imported by training requests
+        from trainer_registry import registry
+        
         # Load training data
-        training_data = trainer.get_training_results()
+        training_data = registry.trainer().get_training_results()
         
         # Format stats from training data
         stats = {}
@@ -87,16 +84,18 @@ def api_upload():
         file.save(file_path)
         logger.info(f"Saved training file to {file_path}")
         
-        # Process the training file
-        trainer.process_excel_file(file_path)
+        # Process the training file and hot-swap the compiled model
+        from trainer_registry import registry
+        model = registry.train_from_file(file_path)
         
         # Get training results to return to frontend
-        training_results = trainer.get_training_results()
+        training_results = registry.trainer().get_training_results()
         
         return jsonify({
             'success': True,
             'message': f"Training file processed successfully with {len(training_results)} categories",
-            'training_results': training_results
+            'training_results': training_results,
+            'model_version': model.version
         })
         
     except Exception as e:
@@ -110,6 +109,8 @@ def api_upload():
 def download_sample_file():
     """Download a sample training template"""
     try:
+        import pandas as pd
+        
         # Create a sample DataFrame with examples of different renewable energy types
         data = {
             'Type': ['Solar', 'Solar', 'Wind', 'Wind', 'Battery', 'Battery', 
@@ -25,6 +25,23 @@ def run_scheduled_task():
     logger.info("Scheduled check complete")
 
 
+def run_retention_task():
+    """Roll up old scrape logs and archive old article bodies"""
+    # Import here to avoid circular imports
+    from retention import apply_retention
+    
+    global last_retention_day
+    last_retention_day = datetime.date.today()
+    logger.info("Running retention of scrape logs and article bodies")
+    with app.app_context():
+        results = apply_retention()
+    logger.info(f"Retention complete: {results}")
+
+
+# Day the retention last ran, so the fallback loop runs it once a day
+last_retention_day = None
+
+
 def scheduler_loop():
     """Main scheduler loop that runs continuously"""
     logger.info("Starting scheduler loop")
@@ -38,6 +55,8 @@ def scheduler_loop():
                 current_hour = datetime.datetime.now().hour
                 if current_hour == 6 or current_hour == 18:  # Run at 6 AM and 6 PM
                     run_scheduled_task()
+                if current_hour == 3 and last_retention_day != datetime.date.today():
+                    run_retention_task()
             
             time.sleep(60)  # Check every minute
             
@@ -53,10 +72,11 @@ def start_scheduler():
             # Schedule twice-daily checks
             schedule.every().day.at("06:00").do(run_scheduled_task)
             schedule.every().day.at("18:00").do(run_scheduled_task)
+            schedule.every().day.at("03:00").do(run_retention_task)
             
-            logger.info("Scheduler initialized with daily checks at 06:00 and 18:00")
+            logger.info("Scheduler initialized with daily checks at 06:00 and 18:00, retention at 03:00")
         else:
-            logger.info("Using simple time-based scheduling (6 AM and 6 PM)")
+            logger.info("Using simple time-based scheduling (6 AM and 6 PM, retention at 3 AM)")
         
         # Run the scheduler loop
         scheduler_loop()
@@ -7,8 +7,22 @@ import trafilatura
 from datetime import datetime
 from urllib.parse import urljoin, urlparse
 
+from quantities import CURRENCY, ENERGY, POWER, VOLUME
+from text_analysis import Document, as_document
+from gazetteer import gazetteer, india_markers, resolve_location
+from company_registry import get_company_registry
+from extraction_cache import cached_extraction
+from stage_metrics import span, timed
+from filter_cascade import ArticleFilter, Candidate, FilterCascade, prefilters
+
 logger = logging.getLogger(__name__)
 
+# Bump when extraction logic changes so cached results are recomputed
+EXTRACTOR_VERSION = 2
+
+# Words that mark a currency amount as the project's investment or cost
+INVESTMENT_CONTEXT = ['investment', 'invest', 'invested', 'investing', 'cost', 'worth', 'valued', 'outlay']
+
 # Import diagnostic tracker for monitoring potential projects
 try:
     from diagnostic_tracker import diagnostic_tracker
@@ -98,10 +112,12 @@ def fetch_news_from_source(source_url):
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
-        response = requests.get(source_url, headers=headers, timeout=15)
-        response.raise_for_status()
+        with span('fetch.links.download'):
+            response = requests.get(source_url, headers=headers, timeout=15)
+            response.raise_for_status()
         
-        soup = BeautifulSoup(response.text, 'html.parser')
+        with span('fetch.links.parse'):
+            soup = BeautifulSoup(response.text, 'html.parser')
         links = []
         
         for a in soup.find_all('a', href=True):
@@ -150,8 +166,10 @@ def extract_article_content(article_url):
         
         if USE_NEWSPAPER:
             article = Article(article_url)
-            article.download()
-            article.parse()
+            with span('fetch.article.download'):
+                article.download()
+            with span('fetch.article.newspaper_parse'):
+                article.parse()
             
             return {
                 'title': article.title or '',
@@ -163,15 +181,17 @@ def extract_article_content(article_url):
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
             }
-            response = requests.get(article_url, headers=headers, timeout=10)
-            response.raise_for_status()
+            with span('fetch.article.download'):
+                response = requests.get(article_url, headers=headers, timeout=10)
+                response.raise_for_status()
             
             # Skip if response is too large (likely a file)
             if len(response.content) > 5 * 1024 * 1024:  # 5MB limit
                 logger.warning(f"Skipping large content: {article_url}")
                 return {'title': '', 'text': '', 'publish_date': None}
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            with span('fetch.article.html_parse'):
+                soup = BeautifulSoup(response.text, 'html.parser')
             
             # Extract title
             title = ''
@@ -209,23 +229,8 @@ def is_india_project(text):
     if not text:
         return False
     
-    text_lower = text.lower()
-    india_indicators = [
-        'india', 'indian', 'maharashtra', 'gujarat', 'rajasthan', 'karnataka',
-        'tamil nadu', 'telangana', 'andhra pradesh', 'haryana', 'punjab',
-        'madhya pradesh', 'uttar pradesh', 'bihar', 'west bengal', 'odisha',
-        'jharkhand', 'chhattisgarh', 'kerala', 'goa', 'himachal pradesh',
-        'uttarakhand', 'jammu and kashmir', 'ladakh', 'delhi', 'mumbai',
-        'bangalore', 'chennai', 'hyderabad', 'pune', 'ahmedabad', 'surat',
-        'mnre', 'ministry of new and renewable energy', 'make in india',
-        'pli scheme', 'atmanirbhar bharat'
-    ]
-    
-    for indicator in india_indicators:
-        if indicator in text_lower:
-            return True
-    
-    return False
+    # Any Indian place or national marker from the shared gazetteer
+    return bool(india_markers(text))
 
 def is_renewable_project(text):
     """Determine if the text is about a renewable energy project"""
@@ -357,64 +362,110 @@ def extract_project_data(article_url, content=None):
     text = content['text']
     title = content.get('title', '')
     
-    # Check if it's about India
-    india_project = is_india_project(text)
-    if not india_project:
-        return None
-    
-    # Check if it's a renewable energy project
-    is_renewable, project_type = is_renewable_project(text)
-    if not is_renewable:
+    # The same text seen again (retries, re-listings, new URLs) reuses its
+    # earlier result; the rules don't depend on a trained model, but company
+    # and place names resolve through the registry and gazetteer
+    model_version = f"rules:{get_company_registry().version}:{gazetteer.version}"
+    return cached_extraction('scraper', EXTRACTOR_VERSION, model_version, text, title,
+                             lambda: _extract_project_data(article_url, text, title),
+                             fields={'source': article_url})
+
+def _india_filter(candidate):
+    """Cascade filter: the article is about India"""
+    return bool(is_india_project(candidate.doc))
+
+def _renewable_filter(candidate):
+    """Cascade filter: the article is about a renewable energy project; records its type"""
+    is_renewable, project_type = is_renewable_project(candidate.doc.text)
+    candidate.results['project_type'] = project_type
+    return is_renewable
+
+def _pipeline_filter(candidate):
+    """Cascade filter: the article is about a project still in the pipeline"""
+    return is_pipeline_project(candidate.doc.text)
+
+# Relevance filters, cheapest per rejection first (URL and lead prefilters
+# ahead of the full-text checks), reordered as costs are measured
+screening_cascade = FilterCascade(prefilters() + [
+    ArticleFilter('india', _india_filter, prior_cost_ms=2.0, prior_reject_rate=0.4),
+    ArticleFilter('type', _renewable_filter, prior_cost_ms=1.0, prior_reject_rate=0.6),
+    ArticleFilter('pipeline', _pipeline_filter, prior_cost_ms=0.5, prior_reject_rate=0.2,
+                  after=['type']),
+])
+
+# Filters an article must pass before its rejection counts as a potential miss
+DIAGNOSED_AFTER = ['url', 'lead', 'india']
+
+def _track_rejection(candidate, rejected_by):
+    """Record articles rejected as not renewable or not pipeline as potential misses"""
+    if rejected_by not in ('type', 'pipeline'):
+        return
+    text = candidate.doc.text
+    if rejected_by == 'type' and not any(keyword in text.lower() for keyword in ['energy', 'power', 'solar', 'wind', 'battery', 'hydrogen', 'biofuel']):
+        return
+    # With filters reordered, make sure the article wasn't irrelevant anyway
+    if not screening_cascade.passes(candidate, DIAGNOSED_AFTER):
+        return
+    
+    if rejected_by == 'type':
         # Track potential projects that might be renewable but didn't pass filters
-        if DIAGNOSTIC_MODE and any(keyword in text.lower() for keyword in ['energy', 'power', 'solar', 'wind', 'battery', 'hydrogen', 'biofuel']):
-            diagnostic_tracker.track_potential_project(
-                article_url,
-                title or "Unknown Title",
-                text[:500],
-                {'renewable_confidence': 0.2, 'project_type': project_type or 'Unknown'},
-                "Failed renewable energy project detection"
-            )
-        return None
-    
-    # Check if it's a pipeline project
-    pipeline_project = is_pipeline_project(text)
-    if not pipeline_project:
+        diagnostic_tracker.track_potential_project(
+            candidate.url,
+            candidate.title or "Unknown Title",
+            text[:500],
+            {'renewable_confidence': 0.2, 'project_type': candidate.results.get('project_type') or 'Unknown'},
+            "Failed renewable energy project detection"
+        )
+    else:
         # Track projects that are renewable but not pipeline
+        diagnostic_tracker.track_potential_project(
+            candidate.url,
+            candidate.title or "Unknown Title", 
+            text[:500],
+            {'renewable_confidence': 0.8, 'pipeline_confidence': 0.2,
+             'project_type': candidate.results['project_type']},
+            "Failed pipeline project detection - might be operational project"
+        )
+
+def _extract_project_data(article_url, text, title):
+    """Run the extraction stages over an article's text"""
+    # Tokenize once for place, number and unit lookups
+    doc = Document(text, title)
+    
+    candidate = Candidate(article_url, doc)
+    rejected_by = screening_cascade.run(candidate)
+    if rejected_by:
         if DIAGNOSTIC_MODE:
-            diagnostic_tracker.track_potential_project(
-                article_url,
-                title or "Unknown Title", 
-                text[:500],
-                {'renewable_confidence': 0.8, 'pipeline_confidence': 0.2, 'project_type': project_type},
-                "Failed pipeline project detection - might be operational project"
-            )
+            _track_rejection(candidate, rejected_by)
         return None
+    project_type = candidate.results['project_type']
     
     # Extract project details
     project_data = {
         'type': project_type,
         'name': extract_project_name(text, title),
-        'company': extract_company(text),
-        'location': extract_location(text),
-        'investment_usd': extract_investment(text),
+        'company': extract_company(doc),
+        'location': extract_location(doc),
+        'investment_usd': extract_investment(doc),
         'expected_completion': extract_completion_date(text),
         'source': article_url,
         'status': 'Pipeline'
     }
     
     # Extract capacity based on project type
-    if project_type == 'Solar':
-        project_data['generation_capacity'] = extract_solar_capacity(text)
-    elif project_type == 'Battery':
-        project_data['storage_capacity'] = extract_battery_capacity(text)
-    elif project_type == 'Wind':
-        project_data['generation_capacity'] = extract_wind_capacity(text)
-    elif project_type == 'Hydro':
-        project_data['generation_capacity'] = extract_hydro_capacity(text)
-    elif project_type == 'Green Hydrogen':
-        project_data['electrolyzer_capacity'] = extract_hydrogen_capacity(text)
-    elif project_type == 'Biofuel':
-        project_data['biofuel_capacity'] = extract_biofuel_capacity(text)
+    with span('extract.capacity'):
+        if project_type == 'Solar':
+            project_data['generation_capacity'] = extract_solar_capacity(doc)
+        elif project_type == 'Battery':
+            project_data['storage_capacity'] = extract_battery_capacity(doc)
+        elif project_type == 'Wind':
+            project_data['generation_capacity'] = extract_wind_capacity(doc)
+        elif project_type == 'Hydro':
+            project_data['generation_capacity'] = extract_hydro_capacity(doc)
+        elif project_type == 'Green Hydrogen':
+            project_data['electrolyzer_capacity'] = extract_hydrogen_capacity(doc)
+        elif project_type == 'Biofuel':
+            project_data['biofuel_capacity'] = extract_biofuel_capacity(doc)
     
     return project_data
 
@@ -434,43 +485,23 @@ def extract_project_name(content, title=None):
     
     return "Renewable Energy Project"
 
+def _first_quantity(content, dimension, context=None):
+    """Return the first quantity of a dimension in the text, or None"""
+    for quantity in as_document(content).quantities_of(dimension):
+        if context is None or quantity.near(context):
+            return quantity
+    return None
+
 def extract_solar_capacity(content):
     """Extract capacity information for solar projects"""
-    patterns = [
-        r'(\d+(?:\.\d+)?)\s*(?:gw|gigawatt)',
-        r'(\d+(?:\.\d+)?)\s*(?:mw|megawatt)',
-        r'(\d+(?:,\d{3})*(?:\.\d+)?)\s*(?:gw|mw)'
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, content.lower())
-        if match:
-            value = float(match.group(1).replace(',', ''))
-            if 'gw' in match.group(0):
-                return value
-            else:  # MW
-                return value / 1000  # Convert to GW
-    
-    return None
+    quantity = _first_quantity(content, POWER)
+    return quantity.value if quantity else None  # GW
 
 def extract_battery_capacity(content):
     """Extract capacity information for battery projects"""
-    patterns = [
-        r'(\d+(?:\.\d+)?)\s*(?:gwh|gw)',
-        r'(\d+(?:\.\d+)?)\s*(?:mwh|mw)',
-        r'(\d+(?:,\d{3})*(?:\.\d+)?)\s*(?:gwh|mwh)'
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, content.lower())
-        if match:
-            value = float(match.group(1).replace(',', ''))
-            if 'gwh' in match.group(0) or 'gw' in match.group(0):
-                return value
-            else:  # MWh or MW
-                return value / 1000  # Convert to GWh
-    
-    return None
+    # Some articles quote storage in GW, so fall back to power figures
+    quantity = _first_quantity(content, ENERGY) or _first_quantity(content, POWER)
+    return quantity.value if quantity else None  # GWh
 
 def extract_wind_capacity(content):
     """Extract capacity information for wind projects"""
@@ -482,56 +513,30 @@ def extract_hydro_capacity(content):
 
 def extract_hydrogen_capacity(content):
     """Extract capacity information for hydrogen projects"""
-    patterns = [
-        r'(\d+(?:\.\d+)?)\s*(?:mw|megawatt)\s*electrolyzer',
-        r'electrolyzer\s*(?:capacity\s*)?(?:of\s*)?(\d+(?:\.\d+)?)\s*(?:mw|megawatt)'
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, content.lower())
-        if match:
-            return float(match.group(1))
-    
-    return None
+    quantity = _first_quantity(content, POWER, ['electrolyzer', 'electrolyser'])
+    return quantity.value * 1000 if quantity else None  # Convert GW to MW
 
 def extract_biofuel_capacity(content):
     """Extract capacity information for biofuel projects"""
-    patterns = [
-        r'(\d+(?:\.\d+)?)\s*(?:million|lakh)\s*(?:litres|liters)',
-        r'(\d+(?:,\d{3})*(?:\.\d+)?)\s*(?:litres|liters)\s*per\s*(?:day|year)'
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, content.lower())
-        if match:
-            value = float(match.group(1).replace(',', ''))
-            if 'million' in match.group(0):
-                return value
-            elif 'lakh' in match.group(0):
-                return value / 10  # Convert lakh to million
-            else:
-                return value / 1000000  # Convert to million
-    
-    return None
+    quantity = _first_quantity(content, VOLUME)
+    return quantity.value / 1000000 if quantity else None  # Convert to million litres
 
+@timed('extract.location')
 def extract_location(content):
     """Extract location information from text"""
-    states = [
-        'maharashtra', 'gujarat', 'rajasthan', 'karnataka', 'tamil nadu',
-        'telangana', 'andhra pradesh', 'haryana', 'punjab', 'madhya pradesh',
-        'uttar pradesh', 'bihar', 'west bengal', 'odisha', 'jharkhand',
-        'chhattisgarh', 'kerala', 'goa', 'himachal pradesh', 'uttarakhand'
-    ]
-    
-    content_lower = content.lower()
-    for state in states:
-        if state in content_lower:
-            return state.title()
-    
-    return None
+    _, state = resolve_location(content)
+    return state
 
+@timed('extract.company')
 def extract_company(content):
     """Extract company name from text"""
+    # Resolve known companies and their aliases in one pass
+    company = get_company_registry().match(content)
+    if company:
+        return company
+    
+    content = as_document(content).text
+    
     # Common patterns for company names
     patterns = [
         r'([A-Z][a-zA-Z\s&]+(?:Ltd|Limited|Corp|Corporation|Inc|Pvt|Private))',
@@ -546,26 +551,18 @@ def extract_company(content):
     
     return None
 
+@timed('extract.investment')
 def extract_investment(content):
-    """Extract investment information"""
-    patterns = [
-        r'(?:investment|invest|worth|cost)\s*(?:of\s*)?(?:rs\.?\s*)?(\d+(?:,\d{3})*(?:\.\d+)?)\s*(?:crore|billion|million)',
-        r'(?:usd|us\$|\$)\s*(\d+(?:,\d{3})*(?:\.\d+)?)\s*(?:billion|million)'
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, content.lower())
-        if match:
-            value = float(match.group(1).replace(',', ''))
-            if 'crore' in match.group(0):
-                return value * 10  # Convert crore to USD million (rough)
-            elif 'billion' in match.group(0):
-                return value * 1000  # Convert to million
-            else:
-                return value
-    
-    return None
+    """Extract investment information in USD million"""
+    amount = (_first_quantity(content, CURRENCY, INVESTMENT_CONTEXT)
+              or _first_quantity(content, CURRENCY))
+    if amount is None:
+        return None
+    if amount.unit == 'INR billion':
+        return amount.value * 12  # Approximate INR billion to USD million conversion
+    return amount.value
 
+@timed('extract.completion_date')
 def extract_completion_date(content):
     """Extract expected completion date"""
     patterns = [
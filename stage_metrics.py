@@ -0,0 +1,205 @@
+"""
+Lightweight stage timing for the crawl pipeline.
+Code wraps each fetch, extract, classify and persist stage in span(); the
+elapsed time lands in every active MetricsRecorder, so one crawl run and the
+source currently being checked each aggregate their own per-stage counts,
+totals and latency histograms. Spans outside a recording cost one lookup.
+"""
+
+import time
+import logging
+import functools
+import contextvars
+from contextlib import contextmanager
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open
+HISTOGRAM_BUCKETS_MS = [1, 5, 10, 50, 100, 500, 1000, 5000, 10000]
+
+# Recorders the current thread is reporting into, outermost first
+_active_recorders = contextvars.ContextVar('active_recorders', default=())
+
+
+class StageStats:
+    """Count, total, extremes and latency histogram of one stage"""
+
+    def __init__(self):
+        """Initialize empty statistics"""
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.min_ms = None
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(HISTOGRAM_BUCKETS_MS) + 1)
+
+    @property
+    def mean_ms(self):
+        return self.total_ms / self.count if self.count else 0.0
+
+    def observe(self, elapsed_ms, error=False):
+        """Record one execution of the stage"""
+        self.count += 1
+        self.errors += bool(error)
+        self.total_ms += elapsed_ms
+        self.min_ms = elapsed_ms if self.min_ms is None else min(self.min_ms, elapsed_ms)
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        for index, bound in enumerate(HISTOGRAM_BUCKETS_MS):
+            if elapsed_ms <= bound:
+                self.buckets[index] += 1
+                break
+        else:
+            self.buckets[-1] += 1
+
+    def merge(self, other):
+        """Add another StageStats into this one"""
+        self.count += other.count
+        self.errors += other.errors
+        self.total_ms += other.total_ms
+        if other.min_ms is not None:
+            self.min_ms = other.min_ms if self.min_ms is None else min(self.min_ms, other.min_ms)
+        self.max_ms = max(self.max_ms, other.max_ms)
+        self.buckets = [a + b for a, b in zip(self.buckets, other.buckets)]
+
+    def percentile_ms(self, fraction):
+        """Approximate a latency percentile as the upper bound of its histogram bucket"""
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.buckets):
+            seen += bucket_count
+            if seen >= target:
+                return HISTOGRAM_BUCKETS_MS[index] if index < len(HISTOGRAM_BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'total_ms': round(self.total_ms, 3),
+            'mean_ms': round(self.mean_ms, 3),
+            'min_ms': round(self.min_ms or 0.0, 3),
+            'max_ms': round(self.max_ms, 3),
+            'p50_ms': self.percentile_ms(0.5),
+            'p95_ms': self.percentile_ms(0.95),
+            'buckets': list(self.buckets),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls()
+        stats.count = data.get('count', 0)
+        stats.errors = data.get('errors', 0)
+        stats.total_ms = data.get('total_ms', 0.0)
+        stats.min_ms = data.get('min_ms') if stats.count else None
+        stats.max_ms = data.get('max_ms', 0.0)
+        buckets = data.get('buckets') or []
+        if len(buckets) == len(stats.buckets):
+            stats.buckets = list(buckets)
+        return stats
+
+
+class MetricsRecorder:
+    """
+    Per-stage timings and named counters of one crawl run or source check.
+
+    Recorders are not shared between threads; each crawl thread activates its
+    own with recording().
+    """
+
+    def __init__(self, name=None):
+        """Initialize an empty recorder"""
+        self.name = name
+        self.stages = {}
+        self.counters = {}
+        self.started = time.time()
+
+    def observe(self, stage, elapsed_ms, error=False):
+        """Record one execution of a stage"""
+        stats = self.stages.get(stage)
+        if stats is None:
+            stats = self.stages[stage] = StageStats()
+        stats.observe(elapsed_ms, error)
+
+    def increment(self, counter, amount=1):
+        """Add to a named counter"""
+        self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def merge(self, other):
+        """Add another recorder's stages and counters into this one"""
+        for stage, stats in other.stages.items():
+            self.stages.setdefault(stage, StageStats()).merge(stats)
+        for counter, value in other.counters.items():
+            self.increment(counter, value)
+        return self
+
+    def to_dict(self):
+        """Serialize to a JSON-compatible dict, slowest stages first"""
+        stages = sorted(self.stages.items(), key=lambda item: item[1].total_ms, reverse=True)
+        return {
+            'wall_ms': round((time.time() - self.started) * 1000, 3),
+            'stages': {stage: stats.to_dict() for stage, stats in stages},
+            'counters': dict(self.counters),
+        }
+
+    @classmethod
+    def from_dict(cls, data, name=None):
+        recorder = cls(name)
+        for stage, stats in (data.get('stages') or {}).items():
+            recorder.stages[stage] = StageStats.from_dict(stats)
+        recorder.counters = dict(data.get('counters') or {})
+        return recorder
+
+
+@contextmanager
+def recording(recorder):
+    """Make a recorder receive every span and count in the current thread"""
+    token = _active_recorders.set(_active_recorders.get() + (recorder,))
+    try:
+        yield recorder
+    finally:
+        _active_recorders.reset(token)
+
+
+@contextmanager
+def span(stage):
+    """
+    Time a block as one execution of a pipeline stage
+
+    Exceptions propagate and are counted as errors of the stage.
+    """
+    recorders = _active_recorders.get()
+    if not recorders:
+        yield
+        return
+
+    start = time.perf_counter()
+    error = False
+    try:
+        yield
+    except BaseException:
+        error = True
+        raise
+    finally:
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        for recorder in recorders:
+            recorder.observe(stage, elapsed_ms, error)
+
+
+def timed(stage):
+    """Decorator that wraps every call of a function in span(stage)"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count(counter, amount=1):
+    """Add to a named counter in every active recorder"""
+    for recorder in _active_recorders.get():
+        recorder.increment(counter, amount)
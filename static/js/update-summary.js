@@ -138,10 +138,10 @@ function handleUpdateButtonClick(event) {
             let progressInterval;
             
             // Get the total number of sources first
-            fetch('/api/sources')
+            fetch('/api/check-progress')
                 .then(response => response.json())
-                .then(sources => {
-                    sourceCount = sources.length;
+                .then(initial => {
+                    sourceCount = initial.total_sources;
                     progressText.textContent = `Processing sources: 0/${sourceCount}`;
                     
                     // Check progress periodically
@@ -183,6 +183,33 @@ def test_with_real_keywords():
     
     print()
 
+def test_long_article_windows():
+    """Test that screening reads past the first window for evidence further down"""
+    print("=== TESTING LONG ARTICLE WINDOWS ===\n")
+    
+    from text_analysis import Document
+    from filter_cascade import Candidate
+    from enhanced_scraper import ANALYSIS_WINDOW_CHARS, _india_filter, _pipeline_filter
+    
+    # An earlier, finished plant and background paragraphs fill the first
+    # window; the location and the new project's status only come at the end
+    background = ("Solar module makers keep adding cell and wafer lines as demand for "
+                  "photovoltaic capacity grows across the region. ")
+    filler = ("The company's first module line was commissioned in 2019. "
+              + background * (2 * ANALYSIS_WINDOW_CHARS // len(background)))
+    closing = ("The company plans to build the 2 GW solar module factory in Gujarat near Ahmedabad, "
+               "and construction of the plant is under development, with the facility "
+               "expected to be operational by 2027.")
+    doc = Document(filler + closing, "Module maker outlines new solar factory")
+    
+    print(f"Article length: {len(doc.text)} characters, evidence at {len(filler)}")
+    for name, check in [('India', _india_filter), ('Pipeline', _pipeline_filter)]:
+        passed = check(Candidate("https://test.com/long-article", doc))
+        status = "✓ PASS" if passed else "✗ FAIL"
+        print(f"{name} evidence past the first window found: {passed} - {status}")
+    
+    print()
+
 if __name__ == "__main__":
     print("SCRAPER DEBUG TEST SUITE")
     print("=" * 60)
@@ -191,5 +218,6 @@ if __name__ == "__main__":
     test_individual_functions()
     test_full_extraction()
     test_with_real_keywords()
+    test_long_article_windows()
     
     print("Test completed. Check results above to identify filtering issues.")
\ No newline at end of file
@@ -0,0 +1,49 @@
+"""
+Shared fixtures: every test that touches the database gets a fresh schema in a
+scratch SQLite file, never the configured DATABASE_URL.
+"""
+
+import os
+import tempfile
+
+import pytest
+
+# Must be set before app is first imported, since it reads the URL at import time
+_scratch_dir = tempfile.mkdtemp(prefix='tracker-tests-')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_scratch_dir, 'tracker.db')}"
+
+
+@pytest.fixture
+def db():
+    """The app's database in an application context, with empty tables"""
+    from app import app, db
+    import models  # noqa: F401  (registers the tables)
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        yield db
+        db.session.rollback()
+        db.session.remove()
+
+
+@pytest.fixture
+def write_sheet(tmp_path):
+    """Return a function writing project rows to an Excel file in tmp_path"""
+    import pandas as pd
+
+    def write(rows, name='renewable_projects.xlsx'):
+        path = tmp_path / name
+        pd.DataFrame(rows).to_excel(path, index=False)
+        return str(path)
+
+    return write
+
+
+@pytest.fixture
+def client(db):
+    """Test client of the app, sharing the db fixture's empty tables"""
+    from app import app
+    import routes  # noqa: F401  (registers the views)
+
+    return app.test_client()
@@ -0,0 +1,117 @@
+"""Tests for bulk insert-or-update"""
+
+from datetime import date
+
+import pytest
+
+from bulk_upsert import accumulate, upsert_articles, upsert_projects, upsert_sources
+
+
+def test_sources_conflicting_rows_are_skipped_without_update(db):
+    from models import Source
+
+    first = upsert_sources([{'url': 'https://a.example', 'name': 'A'}])
+    result = upsert_sources([{'url': 'https://a.example', 'name': 'Renamed'},
+                             {'url': 'https://b.example', 'name': 'B'}])
+    db.session.commit()
+
+    assert result.ids[0] == first.ids[0]
+    assert result.written == [False, True]
+    assert Source.query.filter_by(url='https://a.example').one().name == 'A'
+
+
+def test_sources_conflicting_rows_are_updated_when_asked(db):
+    from models import Source
+
+    first = upsert_sources([{'url': 'https://a.example', 'name': 'A', 'status': 'Success'}])
+    result = upsert_sources([{'url': 'https://a.example', 'name': 'Renamed'}], update=['name'])
+    db.session.commit()
+
+    assert result.ids == first.ids and result.written == [True]
+    source = Source.query.one()
+    assert (source.name, source.status) == ('Renamed', 'Success')
+
+
+def test_repeated_keys_in_one_call_keep_the_last_row(db):
+    from models import Source
+
+    result = upsert_sources([{'url': 'https://a.example', 'name': 'First'},
+                             {'url': 'https://a.example', 'name': 'Last'}])
+    db.session.commit()
+
+    assert result.ids[0] == result.ids[1]
+    assert Source.query.one().name == 'Last'
+
+
+def test_rows_need_a_key(db):
+    with pytest.raises(ValueError):
+        upsert_sources([{'name': 'No URL'}])
+    with pytest.raises(ValueError):
+        upsert_sources([{'url': 'https://a.example', 'colour': 'red'}])
+
+
+def test_article_bodies_follow_the_update_columns(db):
+    from models import NewsArticle
+
+    upsert_articles([{'url': 'https://a.example/1', 'title': 'One', 'content': 'Original body'}])
+    upsert_articles([{'url': 'https://a.example/1', 'title': 'Two', 'content': 'Ignored body'}])
+    db.session.commit()
+    article = NewsArticle.query.one()
+    assert (article.title, article.content) == ('One', 'Original body')
+
+    upsert_articles([{'url': 'https://a.example/1', 'content': 'New body'}], update=['content'])
+    db.session.commit()
+    db.session.expire_all()
+    article = NewsArticle.query.one()
+    assert article.content == 'New body'
+    assert article.summary.startswith('New body')
+
+
+def test_projects_are_numbered_and_keyed_on_insert(db):
+    from models import Project
+
+    result = upsert_projects([{'name': 'Khavda Solar Park', 'type': 'solar',
+                               'company': 'Adani Green Energy', 'state': 'Gujarat'},
+                              {'name': 'Rewa Solar', 'type': 'solar', 'company': 'ReNew Power'}])
+    db.session.commit()
+
+    projects = {p.id: p for p in Project.query.all()}
+    first, second = (projects[i] for i in result.ids)
+    assert first.index is not None and second.index is not None and first.index != second.index
+    assert first.company_key == 'adanigreen' and first.fingerprint
+    assert first.updated_at is not None
+
+
+def test_projects_update_recomputes_their_keys(db):
+    from models import Project
+
+    result = upsert_projects([{'name': 'Khavda Solar Park', 'type': 'solar', 'company': 'Adani Green Energy'}])
+    db.session.commit()
+    index = Project.query.one().index
+
+    again = upsert_projects([{'index': index, 'name': 'Khavda Solar Park', 'type': 'solar',
+                              'company': 'NTPC Green Energy'}], update=['company'])
+    db.session.commit()
+    db.session.expire_all()
+
+    assert again.ids == result.ids and again.written == [True]
+    project = Project.query.one()
+    assert (project.company, project.company_key) == ('NTPC Green Energy', 'ntpcgreen')
+
+
+def test_accumulate_adds_counts_on_conflict(db):
+    from models import Source, SourceDailyStats
+
+    source_id = upsert_sources([{'url': 'https://a.example'}]).ids[0]
+    day = date(2026, 1, 5)
+    columns = ['runs', 'completed_runs', 'failed_runs', 'articles_found', 'projects_added']
+    row = {'source_id': source_id, 'day': day, 'runs': 2, 'completed_runs': 2, 'failed_runs': 0,
+           'articles_found': 5, 'projects_added': 1}
+
+    assert accumulate(SourceDailyStats, [row, row], ['source_id', 'day'], columns) == 1
+    accumulate(SourceDailyStats, [row], ['source_id', 'day'], columns)
+    db.session.commit()
+
+    stats = SourceDailyStats.query.one()
+    assert (stats.runs, stats.articles_found, stats.projects_added) == (6, 15, 3)
+    assert Source.query.count() == 1
@@ -0,0 +1,94 @@
+"""
+Tests for company name cleaning, aliases and registry resolution.
+"""
+
+from company_registry import CompanyRegistry, clean_company_name, company_aliases
+
+
+def test_clean_company_name_drops_legal_suffixes():
+    assert clean_company_name("Adani Green Energy Ltd.") == "Adani Green Energy"
+    assert clean_company_name("Waaree Energies Private Limited") == "Waaree Energies"
+    assert clean_company_name("the company said") is None
+
+
+def test_aliases_keep_two_words():
+    assert company_aliases("Adani Green Energy") == ["Adani Green"]
+    assert company_aliases("Suzlon Energy") == []
+    assert company_aliases("Reliance Industries") == []
+
+
+def test_aliases_keep_line_of_business():
+    assert company_aliases("Tata Power Solar") == []
+    assert company_aliases("NTPC Green Energy") == ["NTPC Green"]
+
+
+def test_full_name_is_canonical():
+    registry = CompanyRegistry(["Adani Green", "Adani Green Energy Ltd"])
+    assert len(registry) == 1
+    assert registry.canonical("Adani Green") == "Adani Green Energy"
+    assert registry.canonical("Adani Green Energy Limited") == "Adani Green Energy"
+
+
+def test_full_name_is_canonical_when_added_later():
+    registry = CompanyRegistry(["Adani Green"])
+    registry.add("Adani Green Energy")
+    assert len(registry) == 1
+    assert registry.canonical("Adani Green") == "Adani Green Energy"
+    assert registry.match("Adani Green has announced a plant") == "Adani Green Energy"
+
+
+def test_companies_sharing_a_first_word_stay_apart():
+    registry = CompanyRegistry(["Reliance Power", "Reliance Industries", "Reliance",
+                                "Tata Power", "Tata Power Solar", "Suzlon", "Suzlon Energy",
+                                "NTPC", "NTPC Green Energy"])
+    for name in ["Reliance Power", "Reliance Industries", "Reliance", "Tata Power",
+                 "Tata Power Solar", "Suzlon", "Suzlon Energy", "NTPC", "NTPC Green Energy"]:
+        assert registry.canonical(name) == name
+    assert registry.canonical("NTPC Green") == "NTPC Green Energy"
+
+
+def test_ambiguous_alias_does_not_resolve():
+    registry = CompanyRegistry(["Acme Green Energy", "Acme Green Energies"])
+    assert registry.canonical("Acme Green") == "Acme Green"
+    assert registry.find("Acme Green signed an agreement") == []
+
+
+def test_match_keeps_fuller_spelling_in_text():
+    registry = CompanyRegistry(["Reliance", "Suzlon"])
+    text = "Reliance Industries will set up a battery plant. Reliance Industries said."
+    assert registry.match(text) == "Reliance Industries"
+    assert registry.match("Suzlon Energy won an order") == "Suzlon Energy"
+    assert registry.match("Suzlon won an order") == "Suzlon"
+
+
+def test_match_prefers_most_mentioned_company():
+    registry = CompanyRegistry(["Tata Power", "Tata Power Solar"])
+    text = "Tata Power Solar will supply modules. Tata Power Solar said Tata Power approved it."
+    assert registry.match(text) == "Tata Power Solar"
+
+
+def test_version_follows_registered_names():
+    registry = CompanyRegistry(["Adani Green Energy"])
+    version = registry.version
+    assert CompanyRegistry(["Adani Green Energy"]).version == version
+    registry.add("Tata Power")
+    assert registry.version != version
+
+
+def test_registry_rebuilds_when_project_companies_change(db, monkeypatch, tmp_path):
+    import company_registry
+    from models import Project
+
+    # No Excel corpora in the working directory, and a check on every call
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(company_registry, '_registry', None)
+    monkeypatch.setattr(company_registry, 'REFRESH_CHECK_INTERVAL', 0)
+
+    version = company_registry.get_company_registry().version
+    assert company_registry.get_company_registry().version == version
+
+    db.session.add(Project(index=1, name='Module Plant', type='Solar', company='Zenith Photon Works'))
+    db.session.commit()
+    registry = company_registry.get_company_registry()
+    assert registry.version != version
+    assert registry.match("Zenith Photon Works plans a plant") == "Zenith Photon Works"
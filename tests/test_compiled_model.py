@@ -0,0 +1,94 @@
+"""Tests for the compiled training model artifact"""
+
+import os
+
+import pytest
+
+from compiled_model import CompiledModel, FlatTrie, load_or_build
+from text_analysis import Document, TermMatcher
+from training_module import ProjectTypeTrainer
+
+ROWS = [
+    {'Type': 'Solar', 'Name': 'Bhadla Solar Park', 'Company': 'Adani Green Energy', 'Capacity': 500},
+    {'Type': 'Solar', 'Name': 'Pavagada Solar Park', 'Company': 'NTPC', 'Capacity': 600},
+    {'Type': 'Solar', 'Name': 'Rewa Ultra Mega Solar', 'Company': 'ReNew Power', 'Capacity': 750},
+    {'Type': 'Wind', 'Name': 'Muppandal Wind Farm', 'Company': 'Suzlon Energy', 'Capacity': 1500},
+    {'Type': 'Wind', 'Name': 'Jaisalmer Wind Park', 'Company': 'Inox Wind', 'Capacity': 1064},
+    {'Type': 'Wind', 'Name': 'Brahmanvel Wind Farm', 'Company': 'Parakh Agro', 'Capacity': 528},
+]
+
+ARTICLE = "NTPC commissioned the Pavagada Solar Park next to a wind farm in Karnataka."
+
+
+@pytest.fixture
+def trainer(tmp_path, write_sheet):
+    trainer = ProjectTypeTrainer(training_data_path=str(tmp_path / 'training_data.json'))
+    trainer.process_excel_file(write_sheet(ROWS))
+    return trainer
+
+
+def test_artifact_round_trip(trainer, tmp_path):
+    path = str(tmp_path / 'model.bin')
+    model = CompiledModel.from_trainer(trainer)
+    model.save(path)
+    loaded = CompiledModel.load(path)
+
+    assert loaded.version == model.version
+    assert list(loaded.terms) == list(model.terms)
+    assert loaded.get_training_results() == model.get_training_results()
+    assert loaded.match_terms(ARTICLE) == model.match_terms(ARTICLE)
+    assert loaded.enhance_scores(ARTICLE) == model.enhance_scores(ARTICLE)
+    assert loaded.enhance_scores(ARTICLE).get('solar', 0) > 0
+
+
+def test_loaded_model_matches_against_the_stored_trie(trainer, tmp_path):
+    path = str(tmp_path / 'model.bin')
+    CompiledModel.from_trainer(trainer).save(path)
+    loaded = CompiledModel.load(path)
+
+    # The trie comes straight from the artifact rather than being rebuilt
+    assert isinstance(loaded._matcher, FlatTrie)
+    assert isinstance(loaded._matcher.edge_tokens, memoryview)
+
+
+def test_flat_trie_finds_the_same_terms_as_term_matcher():
+    terms = ['solar', 'solar park', 'park', 'ultra mega solar park', 'wind', 'solar']
+    reference = TermMatcher()
+    for term_id, term in enumerate(terms):
+        reference.add(term, term_id)
+    tokens = Document("The Ultra Mega Solar Park, a solar-park, and wind parks.").token_list
+
+    assert sorted(FlatTrie.build(terms).find(tokens)) == sorted(reference.find(tokens))
+    assert FlatTrie.build([]).find(tokens) == []
+
+
+def test_stale_sources_trigger_a_rebuild(trainer, tmp_path, write_sheet):
+    path = str(tmp_path / 'model.bin')
+    source = write_sheet(ROWS, name='source.xlsx')
+    builds = []
+
+    def build_trainer():
+        builds.append(1)
+        return trainer
+
+    first = load_or_build([source], build_trainer, path)
+    again = load_or_build([source], build_trainer, path)
+    assert len(builds) == 1
+    assert again.version == first.version
+    assert not again.is_stale([source])
+
+    stat = os.stat(source)
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert again.is_stale([source])
+    load_or_build([source], build_trainer, path)
+    assert len(builds) == 2
+
+
+def test_unreadable_artifact_is_rebuilt(trainer, tmp_path):
+    path = tmp_path / 'model.bin'
+    path.write_bytes(b'not a model')
+
+    model = load_or_build([], lambda: trainer, str(path))
+
+    assert model.version == CompiledModel.from_trainer(trainer).version
+    assert CompiledModel.load(str(path)).version == model.version
@@ -0,0 +1,51 @@
+"""Tests for place resolution with the gazetteer"""
+
+import pytest
+
+from gazetteer import CITY, NATIONAL, STATE, Gazetteer, gazetteer, india_markers, resolve_location
+
+
+@pytest.mark.parametrize('text, expected', [
+    ("A 30 GW park at Khavda in Kutch, Gujarat", ('Khavda', 'Gujarat')),
+    ("The plant near Bangalore will supply Karnataka", ('Bengaluru', 'Karnataka')),
+    ("Orissa approved the project", (None, 'Odisha')),
+    ("Capacity additions in Tamil Nadu", (None, 'Tamil Nadu')),
+    ("A new factory in Germany", (None, None)),
+])
+def test_resolve_location(text, expected):
+    assert resolve_location(text) == expected
+
+
+def test_state_mentioned_most_wins_and_location_is_in_that_state():
+    text = ("The developer, based in Ahmedabad, will build the park in Jaisalmer. "
+            "Rajasthan has allotted land near Bhadla, Rajasthan.")
+
+    assert resolve_location(text) == ('Jaisalmer', 'Rajasthan')
+
+
+def test_ties_go_to_the_earliest_state():
+    assert resolve_location("From Pune in Maharashtra to Surat in Gujarat") == ('Pune', 'Maharashtra')
+
+
+def test_longest_name_wins_over_overlaps():
+    mentions = gazetteer.find("Offices in New Delhi and Greater Noida")
+
+    assert [(m.place.name, m.place.kind) for m in mentions] == [('New Delhi', CITY), ('Greater Noida', CITY)]
+
+
+def test_india_markers_include_national_terms():
+    places = india_markers("SECI awarded the tender under the PLI scheme in Gujarat")
+
+    assert {(p.name, p.kind) for p in places} == {('seci', NATIONAL), ('pli scheme', NATIONAL),
+                                                 ('Gujarat', STATE)}
+    assert india_markers("A wind farm in Texas") == set()
+
+
+def test_version_changes_with_the_places():
+    first, second = Gazetteer(), Gazetteer()
+    first.add('Khavda', 'Gujarat', CITY)
+    second.add('Khavda', 'Gujarat', CITY)
+    assert first.version == second.version
+
+    second.add('Mundra', 'Gujarat', CITY)
+    assert first.version != second.version
@@ -0,0 +1,104 @@
+"""Tests for upgrading a database created before the migrations existed"""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+import app  # noqa: F401  (must be imported before models)
+import migrations
+from article_store import decompress_text
+from pagination import EPOCH
+from project_summary import load_totals
+
+ARTICLE_TEXT = "Adani Green Energy commissioned a 500 MW solar park in Khavda. " * 20
+
+# Columns added to the original tables by later migrations
+ADDED_COLUMNS = {'project': {'fingerprint', 'company_key'}, 'news_article': {'summary'}}
+
+
+def create_baseline_schema(connection):
+    """Create the four tables of the original schema, without any index"""
+    from models import NewsArticle, Project, ScrapeLog, Source
+
+    for model in (Source, Project, NewsArticle, ScrapeLog):
+        table = model.__table__
+        columns = [
+            f'"{column.name}" {column.type.compile(dialect=connection.dialect)}'
+            + (' PRIMARY KEY' if column.primary_key else '')
+            for column in table.columns if column.name not in ADDED_COLUMNS.get(table.name, ())
+        ]
+        if table.name == 'news_article':
+            columns.append('content TEXT')
+        connection.execute(text(f'CREATE TABLE {table.name} ({", ".join(columns)})'))
+
+
+@pytest.fixture
+def baseline(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'baseline.db'}")
+    created = datetime(2026, 3, 1)
+    with engine.begin() as connection:
+        create_baseline_schema(connection)
+        connection.execute(text(
+            "INSERT INTO source (id, url, name, created_at) VALUES (1, 'https://example.com', 'Example', :at)"
+        ), {'at': created})
+        # Concurrent crawls handed out index 7 twice; one project predates created_at
+        connection.execute(text(
+            'INSERT INTO project (id, "index", type, name, company, state, generation_capacity, status, created_at) '
+            'VALUES (:id, :index, :type, :name, :company, :state, :capacity, :status, :at)'
+        ), [
+            {'id': 1, 'index': 7, 'type': 'solar', 'name': 'Khavda Solar Park', 'company': 'Adani Green Energy',
+             'state': 'Gujarat', 'capacity': 500.0, 'status': 'Announced', 'at': created},
+            {'id': 2, 'index': 7, 'type': 'wind', 'name': 'Muppandal Wind Farm', 'company': 'Suzlon Energy',
+             'state': 'Tamil Nadu', 'capacity': 1500.0, 'status': 'Operational', 'at': created},
+            {'id': 3, 'index': 8, 'type': 'solar', 'name': 'Bhadla Solar Park', 'company': 'NTPC',
+             'state': 'Rajasthan', 'capacity': 2245.0, 'status': 'Operational', 'at': None},
+        ])
+        connection.execute(text(
+            "INSERT INTO news_article (id, url, title, content, source_id, created_at) "
+            "VALUES (1, 'https://example.com/a', 'Khavda', :content, 1, :at)"
+        ), {'content': ARTICLE_TEXT, 'at': created})
+        connection.execute(text(
+            "INSERT INTO scrape_log (id, source_id, timestamp, status, articles_found) "
+            "VALUES (1, 1, :at, 'Completed', 3)"
+        ), {'at': created})
+    yield engine
+    engine.dispose()
+
+
+def test_upgrade_migrates_a_seeded_baseline(baseline):
+    applied = migrations.upgrade(baseline)
+
+    assert applied == [m.version for m in migrations.MIGRATIONS]
+    with baseline.connect() as connection:
+        projects = connection.execute(text(
+            'SELECT id, "index", fingerprint, company_key, created_at FROM project ORDER BY id'
+        )).mappings().all()
+        # Fingerprints are backfilled with the multi-word company key
+        assert [p['company_key'] for p in projects] == ['adanigreen', 'suzlonenergy', 'ntpc']
+        assert all(p['fingerprint'] for p in projects)
+        # The duplicate index was renumbered past the existing ones
+        indexes = [p['index'] for p in projects]
+        assert indexes[0] == 7 and len(set(indexes)) == 3 and indexes[1] > 8
+        assert projects[2]['created_at'] == EPOCH.isoformat(' ') + '.000000'
+
+        # Article bodies moved to the compressed table
+        assert 'content' not in {c['name'] for c in inspect(connection).get_columns('news_article')}
+        codec, data = connection.execute(text("SELECT codec, data FROM article_body")).one()
+        assert decompress_text(codec, data) == ARTICLE_TEXT
+        assert ARTICLE_TEXT.startswith(connection.execute(text("SELECT summary FROM news_article")).scalar()[:40])
+
+        # The summary table was rebuilt from the existing projects
+        totals = load_totals(connection)
+        assert totals.count() == 3
+        assert totals.count('solar') == 2
+
+        indexes = {index['name'] for index in inspect(connection).get_indexes('project')}
+        assert {'ix_project_type_created_at', 'ix_project_fingerprint', 'ux_project_index'} <= indexes
+
+
+def test_upgrade_is_a_no_op_once_applied(baseline):
+    migrations.upgrade(baseline)
+
+    assert migrations.upgrade(baseline) == []
+    assert migrations.pending_migrations(baseline) == []
@@ -0,0 +1,107 @@
+"""Tests for keyset pagination"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from pagination import EPOCH, decode_cursor, encode_cursor, paginate
+
+START = datetime(2026, 1, 1)
+
+
+@pytest.fixture
+def sources(db):
+    from models import Source
+
+    # Pairs of rows share a timestamp, so the walk has to break ties on id
+    rows = [Source(url=f"https://example.com/{i}", name=f"Source {i}",
+                   created_at=START + timedelta(hours=i // 2))
+            for i in range(11)]
+    db.session.add_all(rows)
+    db.session.commit()
+    return rows
+
+
+def walk(model, limit):
+    """Follow next_cursor from the first page, returning each page's ids"""
+    pages, after = [], None
+    while True:
+        page = paginate(model.query, model, after=after, limit=limit)
+        pages.append([row.id for row in page.items])
+        if page.next_cursor is None:
+            return pages
+        after = decode_cursor(page.next_cursor)
+
+
+def newest_first(rows):
+    return [row.id for row in sorted(rows, key=lambda row: (row.created_at, row.id), reverse=True)]
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(START, 7)) == (START, 7)
+    with pytest.raises(ValueError):
+        decode_cursor('not-a-cursor')
+
+
+def test_walk_visits_every_row_once_in_order(sources):
+    from models import Source
+
+    pages = walk(Source, limit=3)
+
+    assert [len(page) for page in pages] == [3, 3, 3, 2]
+    assert sum(pages, []) == newest_first(sources)
+
+
+def test_walk_back_with_prev_cursor(sources):
+    from models import Source
+
+    first = paginate(Source.query, Source, limit=4)
+    second = paginate(Source.query, Source, after=decode_cursor(first.next_cursor), limit=4)
+    back = paginate(Source.query, Source, before=decode_cursor(second.prev_cursor), limit=4)
+
+    assert first.prev_cursor is None
+    assert [row.id for row in back.items] == [row.id for row in first.items]
+
+
+def add_undated(db, count):
+    from models import Source
+
+    rows = [Source(url=f"https://example.com/undated/{i}", name="Undated") for i in range(count)]
+    db.session.add_all(rows)
+    db.session.flush()
+    for row in rows:
+        row.created_at = None
+    db.session.commit()
+    return rows
+
+
+def test_rows_without_created_at_never_break_the_walk(db, sources):
+    from models import Source
+
+    # With 11 dated rows, an undated row ends the fourth page of three
+    add_undated(db, 2)
+
+    assert sum(walk(Source, limit=3), []) == newest_first(sources)
+
+
+def test_undated_rows_are_listed_last_after_migration(db, sources, client):
+    from models import Source
+    from migrations import epoch_created_at
+
+    undated = add_undated(db, 2)
+    with db.engine.begin() as connection:
+        epoch_created_at(connection)
+    db.session.expire_all()
+
+    ids, after = [], None
+    while True:
+        response = client.get('/api/sources', query_string={'limit': 4, 'after': after} if after else {'limit': 4})
+        assert response.status_code == 200
+        body = response.get_json()
+        ids += [item['id'] for item in body['items']]
+        after = body['next_cursor']
+        if after is None:
+            break
+
+    assert all(db.session.get(Source, row.id).created_at == EPOCH for row in undated)
+    assert ids == newest_first(sources + undated)
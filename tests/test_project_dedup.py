@@ -0,0 +1,48 @@
+"""
+Tests for duplicate project detection.
+"""
+
+from project_dedup import company_key, duplicates, find_duplicate, assign_fingerprint
+
+MUNDRA = {'name': 'Mundra Module Plant', 'company': 'Adani Solar', 'state': 'Gujarat',
+          'type': 'Solar', 'generation_capacity': 2.0}
+KHAVDA = {'name': 'Khavda Solar Park Phase 3', 'company': 'Adani Green Energy Ltd',
+          'state': 'Gujarat', 'type': 'Solar', 'generation_capacity': 2.1}
+
+
+def test_company_key_keeps_multi_word_names():
+    assert company_key('Adani Green Energy Ltd') == company_key('Adani Green') == 'adanigreen'
+    assert company_key('Adani Solar') == 'adanisolar'
+    assert company_key('Reliance Power') != company_key('Reliance Industries')
+    assert company_key(None) == ''
+
+
+def test_different_companies_with_a_shared_first_word_are_not_duplicates():
+    assert not duplicates(MUNDRA, KHAVDA)
+    reliance_power = dict(MUNDRA, name='Solar Module Plant', company='Reliance Power')
+    reliance_industries = dict(MUNDRA, name='Solar Module Plant', company='Reliance Industries')
+    assert not duplicates(reliance_power, reliance_industries)
+
+
+def test_identical_fingerprint_needs_similar_names():
+    other_plant = dict(KHAVDA, name='Dholera Solar Park', company='Adani Green Energy')
+    assert not duplicates(KHAVDA, other_plant)
+
+
+def test_spellings_of_one_project_are_duplicates():
+    respelled = dict(KHAVDA, name='Khavda Solar Park Phase-3', company='Adani Green',
+                     generation_capacity=2.0)
+    assert duplicates(KHAVDA, respelled)
+
+
+def test_find_duplicate_checks_names_of_exact_fingerprints(db):
+    from models import Project
+
+    stored = Project(index=1, **KHAVDA)
+    assign_fingerprint(stored)
+    db.session.add(stored)
+    db.session.commit()
+
+    assert find_duplicate(dict(KHAVDA, company='Adani Green Energy')).id == stored.id
+    assert find_duplicate(dict(KHAVDA, name='Dholera Solar Park')) is None
+    assert find_duplicate(MUNDRA) is None
@@ -0,0 +1,75 @@
+"""Tests for the quantity tokenizer and investment extraction"""
+
+import pytest
+
+from quantities import CURRENCY, ENERGY, MASS, POWER, VOLUME, tokenize_quantities
+
+
+def parsed(text):
+    return [(q.value, q.unit) for q in tokenize_quantities(text)]
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('a 500 MW solar park', [(0.5, 'GW')]),
+    ('a 2.5 GW module line', [(2.5, 'GW')]),
+    ('1,200 kWp of rooftop panels', [(0.0012, 'GW')]),
+    ('a 300-megawatt wind farm', [(0.3, 'GW')]),
+    ('4 GWh of cells and 800 MWh of storage', [(4.0, 'GWh'), (0.8, 'GWh')]),
+    ('500 KLPD ethanol plant', [(500000.0, 'litres')]),
+])
+def test_units_are_normalized(text, expected):
+    assert parsed(text) == expected
+
+
+def test_production_rates_are_stored_per_day():
+    daily, yearly = tokenize_quantities('50 tonnes per day of hydrogen, 3.65 MTPA of ammonia')
+
+    assert (daily.value, daily.unit, daily.dimension) == (50.0, 'tonnes/day', MASS)
+    assert (yearly.value, yearly.unit, yearly.period) == (10000.0, 'tonnes/day', 'day')
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('Rs 3,000 crore', (30.0, 'INR billion')),
+    ('₹1,500 crore', (15.0, 'INR billion')),
+    ('INR 45 billion', (45.0, 'INR billion')),
+    ('Rs 50 lakh', (0.005, 'INR billion')),
+    # Crore amounts without a marker are rupees
+    ('an outlay of 500 crore', (5.0, 'INR billion')),
+    ('$2 billion', (2000.0, 'USD million')),
+    ('US$ 350 million', (350.0, 'USD million')),
+    ('200 million dollars', (200.0, 'USD million')),
+])
+def test_currency_amounts_are_converted(text, expected):
+    amounts = [q for q in tokenize_quantities(text) if q.dimension == CURRENCY]
+    assert [(q.value, q.unit) for q in amounts] == [expected]
+
+
+def test_plain_numbers_are_not_quantities():
+    assert parsed('In 2025, 40 percent of the 12 bidders were new') == []
+
+
+def test_context_words_around_a_quantity():
+    power, = tokenize_quantities('Adani Green Energy will build a 2 GW solar park in Khavda, Gujarat')
+
+    assert power.dimension == POWER
+    assert power.before == ('energy', 'will', 'build', 'a')
+    assert power.after == ('solar', 'park', 'in', 'khavda')
+    assert power.preceded_by(['build']) and power.followed_by(['solar'])
+    assert not power.near(['wind'])
+
+
+def test_dimensions_are_kept_apart():
+    quantities = tokenize_quantities('a 1 GW plant with 2 GWh storage and 10 litres of water')
+
+    assert [q.dimension for q in quantities] == [POWER, ENERGY, VOLUME]
+
+
+@pytest.mark.parametrize('text, usd_million', [
+    ('The company will invest Rs 3,000 crore in the plant.', 360.0),
+    ('an investment of $2 billion in module lines', 2000.0),
+    ('It costs 200 million dollars to build', 200.0),
+])
+def test_investments_are_reported_in_usd_million(text, usd_million):
+    from scraper import extract_investment
+
+    assert extract_investment(text) == usd_million
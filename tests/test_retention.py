@@ -0,0 +1,148 @@
+"""Tests for scrape log and article body retention"""
+
+import fcntl
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import text
+
+import retention
+
+
+@pytest.fixture(autouse=True)
+def no_rollover_tables(db):
+    # Rollover tables aren't in the metadata, so drop_all leaves them behind
+    for table in retention.month_tables(db.session).values():
+        db.session.execute(text(f"DROP TABLE {table}"))
+    db.session.commit()
+
+
+@pytest.fixture
+def lock_path(tmp_path, monkeypatch):
+    path = str(tmp_path / 'retention.lock')
+    monkeypatch.setattr(retention, 'RETENTION_LOCK_PATH', path)
+    return path
+
+
+def test_retention_skips_while_another_process_holds_the_lock(db, lock_path, monkeypatch):
+    runs = []
+    monkeypatch.setattr(retention, '_apply_steps', lambda session, now: runs.append(now) or {'ran': 1})
+
+    # flock locks belong to the open file, so a second open stands in for another worker
+    with open(lock_path, 'a') as other_worker:
+        fcntl.flock(other_worker, fcntl.LOCK_EX)
+        assert retention.apply_retention(db.session) == {}
+        fcntl.flock(other_worker, fcntl.LOCK_UN)
+
+    assert runs == []
+    assert retention.apply_retention(db.session) == {'ran': 1}
+    assert len(runs) == 1
+
+
+def test_retention_lock_is_released_after_a_run(db, lock_path):
+    with retention.retention_lock(db.session) as acquired:
+        assert acquired
+        with retention.retention_lock(db.session) as nested:
+            assert not nested
+    with retention.retention_lock(db.session) as acquired:
+        assert acquired
+
+
+def add_logs(db, *timestamps):
+    from models import ScrapeLog, Source
+
+    source = Source.query.first()
+    if source is None:
+        source = Source(url='https://example.com', name='Example')
+        db.session.add(source)
+        db.session.flush()
+    db.session.add_all([ScrapeLog(source_id=source.id, timestamp=at, status='Completed',
+                                  articles_found=2, projects_added=1) for at in timestamps])
+    db.session.commit()
+    return source
+
+
+def hot_logs(db):
+    return db.session.execute(text("SELECT COUNT(*) FROM scrape_log")).scalar()
+
+
+def test_rollover_moves_finished_months(db):
+    add_logs(db, datetime(2026, 1, 10), datetime(2026, 1, 20), datetime(2026, 2, 3),
+             datetime(2026, 3, 2))
+
+    assert retention.rollover_logs(db.session, now=datetime(2026, 3, 15)) == 3
+    db.session.commit()
+
+    tables = retention.month_tables(db.session)
+    assert sorted(tables.values()) == ['scrape_log_2026_01', 'scrape_log_2026_02']
+    assert db.session.execute(text("SELECT COUNT(*) FROM scrape_log_2026_01")).scalar() == 2
+    assert hot_logs(db) == 1
+    assert retention.rollover_logs(db.session, now=datetime(2026, 3, 15)) == 0
+
+
+def test_rollover_leaves_the_last_day_of_a_month_for_a_running_check(db):
+    add_logs(db, datetime(2026, 2, 27, 12), datetime(2026, 2, 28, 23, 30))
+
+    assert retention.rollover_logs(db.session, now=datetime(2026, 3, 1, 0, 10)) == 1
+    db.session.commit()
+    assert hot_logs(db) == 1
+
+
+def test_expire_rolls_up_and_drops_old_months(db, monkeypatch):
+    from models import SourceDailyStats, StageMetrics
+
+    monkeypatch.setattr(retention, 'LOG_RETENTION_DAYS', 90)
+    source = add_logs(db, datetime(2026, 1, 10, 8), datetime(2026, 1, 10, 20), datetime(2026, 2, 3),
+                      datetime(2026, 3, 20))
+    db.session.add_all([StageMetrics(run_id='old', created_at=datetime(2026, 1, 10)),
+                        StageMetrics(run_id='new', created_at=datetime(2026, 6, 1))])
+    db.session.commit()
+    now = datetime(2026, 6, 15)
+    retention.rollover_logs(db.session, now=now)
+    db.session.commit()
+
+    # The cutoff is 2026-03-17: January and February are past it, March isn't whole
+    assert retention.expire_logs(db.session, now=now) == 3
+    db.session.commit()
+
+    assert sorted(retention.month_tables(db.session).values()) == ['scrape_log_2026_03']
+    stats = {s.day: s for s in SourceDailyStats.query.filter_by(source_id=source.id)}
+    assert sorted(stats) == [date(2026, 1, 10), date(2026, 2, 3)]
+    assert (stats[date(2026, 1, 10)].runs, stats[date(2026, 1, 10)].articles_found) == (2, 4)
+    assert [m.run_id for m in StageMetrics.query.all()] == ['new']
+
+
+def test_archive_exports_old_bodies_and_keeps_the_articles(db, tmp_path, monkeypatch):
+    from models import ArticleBody, NewsArticle
+
+    monkeypatch.setattr(retention, 'ARTICLE_RETENTION_DAYS', 365)
+    monkeypatch.setattr(retention, 'ARCHIVE_BATCH_SIZE', 2)
+    old = []
+    for i in range(3):
+        article = NewsArticle(url=f'https://example.com/old/{i}', title=f'Old {i}',
+                              created_at=datetime(2024, 5, 1 + i))
+        article.content = f"Old article body {i}"
+        old.append(article)
+    recent = NewsArticle(url='https://example.com/new', title='New', created_at=datetime(2026, 5, 1))
+    recent.content = "Recent article body"
+    db.session.add_all(old + [recent])
+    db.session.commit()
+
+    archived, path = retention.archive_article_bodies(db.session, now=datetime(2026, 6, 15),
+                                                      archive_dir=str(tmp_path / 'archive'))
+
+    assert archived == 3
+    assert [a['content'] for a in retention.read_archive(path)] == [f"Old article body {i}" for i in range(3)]
+    assert [b.article_id for b in ArticleBody.query.all()] == [recent.id]
+    assert NewsArticle.query.count() == 4
+    assert retention.archive_article_bodies(db.session, now=datetime(2026, 6, 15),
+                                            archive_dir=str(tmp_path / 'archive')) == (0, None)
+
+
+def test_apply_retention_runs_every_step(db, lock_path, tmp_path, monkeypatch):
+    monkeypatch.setattr(retention, 'ARCHIVE_DIR', str(tmp_path / 'archive'))
+    add_logs(db, datetime(2026, 1, 10))
+
+    results = retention.apply_retention(db.session, now=datetime(2026, 2, 15))
+
+    assert results == {'partitions': 0, 'rolled_over': 1, 'rolled_up': 0, 'archived': 0}
@@ -0,0 +1,25 @@
+"""Tests for number detection in text_analysis"""
+
+import pytest
+
+from quantities import CURRENCY
+from text_analysis import Document
+
+
+@pytest.mark.parametrize('text, value', [
+    ('an investment of Rs15,000 crore', 150.0),
+    ('an investment of Rs.15000 crore', 150.0),
+    ('an investment of Rs 15,000 crore', 150.0),
+    ('an investment of INR2,000 crore', 20.0),
+    ('an investment of ₹500 crore', 5.0),
+])
+def test_attached_currency_prefix_is_read(text, value):
+    document = Document(text)
+    assert document.has_numbers
+    amounts = document.quantities_of(CURRENCY)
+    assert [(q.value, q.unit) for q in amounts] == [(value, 'INR billion')]
+
+
+@pytest.mark.parametrize('text', ['model abc123 MW', 'hours15 later'])
+def test_numbers_inside_words_are_ignored(text):
+    assert not Document(text).has_numbers
@@ -0,0 +1,80 @@
+"""Tests for publishing and hot reloading the compiled training model"""
+
+import os
+
+import pytest
+
+from trainer_registry import TrainerRegistry
+
+SOLAR_ROWS = [
+    {'Type': 'Solar', 'Name': 'Bhadla Solar Park', 'Company': 'Adani Green Energy'},
+    {'Type': 'Solar', 'Name': 'Pavagada Solar Park', 'Company': 'NTPC'},
+    {'Type': 'Solar', 'Name': 'Rewa Ultra Mega Solar', 'Company': 'ReNew Power'},
+]
+
+WIND_ROWS = [
+    {'Type': 'Wind', 'Name': 'Muppandal Wind Farm', 'Company': 'Suzlon Energy'},
+    {'Type': 'Wind', 'Name': 'Jaisalmer Wind Park', 'Company': 'Inox Wind'},
+    {'Type': 'Wind', 'Name': 'Brahmanvel Wind Farm', 'Company': 'Parakh Agro'},
+]
+
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    # The training data, lock and export files are all relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def registry():
+    return TrainerRegistry(artifact_path='training_model.bin', check_interval=0)
+
+
+def test_training_publishes_a_new_model(write_sheet):
+    trainers = registry()
+    before = trainers.current()
+    generation = trainers.generation
+
+    published = trainers.train_from_file(write_sheet(SOLAR_ROWS, name='upload.xlsx'))
+
+    assert trainers.current() is published
+    assert trainers.generation == generation + 1
+    assert published.version != before.version
+    assert 'solar' in published.categories
+    # A snapshot taken before training keeps the model it started with
+    assert 'solar' not in before.categories
+
+
+def test_other_processes_pick_up_a_published_model(write_sheet):
+    trainer_process, web_worker = registry(), registry()
+    web_worker.current()
+
+    published = trainer_process.train_from_file(write_sheet(SOLAR_ROWS, name='upload.xlsx'))
+    # Artifact mtimes can tie within the filesystem's timestamp resolution
+    stat = os.stat('training_model.bin')
+    os.utime('training_model.bin', ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    assert web_worker.current().version == published.version
+
+
+def test_training_starts_from_data_other_processes_saved(write_sheet):
+    first, second = registry(), registry()
+    first.current()
+    second.current()
+
+    first.train_from_file(write_sheet(SOLAR_ROWS, name='solar.xlsx'))
+    # second still holds the model from before; training must not drop solar
+    model = second.train_from_file(write_sheet(WIND_ROWS, name='wind.xlsx'))
+
+    assert {'solar', 'wind'} <= set(model.categories)
+
+
+def test_a_new_export_makes_the_model_stale(write_sheet):
+    trainers = registry()
+    before = trainers.current()
+
+    write_sheet(WIND_ROWS, name='india_renewable_projects_20260101.xlsx')
+
+    after = trainers.current()
+    assert after is not before
+    assert 'wind' in after.categories
@@ -0,0 +1,70 @@
+"""Tests for Excel ingestion in training_module"""
+
+from training_module import ProjectTypeTrainer
+
+ROWS = [
+    {'Type': 'Solar', 'Name': 'Bhadla Solar Park', 'Company': 'Adani Green Energy', 'Capacity': 500},
+    {'Type': 'Solar', 'Name': 'Pavagada Solar Park', 'Company': 'NTPC', 'Capacity': '600 MW'},
+    {'Type': 'Wind', 'Name': 'Muppandal Wind Farm', 'Company': 'Suzlon Energy', 'Capacity': 1500},
+]
+
+
+def make_trainer(tmp_path):
+    return ProjectTypeTrainer(training_data_path=str(tmp_path / 'training_data.json'))
+
+
+def test_metrics_come_from_the_sheet_columns(tmp_path, write_sheet):
+    trainer = make_trainer(tmp_path)
+    trainer.process_excel_file(write_sheet(ROWS))
+
+    assert trainer.category_metrics['solar'] == {'Capacity': [500.0, 600.0]}
+    assert trainer.category_metrics['wind'] == {'Capacity': [1500.0]}
+
+
+def test_keywords_are_counted_per_type(tmp_path, write_sheet):
+    trainer = make_trainer(tmp_path)
+    trainer.process_excel_file(write_sheet(ROWS))
+
+    assert trainer.category_keywords['solar']['solar'] == 2
+    assert trainer.category_keywords['solar']['ntpc'] == 1
+    assert trainer.category_phrases['wind']['muppandal wind'] == 1
+
+
+def test_processing_a_file_again_does_not_count_it_twice(tmp_path, write_sheet):
+    trainer = make_trainer(tmp_path)
+    sheet = write_sheet(ROWS)
+    trainer.process_excel_file(sheet)
+    keywords = {k: dict(v) for k, v in trainer.category_keywords.items()}
+    metrics = {k: dict(v) for k, v in trainer.category_metrics.items()}
+
+    trainer.process_excel_file(sheet)
+    # A fresh trainer loads the ledger of ingested files from the training data
+    reloaded = make_trainer(tmp_path)
+    reloaded.process_excel_file(sheet)
+
+    for current in (trainer, reloaded):
+        assert {k: dict(v) for k, v in current.category_keywords.items()} == keywords
+        assert {k: dict(v) for k, v in current.category_metrics.items()} == metrics
+
+
+def test_new_content_under_a_key_replaces_the_old(tmp_path, write_sheet):
+    trainer = make_trainer(tmp_path)
+    trainer.process_excel_file(write_sheet(ROWS, name='export_1.xlsx'), source_key='latest_export')
+    updated = ROWS[:2] + [{'Type': 'Wind', 'Name': 'Jaisalmer Wind Park', 'Company': 'Inox Wind',
+                           'Capacity': 1064}]
+    trainer.process_excel_file(write_sheet(updated, name='export_2.xlsx'), source_key='latest_export')
+
+    assert trainer.category_keywords['solar']['solar'] == 2
+    assert 'muppandal' not in trainer.category_keywords['wind']
+    assert trainer.category_keywords['wind']['jaisalmer'] == 1
+    assert trainer.category_metrics['wind'] == {'Capacity': [1064.0]}
+    assert list(trainer.sources) == ['latest_export']
+
+
+def test_distinct_files_add_up(tmp_path, write_sheet):
+    trainer = make_trainer(tmp_path)
+    trainer.process_excel_file(write_sheet(ROWS, name='first.xlsx'))
+    trainer.process_excel_file(write_sheet(ROWS[:1], name='second.xlsx'))
+
+    assert trainer.category_keywords['solar']['solar'] == 3
+    assert trainer.category_metrics['solar'] == {'Capacity': [500.0, 600.0, 500.0]}
@@ -0,0 +1,103 @@
+"""Tests for batched source check writes"""
+
+from unit_of_work import SourceUnitOfWork
+
+
+def article(url, text="Solar park article"):
+    from models import NewsArticle
+
+    item = NewsArticle(url=url, title=f"Title of {url}", source_id=None)
+    item.content = text
+    return item
+
+
+def project(name, company="Adani Green Energy"):
+    from models import Project
+
+    return Project(name=name, type='solar', company=company, state='Gujarat',
+                   generation_capacity=500.0, source='https://example.com')
+
+
+def stored(db):
+    from models import NewsArticle
+
+    db.session.expire_all()
+    return {a.url: a for a in NewsArticle.query.all()}
+
+
+def test_flushes_when_the_batch_is_full(db):
+    unit_of_work = SourceUnitOfWork(db.session, batch_size=2, flush_seconds=3600)
+    unit_of_work.add(article('https://example.com/1'))
+    assert len(unit_of_work) == 1 and stored(db) == {}
+
+    unit_of_work.add(article('https://example.com/2'))
+    unit_of_work.add(article('https://example.com/3'))
+    assert len(unit_of_work) == 1
+    assert set(stored(db)) == {'https://example.com/1', 'https://example.com/2'}
+
+    unit_of_work.flush()
+    articles = stored(db)
+    assert len(articles) == 3 and unit_of_work.processed_count == 3
+    assert all(a.is_processed for a in articles.values())
+    assert articles['https://example.com/3'].content == "Solar park article"
+
+
+def test_flushes_when_the_oldest_article_is_old_enough(db):
+    unit_of_work = SourceUnitOfWork(db.session, batch_size=100, flush_seconds=0)
+    unit_of_work.add(article('https://example.com/1'))
+
+    assert len(unit_of_work) == 0
+    assert set(stored(db)) == {'https://example.com/1'}
+
+
+def test_projects_are_stored_with_indices(db):
+    from models import Project
+
+    added = []
+    unit_of_work = SourceUnitOfWork(db.session, on_projects_added=added.append)
+    khavda = project('Khavda Solar Park')
+    unit_of_work.add(article('https://example.com/1'), khavda)
+    unit_of_work.add(article('https://example.com/2'), project('Rewa Solar', company='ReNew Power'))
+
+    assert unit_of_work.pending_duplicate({'name': 'Khavda Solar Park', 'type': 'solar',
+                                           'company': 'Adani Green Energy', 'state': 'Gujarat',
+                                           'generation_capacity': 500.0}) is khavda
+    assert len(unit_of_work.flush()) == 2
+
+    assert added == [2] and unit_of_work.projects_added == 2
+    indices = [p.index for p in Project.query.order_by(Project.id)]
+    assert len(indices) == 2 and None not in indices and len(set(indices)) == 2
+
+
+def test_articles_stored_by_another_worker_are_only_marked(db):
+    from models import NewsArticle
+
+    db.session.add(NewsArticle(url='https://example.com/1', title="Stored first"))
+    db.session.commit()
+
+    unit_of_work = SourceUnitOfWork(db.session)
+    unit_of_work.add(article('https://example.com/1'))
+    unit_of_work.flush()
+
+    articles = stored(db)
+    assert len(articles) == 1
+    assert articles['https://example.com/1'].title == "Stored first"
+    assert articles['https://example.com/1'].is_processed
+
+
+def test_failed_batch_falls_back_to_one_article_at_a_time(db, caplog):
+    from models import Project
+
+    unit_of_work = SourceUnitOfWork(db.session)
+    unit_of_work.add(article('https://example.com/1'), project('Khavda Solar Park'))
+    # url is NOT NULL, so the bulk insert of the batch fails on this row
+    unit_of_work.add(article(None))
+    unit_of_work.add(article('https://example.com/3'), project('Rewa Solar', company='ReNew Power'))
+
+    stored_projects = unit_of_work.flush()
+
+    assert "Batch write failed" in caplog.text
+    assert set(stored(db)) == {'https://example.com/1', 'https://example.com/3'}
+    assert [p.name for p in stored_projects] == ['Khavda Solar Park', 'Rewa Solar']
+    assert Project.query.count() == 2
+    assert unit_of_work.processed_count == 2
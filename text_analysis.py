@@ -0,0 +1,260 @@
+"""
+Shared per-document text analysis for the scraping pipeline.
+Computes normalized text, token offsets, sentence boundaries, number/unit spans,
+normalized quantities and place mentions once per article so classifiers and extractors don't repeat full-text passes.
+"""
+
+import re
+from collections import namedtuple
+from functools import cached_property
+
+from quantities import GLUED_CURRENCY, tokenize_quantities
+
+# Patterns used by the normalizer and the lazy analysis passes
+URL_PATTERN = re.compile(r'https?://\S+')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+TOKEN_PATTERN = re.compile(r'\w+')
+WORD_TERM_PATTERN = re.compile(r'\w+')
+SENTENCE_END_PATTERN = re.compile(r'[.!?]+(?=\s|$)|\n+')
+NUMBER_UNIT_PATTERN = re.compile(
+    r'(?:' + GLUED_CURRENCY + r'|(?<![\w.]))(\d+(?:,\d{2,3})*(?:\.\d+)?)(?:\s*|[- ])([A-Za-z]+)?',
+    re.IGNORECASE
+)
+
+# A number found in the raw text with the word that immediately follows it
+NumberSpan = namedtuple('NumberSpan', ['start', 'end', 'value', 'unit'])
+
+
+def normalize_text(text):
+    """
+    Normalize text for keyword and pattern analysis
+    Returns lowercased text with URLs removed and whitespace collapsed
+    """
+    if not text:
+        return ""
+
+    text = text.lower()
+    text = URL_PATTERN.sub('', text)
+    return WHITESPACE_PATTERN.sub(' ', text).strip()
+
+
+class Document:
+    """
+    Analysis context for a single article.
+
+    Every derived view (normalized text, tokens, sentences, numbers) is computed
+    lazily on first access and then reused by all classifiers and extractors.
+    """
+
+    def __init__(self, text, title=None):
+        """Initialize the document with raw article text and optional title"""
+        self.text = text or ""
+        self.title = title
+        # Named entities attached by ner.annotate_documents, or None
+        self.entities = None
+        self._term_cache = {}
+        self._windows = {}
+
+    def __bool__(self):
+        return bool(self.text)
+
+    def __len__(self):
+        return len(self.text)
+
+    @cached_property
+    def normalized(self):
+        """Lowercased text with URLs removed and whitespace collapsed"""
+        return normalize_text(self.text)
+
+    @cached_property
+    def tokens(self):
+        """List of (start, end) word offsets into the normalized text"""
+        return [match.span() for match in TOKEN_PATTERN.finditer(self.normalized)]
+
+    @cached_property
+    def token_list(self):
+        """List of normalized word tokens in document order"""
+        normalized = self.normalized
+        return [normalized[start:end] for start, end in self.tokens]
+
+    @cached_property
+    def token_set(self):
+        """Set of distinct normalized word tokens"""
+        return frozenset(self.token_list)
+
+    @cached_property
+    def sentences(self):
+        """List of (start, end) sentence offsets into the raw text"""
+        boundaries = []
+        start = 0
+        for match in SENTENCE_END_PATTERN.finditer(self.text):
+            end = match.end()
+            if self.text[start:end].strip():
+                boundaries.append((start, end))
+            start = end
+        if self.text[start:].strip():
+            boundaries.append((start, len(self.text)))
+        return boundaries
+
+    @cached_property
+    def numbers(self):
+        """List of NumberSpan entries for every number in the raw text"""
+        spans = []
+        for match in NUMBER_UNIT_PATTERN.finditer(self.text):
+            try:
+                value = float(match.group(1).replace(',', ''))
+            except ValueError:
+                continue
+            unit = match.group(2).lower() if match.group(2) else None
+            spans.append(NumberSpan(match.start(), match.end(), value, unit))
+        return spans
+
+    @cached_property
+    def quantities(self):
+        """List of quantities.Quantity entries with normalized units, in document order"""
+        if not self.has_numbers:
+            return []
+        return tokenize_quantities(self.text)
+
+    def quantities_of(self, dimension):
+        """Return the quantities of one dimension (e.g. quantities.POWER)"""
+        return [quantity for quantity in self.quantities if quantity.dimension == dimension]
+
+    @cached_property
+    def places(self):
+        """List of gazetteer.PlaceMention for every Indian place and India marker"""
+        # Imported here since the gazetteer is itself built on TermMatcher
+        from gazetteer import gazetteer
+        return gazetteer.find(self)
+
+    @property
+    def has_numbers(self):
+        """Whether the text contains any numeric value at all"""
+        return bool(self.numbers)
+
+    def sentence_at(self, offset):
+        """Return the raw text of the sentence containing a character offset"""
+        for start, end in self.sentences:
+            if start <= offset < end:
+                return self.text[start:end].strip()
+        return ""
+
+    def has_term(self, term):
+        """
+        Check whether a lowercase term occurs as a whole word or phrase
+
+        Single-word terms are answered from the token set; anything else falls
+        back to a word-bounded search over the normalized text. Results are
+        cached per document.
+        """
+        cached = self._term_cache.get(term)
+        if cached is not None:
+            return cached
+
+        if WORD_TERM_PATTERN.fullmatch(term):
+            found = term in self.token_set
+        else:
+            found = re.search(r'\b' + re.escape(term) + r'\b', self.normalized) is not None
+
+        self._term_cache[term] = found
+        return found
+
+    def count_terms(self, terms):
+        """Count how many of the given lowercase terms occur in the document"""
+        return sum(1 for term in terms if self.has_term(term))
+
+    def window(self, chars):
+        """
+        Return a Document over the title and the first chars characters of the text
+
+        The cut moves back to the preceding whitespace so no word is split.
+        Every window, including one covering the whole text, starts with the
+        title. Windows are cached per size.
+        """
+        chars = max(0, min(chars, len(self.text)))
+        window = self._windows.get(chars)
+        if window is None:
+            body = self.text[:chars]
+            if chars < len(self.text):
+                cut = body.rfind(' ', 0, chars)
+                if cut > chars * 0.8:
+                    body = body[:cut]
+            text = f"{self.title}\n\n{body}" if self.title else body
+            window = self._windows[chars] = Document(text, self.title)
+        return window
+
+    def windows(self, first, growth=4):
+        """
+        Yield windows of growing size, ending with one over the whole text
+
+        Args:
+            first: Characters of text in the first window; 0 or less yields
+                only the whole-text window
+            growth: Factor by which each window is larger than the previous
+        """
+        chars = first if first > 0 else len(self.text)
+        while chars < len(self.text):
+            yield self.window(chars)
+            chars *= growth
+        yield self.window(len(self.text))
+
+
+class TermMatcher:
+    """
+    Token-level trie that finds every known term in one pass over a document.
+
+    Terms are tokenized the same way as Document.token_list, so a term matches
+    wherever its words appear consecutively, regardless of punctuation or
+    spacing between them.
+    """
+
+    _TERMINAL = None
+
+    def __init__(self):
+        """Initialize an empty matcher"""
+        self.root = {}
+        self.size = 0
+
+    def add(self, term, value):
+        """Register a term; value is returned for every match of the term"""
+        tokens = TOKEN_PATTERN.findall(term.lower())
+        if not tokens:
+            return
+        node = self.root
+        for token in tokens:
+            node = node.setdefault(token, {})
+        node.setdefault(self._TERMINAL, []).append(value)
+        self.size += 1
+
+    def find(self, tokens):
+        """
+        Find all term occurrences in a token list
+
+        Returns:
+            List of (start_token, end_token, value) tuples
+        """
+        matches = []
+        root = self.root
+        for start in range(len(tokens)):
+            node = root.get(tokens[start])
+            end = start + 1
+            while node is not None:
+                for value in node.get(self._TERMINAL, ()):
+                    matches.append((start, end, value))
+                if end >= len(tokens):
+                    break
+                node = node.get(tokens[end])
+                end += 1
+        return matches
+
+    def find_values(self, text):
+        """Return the set of values for every term found in a text or Document"""
+        doc = as_document(text)
+        return {value for _, _, value in self.find(doc.token_list)}
+
+
+def as_document(text, title=None):
+    """Wrap raw text in a Document, passing existing Documents through unchanged"""
+    if isinstance(text, Document):
+        return text
+    return Document(text, title)
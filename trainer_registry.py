@@ -0,0 +1,189 @@
+"""
+Versioned registry for the compiled training model.
+Holds the model used for project type detection and swaps in a newly compiled
+model atomically after training, without restarting the process. Callers take
+a snapshot with current() and keep using it for the rest of their extraction.
+"""
+
+import os
+import time
+import logging
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    # No advisory file locks on this platform; the build lock still covers threads
+    fcntl = None
+
+from compiled_model import ARTIFACT_PATH, CompiledModel, load_or_build
+from training_module import ProjectTypeTrainer, TRAINING_DATA_PATH
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Seconds between checks for models published by other processes
+RELOAD_CHECK_INTERVAL = 30
+
+# Training source key of the latest project export
+LATEST_EXPORT_KEY = 'latest_export'
+
+# Lock file serializing writes to the training data across processes
+TRAINING_LOCK_PATH = TRAINING_DATA_PATH + '.lock'
+
+
+def training_sources():
+    """Return the files the trained detection model is built from"""
+    sources = [TRAINING_DATA_PATH]
+    # Find all Excel files with renewable projects data
+    excel_files = [f for f in os.listdir() if f.endswith('.xlsx') and 'renewable' in f]
+    if excel_files:
+        # Use the latest file (assuming filename contains date)
+        sources.append(sorted(excel_files)[-1])
+    return sources
+
+
+@contextmanager
+def training_data_lock(path=TRAINING_LOCK_PATH):
+    """Hold the exclusive lock on the training data, waiting for other processes"""
+    with open(path, 'a') as lock_file:
+        if fcntl:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _artifact_mtime(path):
+    """Return the artifact's mtime, or None if it doesn't exist"""
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+class TrainerRegistry:
+    """
+    Process-wide holder of the current compiled training model.
+
+    Readers never block: current() returns whichever model was published last.
+    Rebuilds are serialized by a build lock and published with a single
+    reference swap, so an extraction that already took a snapshot finishes with
+    the model it started with.
+    """
+
+    def __init__(self, artifact_path=ARTIFACT_PATH, check_interval=RELOAD_CHECK_INTERVAL):
+        """Initialize an empty registry; the model is loaded on first use"""
+        self.artifact_path = artifact_path
+        self.check_interval = check_interval
+        self._model = None
+        self._generation = 0
+        self._artifact_mtime = None
+        self._last_check = 0.0
+        self._trainer = None
+        self._lock = threading.Lock()
+        self._build_lock = threading.RLock()
+
+    @property
+    def generation(self):
+        """Number of models published in this process"""
+        return self._generation
+
+    @property
+    def version(self):
+        """Content version of the current model"""
+        return self.current().version
+
+    def current(self):
+        """
+        Return the current compiled model
+
+        Loads the model on first use and periodically picks up models rebuilt by
+        other processes or made stale by changed training sources.
+        """
+        model = self._model
+        if model is None:
+            return self._load()
+
+        now = time.monotonic()
+        if now - self._last_check >= self.check_interval:
+            self._last_check = now
+            if (_artifact_mtime(self.artifact_path) != self._artifact_mtime
+                    or model.is_stale(training_sources())):
+                return self._load()
+
+        return model
+
+    def publish(self, model):
+        """Atomically make a compiled model the current one"""
+        with self._lock:
+            self._model = model
+            self._generation += 1
+            self._artifact_mtime = _artifact_mtime(self.artifact_path)
+            self._last_check = time.monotonic()
+        logger.info(f"Published training model {model.version} (generation {self._generation})")
+        return model
+
+    def trainer(self):
+        """Return the trainer behind the current model"""
+        # Picks up models other processes published, which drops a stale trainer
+        self.current()
+        with self._build_lock:
+            if self._trainer is None:
+                self._trainer = ProjectTypeTrainer()
+            return self._trainer
+
+    def train_from_file(self, excel_file):
+        """
+        Process a training Excel file and publish the recompiled model
+
+        Returns:
+            The newly published CompiledModel
+        """
+        with self._build_lock, training_data_lock():
+            # Start from the training data on disk, which other processes may
+            # have extended since this one last loaded it
+            trainer = ProjectTypeTrainer()
+            trainer.process_excel_file(excel_file)
+            model = CompiledModel.from_trainer(trainer, training_sources())
+            try:
+                model.save(self.artifact_path)
+            except OSError as e:
+                logger.error(f"Error saving compiled training model: {e}")
+            self._trainer = trainer
+            return self.publish(model)
+
+    def _load(self):
+        """Load or rebuild the model from disk and publish it"""
+        with self._build_lock:
+            # Another thread may have published while we waited for the lock
+            model = self._model
+            if (model is not None
+                    and _artifact_mtime(self.artifact_path) == self._artifact_mtime
+                    and not model.is_stale(training_sources())):
+                return model
+
+            sources = training_sources()
+
+            def build_trainer():
+                trainer = ProjectTypeTrainer()
+                for source in sources[1:]:
+                    logger.info(f"Using {source} for training")
+                    # Each export holds every project, so the latest one replaces
+                    # the previous export's counts rather than adding to them
+                    trainer.process_excel_file(source, source_key=LATEST_EXPORT_KEY)
+                self._trainer = trainer
+                return trainer
+
+            # A loaded artifact may come from training data this process's
+            # trainer doesn't have; trainer() reloads it when next needed
+            self._trainer = None
+            with training_data_lock():
+                return self.publish(load_or_build(sources, build_trainer, self.artifact_path))
+
+
+# Create a global instance for easy import
+registry = TrainerRegistry()
@@ -4,30 +4,204 @@ Uses existing project examples from Excel files to improve category recognition.
 """
 
 import os
+import math
+import hashlib
 import logging
 import pandas as pd
-import re
 from datetime import datetime
-from collections import defaultdict
+from collections import Counter, defaultdict
 import json
 
+from text_analysis import as_document
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+TRAINING_DATA_PATH = "training_data.json"
+
+# Metric columns for different project types with alternative field names
+METRIC_FIELDS = {
+    'solar': [
+        'generation_capacity', 'capacity_mw', 'capacity', 'mw', 'size_mw',
+        'cell_capacity', 'module_capacity', 'solar_capacity'
+    ],
+    'wind': [
+        'generation_capacity', 'capacity_mw', 'capacity', 'mw', 'size_mw',
+        'wind_capacity'
+    ],
+    'battery': [
+        'storage_capacity', 'capacity_mwh', 'capacity', 'mwh', 'size_mwh',
+        'battery_capacity'
+    ],
+    'hydrogen': [
+        'electrolyzer_capacity', 'hydrogen_production', 'capacity_mw',
+        'production_tons', 'tons_per_day', 'hydrogen_capacity'
+    ],
+    'hydro': [
+        'generation_capacity', 'capacity_mw', 'capacity', 'mw', 'size_mw',
+        'hydro_capacity'
+    ],
+    'biofuel': [
+        'biofuel_capacity', 'capacity_ml', 'production_capacity',
+        'million_liters', 'capacity', 'biofuel_production'
+    ]
+}
+DEFAULT_METRIC_FIELDS = ['generation_capacity', 'capacity', 'storage_capacity']
+
+# Column name fragments that indicate a capacity-like metric
+CAPACITY_KEYWORDS = ['capacity', 'mw', 'gwh', 'mwh', 'production', 'size']
+
+# Maximum score a matched keyword or phrase adds to its project type
+KEYWORD_SCORE = 0.1
+PHRASE_SCORE = 0.2
+
+# Number of most discriminative keywords and phrases kept per project type
+MAX_TERMS_PER_CATEGORY = 150
+
+# Additive smoothing for the per-category log-odds
+LOG_ODDS_PRIOR = 0.5
+
+
+def _column_variants(field):
+    """Return the column name variations tried for a metric field"""
+    camel_case = ''.join(word.capitalize() if i > 0 else word
+                         for i, word in enumerate(field.split('_')))
+    return [field, camel_case, field.lower().replace('_', '')]
+
+
+def _parse_numeric(series):
+    """Convert a column to floats, taking the first number from text cells"""
+    numbers = pd.to_numeric(series, errors='coerce')
+    text = series[numbers.isna() & series.notna()]
+    if len(text):
+        extracted = text.astype(str).str.extract(r'([\d.]+)', expand=False)
+        numbers.loc[text.index] = pd.to_numeric(extracted, errors='coerce')
+    return numbers.astype(float)
+
+
+def _update_counts(target, type_keys, values):
+    """Count values per type, once per row they appear in"""
+    values = values.dropna()
+    if values.empty:
+        return
+    pairs = pd.DataFrame({
+        'row': values.index,
+        'type': type_keys.reindex(values.index).to_numpy(),
+        'value': values.to_numpy()
+    }).dropna().drop_duplicates()
+    for (project_type, value), count in pairs.groupby(['type', 'value']).size().items():
+        target.setdefault(project_type, Counter())[value] += int(count)
+
+
+def _file_fingerprint(path):
+    """Return the SHA-256 of a file's content"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _remove_values(values, removed):
+    """Return values without one occurrence of each removed value"""
+    pending = Counter(removed)
+    kept = []
+    for value in values:
+        if pending[value] > 0:
+            pending[value] -= 1
+        else:
+            kept.append(value)
+    return kept
+
+
+def _as_counter(entries):
+    """Read stored term counts; older training data stored plain term lists"""
+    if isinstance(entries, dict):
+        return Counter({term: int(count) for term, count in entries.items()})
+    return Counter({term: 1 for term in entries})
+
+
+def log_odds_weights(category_counts, prior=LOG_ODDS_PRIOR):
+    """
+    Score how strongly each term points to each category
+
+    Uses the smoothed log-odds of a term within a category against the same
+    term across all other categories, so words shared by every project type
+    score near zero and distinctive words score high.
+
+    Args:
+        category_counts: Dict of category -> Counter of term counts
+        prior: Pseudo-count added to every term
+
+    Returns:
+        Dict of category -> {term: log-odds ratio}
+    """
+    totals = Counter()
+    for counts in category_counts.values():
+        totals.update(counts)
+    vocabulary_size = len(totals)
+    grand_total = sum(totals.values())
+    # One pseudo-count more than the vocabulary keeps every probability below 1,
+    # even for a category with a single term
+    smoothing = prior * (vocabulary_size + 1)
+
+    weights = {}
+    for category, counts in category_counts.items():
+        n_category = sum(counts.values())
+        n_other = grand_total - n_category
+        category_weights = {}
+        for term, count in counts.items():
+            other_count = totals[term] - count
+            p_category = (count + prior) / (n_category + smoothing)
+            p_other = (other_count + prior) / (n_other + smoothing)
+            category_weights[term] = (math.log(p_category / (1 - p_category))
+                                      - math.log(p_other / (1 - p_other)))
+        weights[category] = category_weights
+    return weights
+
+
+def top_terms(category_counts, score, top_n=MAX_TERMS_PER_CATEGORY):
+    """
+    Select the most discriminative terms for each category
+
+    Keeps at most top_n terms with a positive log-odds per category and scales
+    their score by the term's weight relative to the category's best term.
+
+    Returns:
+        Dict of category -> list of (term, score) ordered by weight
+    """
+    selected = {}
+    for category, weights in log_odds_weights(category_counts).items():
+        counts = category_counts[category]
+        ranked = sorted((term for term, weight in weights.items() if weight > 0),
+                        key=lambda term: (-weights[term], -counts[term], term))[:top_n]
+        if not ranked:
+            selected[category] = []
+            continue
+        best = weights[ranked[0]]
+        selected[category] = [(term, score * weights[term] / best) for term in ranked]
+    return selected
+
+
 class ProjectTypeTrainer:
     """
     Trainer for enhancing renewable energy project type detection.
     Analyzes Excel files with project examples to extract terminology and patterns.
     """
     
-    def __init__(self, training_data_file=None):
+    def __init__(self, training_data_file=None, training_data_path=TRAINING_DATA_PATH):
         """Initialize the trainer with optional training data file"""
-        self.training_data_path = "training_data.json"
+        self.training_data_path = training_data_path
         self.category_patterns = defaultdict(list)
-        self.category_keywords = defaultdict(set)
-        self.category_phrases = defaultdict(set)
+        # Per-type Counters of how many project examples contain each term
+        self.category_keywords = defaultdict(Counter)
+        self.category_phrases = defaultdict(Counter)
         self.category_metrics = defaultdict(dict)
+        # Source key -> fingerprint and term counts of each ingested file, so
+        # processing a file again replaces its counts instead of adding them twice
+        self.sources = {}
+        self._vocabulary = None
         
         # Load existing training data if available
         self.load_training_data()
@@ -43,12 +217,22 @@ class ProjectTypeTrainer:
                 with open(self.training_data_path, 'r') as f:
                     data = json.load(f)
                     
-                # Convert defaultdict and sets from json representation
-                self.category_keywords = {k: set(v) for k, v in data.get('keywords', {}).items()}
-                self.category_phrases = {k: set(v) for k, v in data.get('phrases', {}).items()}
+                # Convert term counts from json representation
+                self.category_keywords = {k: _as_counter(v) for k, v in data.get('keywords', {}).items()}
+                self.category_phrases = {k: _as_counter(v) for k, v in data.get('phrases', {}).items()}
                 self.category_patterns = defaultdict(list, data.get('patterns', {}))
                 self.category_metrics = defaultdict(dict, data.get('metrics', {}))
+                self.sources = {
+                    key: {
+                        'fingerprint': source['fingerprint'],
+                        'keywords': {k: Counter(v) for k, v in source.get('keywords', {}).items()},
+                        'phrases': {k: Counter(v) for k, v in source.get('phrases', {}).items()},
+                        'metrics': source.get('metrics', {}),
+                    }
+                    for key, source in data.get('sources', {}).items()
+                }
                 
+                self._vocabulary = None
                 logger.info(f"Loaded training data with {len(self.category_keywords)} categories")
             except Exception as e:
                 logger.error(f"Error loading training data: {e}")
@@ -56,12 +240,21 @@ class ProjectTypeTrainer:
     def save_training_data(self):
         """Save training data to file"""
         try:
-            # Convert sets to lists for JSON serialization
+            # Store term counts so weights can be recomputed as data grows
             data = {
-                'keywords': {k: list(v) for k, v in self.category_keywords.items()},
-                'phrases': {k: list(v) for k, v in self.category_phrases.items()},
+                'keywords': {k: dict(v.most_common()) for k, v in self.category_keywords.items()},
+                'phrases': {k: dict(v.most_common()) for k, v in self.category_phrases.items()},
                 'patterns': dict(self.category_patterns),
-                'metrics': dict(self.category_metrics)
+                'metrics': dict(self.category_metrics),
+                'sources': {
+                    key: {
+                        'fingerprint': source['fingerprint'],
+                        'keywords': {k: dict(v) for k, v in source['keywords'].items()},
+                        'phrases': {k: dict(v) for k, v in source['phrases'].items()},
+                        'metrics': source['metrics'],
+                    }
+                    for key, source in self.sources.items()
+                }
             }
             
             with open(self.training_data_path, 'w') as f:
@@ -71,10 +264,30 @@ class ProjectTypeTrainer:
         except Exception as e:
             logger.error(f"Error saving training data: {e}")
     
-    def process_excel_file(self, excel_file):
-        """Process an Excel file with project examples"""
+    def process_excel_file(self, excel_file, source_key=None):
+        """
+        Process an Excel file with project examples
+        
+        Each file is counted once per source key: processing the same content
+        again does nothing, and new content under the same key replaces what
+        the key added before.
+        
+        Args:
+            excel_file: Path of the Excel file
+            source_key: Key the file's counts are kept under; defaults to the
+                file's content fingerprint, so distinct files add up
+        """
         try:
+            fingerprint = _file_fingerprint(excel_file)
+            source_key = source_key or fingerprint
+            previous = self.sources.get(source_key)
+            if previous and previous['fingerprint'] == fingerprint:
+                logger.info(f"Skipping {excel_file}, already ingested")
+                return
+            
             df = pd.read_excel(excel_file)
+            # Header cells can be numbers; treat every column name as text
+            df.columns = [str(col) for col in df.columns]
             
             # Store original column names for later reference
             original_columns = df.columns.tolist()
@@ -116,51 +329,34 @@ class ProjectTypeTrainer:
                             logger.info(f"Using '{col}' for '{field}' based on partial match")
                             break
             
-            # Create a new DataFrame with standardized column names
-            std_df = pd.DataFrame()
-            
-            # Copy mapped columns to standardized DataFrame
-            for std_name, orig_name in mapped_columns.items():
-                std_df[std_name] = df[orig_name]
-            
             # Check if we have project type column
             if 'type' not in mapped_columns:
                 logger.error("Could not find a column for project type in Excel file")
                 return
             
-            # Extract patterns for each project type
-            project_types = std_df['type'].unique()
-            logger.info(f"Found {len(project_types)} project types: {project_types}")
+            # Create a DataFrame with standardized column names
+            std_df = pd.DataFrame({std_name: df[orig_name] for std_name, orig_name in mapped_columns.items()})
             
-            # Process each project type
-            for project_type in project_types:
-                if pd.isna(project_type):
-                    continue
-                
-                # Handle numeric types by converting to string
-                if isinstance(project_type, (int, float)):
-                    project_type_str = str(project_type)
-                    logger.info(f"Converting numeric type {project_type} to string")
-                else:
-                    project_type_str = project_type.strip().lower()
-                
-                # Filter for this project type, handling both string and numeric types
-                if isinstance(project_type, (int, float)):
-                    type_df = std_df[std_df['type'] == project_type]
-                else:
-                    try:
-                        type_df = std_df[std_df['type'].str.lower() == project_type_str]
-                    except AttributeError:
-                        # Handle case where type column contains mixed types
-                        type_df = std_df[std_df['type'].astype(str).str.lower() == project_type_str]
-                
-                logger.info(f"Processing {len(type_df)} examples for {project_type}")
-                
-                # Extract keywords from project names
-                for _, row in type_df.iterrows():
-                    # Use project_type_str for consistent key naming in dictionaries
-                    self._extract_keywords(project_type_str, row)
-                    self._extract_metrics(project_type_str, row)
+            # Normalize project types once for the whole sheet; numeric types keep
+            # their string form and text types are trimmed and lowercased
+            types = std_df['type'].dropna()
+            type_keys = types.astype(str).str.strip().str.lower()
+            
+            type_counts = type_keys.value_counts()
+            logger.info(f"Found {len(type_counts)} project types: {type_counts.index.tolist()}")
+            for project_type, count in type_counts.items():
+                logger.info(f"Processing {count} examples for {project_type}")
+            
+            # Extract keywords and metrics for all rows at once
+            source = {'fingerprint': fingerprint, 'keywords': {}, 'phrases': {}, 'metrics': {}}
+            self._ingest_keywords(type_keys, std_df, source)
+            self._ingest_metrics(type_keys, df, source)
+            
+            if previous:
+                self._apply_source(previous, -1)
+            self._apply_source(source, 1)
+            self.sources[source_key] = source
+            self._vocabulary = None
             
             # After processing all examples, save the training data
             self.save_training_data()
@@ -168,181 +364,128 @@ class ProjectTypeTrainer:
         except Exception as e:
             logger.error(f"Error processing Excel file {excel_file}: {e}")
     
-    def _extract_keywords(self, project_type, row):
-        """Extract keywords from a project example"""
-        # Make sure dictionary entries exist for this project type
-        if project_type not in self.category_keywords:
-            self.category_keywords[project_type] = set()
-        if project_type not in self.category_phrases:
-            self.category_phrases[project_type] = set()
-            
-        # Process name or alternatives
-        name_fields = ['name', 'project_name', 'project']
-        for field in name_fields:
-            if field in row and pd.notna(row[field]):
-                try:
-                    # Always convert to string to handle numeric types
-                    name = str(row[field]).lower()
-                    
-                    # Add project name keywords
-                    keywords = set(re.findall(r'\b\w+\b', name))
-                    self.category_keywords[project_type].update(keywords)
-                    
-                    # Capture multi-word phrases that might be important
-                    phrases = re.findall(r'\b\w+\s+\w+\b', name)
-                    self.category_phrases[project_type].update(phrases)
-                    
-                    # Found a valid name field, no need to check others
-                    break
-                except Exception as e:
-                    logger.warning(f"Error processing name field '{field}': {e}")
-        
-        # Process company name for additional context
-        company_fields = ['company', 'organization', 'developer', 'owner']
-        for field in company_fields:
-            if field in row and pd.notna(row[field]):
-                try:
-                    # Always convert to string to handle numeric types
-                    company = str(row[field]).lower()
-                    # Companies often specialize in specific renewable types
-                    self.category_keywords[project_type].add(company)
-                    break
-                except Exception as e:
-                    logger.warning(f"Error processing company field '{field}': {e}")
+    def _apply_source(self, source, sign):
+        """Add a source's counts and metric values to the totals, or take them out"""
+        for totals, counts in [(self.category_keywords, source['keywords']),
+                               (self.category_phrases, source['phrases'])]:
+            for project_type, terms in counts.items():
+                total = totals.setdefault(project_type, Counter())
+                if sign > 0:
+                    total.update(terms)
+                else:
+                    total.subtract(terms)
+                    totals[project_type] = +total
         
-        # Process category for additional dimensions
-        category_fields = ['category', 'project_category', 'segment', 'type']
-        for field in category_fields:
-            if field in row and pd.notna(row[field]) and field != 'type':
-                try:
-                    # Always convert to string to handle numeric types
-                    category = str(row[field]).lower()
-                    self.category_keywords[project_type].add(category)
-                    break
-                except Exception as e:
-                    logger.warning(f"Error processing category field '{field}': {e}")
+        for project_type, columns in source['metrics'].items():
+            metrics = self.category_metrics.setdefault(project_type, {})
+            for col, values in columns.items():
+                if sign > 0:
+                    metrics.setdefault(col, []).extend(values)
+                else:
+                    metrics[col] = _remove_values(metrics.get(col, []), values)
     
-    def _extract_metrics(self, project_type, row):
-        """Extract metric patterns from a project example"""
-        # Initialize metrics dictionary for this project type if it doesn't exist
-        if project_type not in self.category_metrics:
-            self.category_metrics[project_type] = {}
-            
-        # Different metrics for different project types with alternative field names
-        metric_fields = {
-            'solar': [
-                'generation_capacity', 'capacity_mw', 'capacity', 'mw', 'size_mw',
-                'cell_capacity', 'module_capacity', 'solar_capacity'
-            ],
-            'wind': [
-                'generation_capacity', 'capacity_mw', 'capacity', 'mw', 'size_mw',
-                'wind_capacity'
-            ],
-            'battery': [
-                'storage_capacity', 'capacity_mwh', 'capacity', 'mwh', 'size_mwh',
-                'battery_capacity'
-            ],
-            'hydrogen': [
-                'electrolyzer_capacity', 'hydrogen_production', 'capacity_mw',
-                'production_tons', 'tons_per_day', 'hydrogen_capacity'
-            ],
-            'hydro': [
-                'generation_capacity', 'capacity_mw', 'capacity', 'mw', 'size_mw',
-                'hydro_capacity'
-            ],
-            'biofuel': [
-                'biofuel_capacity', 'capacity_ml', 'production_capacity',
-                'million_liters', 'capacity', 'biofuel_production'
-            ]
-        }
+    def _ingest_keywords(self, type_keys, std_df, source):
+        """Extract keywords and phrases from every project example in a sheet"""
+        # Make sure dictionary entries exist for every project type
+        for project_type in type_keys.unique():
+            source['keywords'].setdefault(project_type, Counter())
+            source['phrases'].setdefault(project_type, Counter())
         
-        # Use default fields if specific type not found
-        fields = metric_fields.get(project_type, 
-                                  ['generation_capacity', 'capacity', 'storage_capacity'])
+        rows = std_df.loc[type_keys.index]
         
-        # Also search for any column that contains keywords like 'capacity', 'mw', etc.
-        capacity_keywords = ['capacity', 'mw', 'gwh', 'mwh', 'production', 'size']
+        # Project name words and multi-word phrases that might be important
+        if 'name' in rows:
+            names = rows['name'].dropna().astype(str).str.lower()
+            _update_counts(source['keywords'], type_keys,
+                         names.str.findall(r'\b\w+\b').explode())
+            _update_counts(source['phrases'], type_keys,
+                         names.str.findall(r'\b\w+\s+\w+\b').explode())
         
-        # Track if we found any metrics
-        metrics_found = False
+        # Companies often specialize in specific renewable types, and categories
+        # add further dimensions; both are kept as whole strings
+        for field in ['company', 'category']:
+            if field in rows:
+                _update_counts(source['keywords'], type_keys,
+                             rows[field].dropna().astype(str).str.lower())
+    
+    def _ingest_metrics(self, type_keys, df, source):
+        """
+        Extract metric values from every project example in a sheet
         
-        # First try the known field names
-        for field in fields:
-            # Generate variations of column names: camelCase, snake_case, lowercase
-            camel_case = ''.join(word.capitalize() if i > 0 else word 
-                               for i, word in enumerate(field.split('_')))
-            snake_case = field
-            lowercase = field.lower().replace('_', '')
-            
-            for col_name in [field, camel_case, snake_case, lowercase]:
-                if col_name in row and pd.notna(row[col_name]):
-                    try:
-                        if isinstance(row[col_name], (int, float)):
-                            value = float(row[col_name])
-                        else:
-                            # Try to extract numeric value from string
-                            try:
-                                match = re.search(r'[\d.]+', str(row[col_name]))
-                                if match:
-                                    value = float(match.group())
-                                else:
-                                    # Skip this value if no number found
-                                    continue
-                            except (TypeError, AttributeError):
-                                # Skip if regex search fails
-                                continue
-                            
-                        if col_name not in self.category_metrics[project_type]:
-                            self.category_metrics[project_type][col_name] = []
-                        
-                        self.category_metrics[project_type][col_name].append(value)
-                        metrics_found = True
-                        
-                    except (ValueError, AttributeError, TypeError) as e:
-                        logger.warning(f"Could not convert {col_name} value to float: {e}")
+        Metrics are read from the sheet's own columns. The row-by-row version
+        looked them up in the standardized frame, which only holds the type,
+        name, company and category columns, so it never recorded any metrics.
+        """
+        columns = set(df.columns)
+        capacity_columns = [col for col in df.columns
+                            if any(keyword in col.lower() for keyword in CAPACITY_KEYWORDS)]
+        parsed = {}
+        
+        def numeric_column(col):
+            if col not in parsed:
+                parsed[col] = _parse_numeric(df[col])
+            return parsed[col]
         
-        # If no metrics found, try looking for columns with capacity keywords
-        if not metrics_found:
-            for col in row.index:
-                col_lower = str(col).lower()
-                if any(keyword in col_lower for keyword in capacity_keywords):
-                    try:
-                        if pd.notna(row[col]):
-                            if isinstance(row[col], (int, float)):
-                                value = float(row[col])
-                            else:
-                                # Try to extract numeric value from string
-                                try:
-                                    match = re.search(r'[\d.]+', str(row[col]))
-                                    if match:
-                                        value = float(match.group())
-                                    else:
-                                        # Skip this value if no number found
-                                        continue
-                                except (TypeError, AttributeError):
-                                    # Skip if regex search fails
-                                    continue
-                                
-                            if col not in self.category_metrics[project_type]:
-                                self.category_metrics[project_type][col] = []
-                            
-                            self.category_metrics[project_type][col].append(value)
-                            
-                    except (ValueError, AttributeError, TypeError) as e:
-                        logger.debug(f"Could not extract metric from {col}: {e}")
+        for project_type, index in type_keys.groupby(type_keys).groups.items():
+            metrics = source['metrics'].setdefault(project_type, {})
             
+            # Use default fields if specific type not found
+            fields = METRIC_FIELDS.get(project_type, DEFAULT_METRIC_FIELDS)
+            known_columns = [col for col in dict.fromkeys(
+                variant for field in fields for variant in _column_variants(field)
+            ) if col in columns]
+            
+            # First try the known field names
+            found = pd.Series(False, index=index)
+            for col in known_columns:
+                values = numeric_column(col).loc[index]
+                valid = values.notna()
+                if valid.any():
+                    metrics.setdefault(col, []).extend(values[valid].tolist())
+                    found |= valid
+            
+            # Rows without known metrics fall back to any capacity-like column
+            remaining = found.index[~found]
+            if len(remaining) == 0:
+                continue
+            for col in capacity_columns:
+                values = numeric_column(col).loc[remaining].dropna()
+                if len(values):
+                    metrics.setdefault(col, []).extend(values.tolist())
+    
+    def vocabulary(self):
+        """
+        Get the weighted detection vocabulary
+        
+        Returns:
+            Dict of project type -> {'keywords': [(term, score)], 'phrases': [(term, score)]}
+            holding at most MAX_TERMS_PER_CATEGORY of each, most discriminative first
+        """
+        if self._vocabulary is None:
+            keywords = top_terms(self.category_keywords, KEYWORD_SCORE)
+            phrases = top_terms(self.category_phrases, PHRASE_SCORE)
+            self._vocabulary = {
+                project_type: {
+                    'keywords': keywords.get(project_type, []),
+                    'phrases': phrases.get(project_type, [])
+                }
+                for project_type in set(self.category_keywords) | set(self.category_phrases)
+            }
+        return self._vocabulary
     
     def get_training_results(self):
         """Get summarized training results for use in project detection"""
         results = {}
+        vocabulary = self.vocabulary()
         
-        for project_type, keywords in self.category_keywords.items():
+        for project_type in self.category_keywords:
             # Filter out common words and single-character words
             common_words = {'project', 'power', 'energy', 'plant', 'system', 'a', 'the', 'of', 'in', 'at'}
-            filtered_keywords = [k for k in keywords if k not in common_words and len(k) > 1]
+            filtered_keywords = [k for k, _ in vocabulary[project_type]['keywords']
+                                 if k not in common_words and len(k) > 1]
             
             # Get top phrases
-            phrases = list(self.category_phrases.get(project_type, []))
+            phrases = [p for p, _ in vocabulary[project_type]['phrases']]
             
             # Get metrics statistics
             metrics = self.category_metrics.get(project_type, {})
@@ -360,7 +503,7 @@ class ProjectTypeTrainer:
         Use trained patterns to enhance project type detection in the scraper
         
         Args:
-            text: The article text to analyze
+            text: The article text or a text_analysis.Document to analyze
             current_scores: Optional dict of current scores from regular detection
             
         Returns:
@@ -370,27 +513,28 @@ class ProjectTypeTrainer:
             current_scores = {}
         
         enhanced_scores = current_scores.copy()
-        text = text.lower()
+        doc = as_document(text)
+        text = doc.normalized
         
         # Calculate keyword-based scores for each project type
-        for project_type, keywords in self.category_keywords.items():
+        for project_type, terms in self.vocabulary().items():
             # Skip if we don't have enough training data
-            if len(keywords) < 3:
+            if len(self.category_keywords.get(project_type, ())) < 3:
                 continue
                 
             score = 0.0
             matched_keywords = []
             
-            # Check for keywords
-            for keyword in keywords:
-                if re.search(r'\b' + re.escape(keyword) + r'\b', text):
-                    score += 0.1
+            # Check for keywords, weighted by how specific they are to this type
+            for keyword, weight in terms['keywords']:
+                if doc.has_term(keyword):
+                    score += weight
                     matched_keywords.append(keyword)
             
             # Check for phrases which are more specific
-            for phrase in self.category_phrases.get(project_type, []):
+            for phrase, weight in terms['phrases']:
                 if phrase in text:
-                    score += 0.2
+                    score += weight
                     matched_keywords.append(phrase)
             
             # If we found matches, update score
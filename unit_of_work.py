@@ -0,0 +1,209 @@
+"""
+Batched persistence for source checks.
+Buffers the articles, new projects and processed flags produced while a
+source is checked and writes them in one transaction per batch with bulk
+upserts, falling back to one savepoint per article so a bad row is skipped
+without losing the rest of the batch. A batch is flushed after a number of articles or seconds, whichever
+comes first.
+"""
+
+import os
+import time
+import logging
+
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+
+from bulk_upsert import model_row, upsert_articles, upsert_projects
+from index_allocator import project_index_allocator
+from project_dedup import duplicates
+from stage_metrics import count, span
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Flush after this many articles or seconds
+BATCH_SIZE = int(os.environ.get("CRAWL_BATCH_SIZE", "25"))
+FLUSH_SECONDS = float(os.environ.get("CRAWL_FLUSH_SECONDS", "30"))
+
+
+class SourceUnitOfWork:
+    """
+    Pending writes of one source check.
+
+    Buffered articles and projects stay out of the session until the batch is
+    flushed, so queries made in between (duplicate checks, autoflushes of the
+    log entry) never write them early. Changes to objects already in the
+    session, like the source status and log entry, are committed with the
+    next batch.
+    """
+
+    def __init__(self, session, batch_size=BATCH_SIZE, flush_seconds=FLUSH_SECONDS,
+                 on_projects_added=None):
+        """
+        Initialize an empty unit of work
+
+        Args:
+            session: SQLAlchemy session to write through
+            batch_size: Articles buffered before a flush
+            flush_seconds: Maximum age of the oldest buffered article
+            on_projects_added: Optional callback receiving the number of
+                projects each flush stored
+        """
+        self.session = session
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.on_projects_added = on_projects_added
+        self.processed_count = 0
+        self.projects_added = 0
+        self._pending = []
+        self._oldest = None
+
+    def __len__(self):
+        return len(self._pending)
+
+    def add(self, article, project=None):
+        """
+        Buffer an article to be stored (if new) and marked processed, with the
+        project extracted from it, if any
+
+        Flushes when the batch is full or old enough.
+        """
+        if not self._pending:
+            self._oldest = time.monotonic()
+        self._pending.append((article, project))
+        if (len(self._pending) >= self.batch_size
+                or time.monotonic() - self._oldest >= self.flush_seconds):
+            self.flush()
+
+    def pending_duplicate(self, record):
+        """Return a buffered project that duplicates a project dict, or None"""
+        for _, project in self._pending:
+            if project is not None and duplicates(record, project):
+                return project
+        return None
+
+    def _store_batch(self, pending):
+        """
+        Write a batch with one upsert per table
+
+        Returns:
+            List of the projects stored
+        """
+        # Import here to avoid circular imports
+        from models import NewsArticle
+
+        new_articles = [article for article, _ in pending if article.id is None]
+        result = upsert_articles([{**model_row(article), 'content': article.content,
+                                   'is_processed': True}
+                                  for article in new_articles], session=self.session)
+        # Articles stored earlier, or by another worker meanwhile, only need the flag
+        processed_ids = [article.id for article, _ in pending if article.id is not None]
+        processed_ids += [article_id for article_id, written in zip(result.ids, result.written)
+                          if not written]
+        if processed_ids:
+            self.session.execute(update(NewsArticle)
+                                 .where(NewsArticle.id.in_(processed_ids))
+                                 .values(is_processed=True))
+
+        projects = [project for _, project in pending if project is not None]
+        project_result = upsert_projects([model_row(project) for project in projects],
+                                         session=self.session)
+        for project, project_id in zip(projects, project_result.ids):
+            project.id = project_id
+        self.processed_count += len(pending)
+        return projects
+
+    def _store(self, article, project):
+        """Write one article and its project in a savepoint"""
+        with self.session.begin_nested():
+            if article.id is None:
+                self.session.add(article)
+            article.is_processed = True
+            if project is not None:
+                self.session.add(project)
+
+    def _stored_article(self, url):
+        """Return the stored article for a URL, without flushing pending changes"""
+        # Import here to avoid circular imports
+        from models import NewsArticle
+
+        with self.session.no_autoflush:
+            return NewsArticle.query.filter_by(url=url).first()
+
+    def _store_each(self, pending):
+        """
+        Write a batch one article at a time, skipping the rows that fail
+
+        Returns:
+            List of the projects stored
+        """
+        stored_projects = []
+        # Number every new project of the batch in one reservation
+        projects = [project for _, project in pending if project is not None]
+        indices = project_index_allocator.reserve(self.session, len(projects))
+        for project, index in zip(projects, indices):
+            project.index = index
+
+        for article, project in pending:
+            try:
+                self._store(article, project)
+            except IntegrityError:
+                # Another worker stored the article first; mark its copy instead
+                existing = self._stored_article(article.url) if article.id is None else None
+                if existing is None:
+                    logger.error(f"Could not store article {article.url}")
+                    count('persist.rejected')
+                    continue
+                try:
+                    self._store(existing, project)
+                except Exception as e:
+                    logger.error(f"Could not store article {article.url}: {str(e)}")
+                    count('persist.rejected')
+                    continue
+            except Exception as e:
+                logger.error(f"Could not store article {article.url}: {str(e)}")
+                count('persist.rejected')
+                continue
+
+            self.processed_count += 1
+            if project is not None:
+                stored_projects.append(project)
+        return stored_projects
+
+    def flush(self):
+        """
+        Write the buffered articles and projects and commit
+
+        The whole batch is written with bulk upserts; if that fails, it is
+        retried one article at a time so only the bad rows are lost.
+
+        Returns:
+            List of the projects stored
+        """
+        pending, self._pending = self._pending, []
+        if not pending:
+            return []
+        with span('persist.flush'):
+            try:
+                try:
+                    with self.session.begin_nested():
+                        stored_projects = self._store_batch(pending)
+                except Exception as e:
+                    logger.warning(f"Batch write failed, storing articles one by one: {str(e)}")
+                    count('persist.batch_fallback')
+                    stored_projects = self._store_each(pending)
+                self.session.commit()
+            except Exception as e:
+                logger.error(f"Error flushing batch of {len(pending)} articles: {str(e)}")
+                self.session.rollback()
+                return []
+
+        count('persist.batches')
+        for project in stored_projects:
+            self.projects_added += 1
+            logger.info(f"✓ NEW PROJECT ADDED ({self.projects_added}): {project.name} "
+                        f"[{project.type}] from {project.source}")
+        if stored_projects and self.on_projects_added:
+            self.on_projects_added(len(stored_projects))
+        return stored_projects